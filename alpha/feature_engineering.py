@@ -1,35 +1,79 @@
 import argparse
 import logging
+import os
+from functools import partial
+import numpy as np
 import pandas as pd
-from solvexity.strategy.pipeline.analytics import Analytics, DataframeAnalytics
+from solvexity.strategy.pipeline import Flow
+from solvexity.strategy.pipeline.chunked import engineer_features
+from solvexity.toolbox.analytics import Analytics, Drawdown, Runup, DrawdownMomentum
+from solvexity.toolbox.analytics.lambda_analytics import LambdaAnalytics
+from solvexity.toolbox.analytics import stats
 
 
 logger = logging.getLogger(__name__)
 
 def calc_returns(df: pd.DataFrame) -> pd.DataFrame:
-    df["close"]
+    df["returns"] = df["close"].pct_change()
     return df
 
-def main(input_path: str, output_path: str):
-    logger.info(f"Reading input file from {input_path}")
-    df_input = pd.read_csv(input_path)
-    df_analytics = DataframeAnalytics(
-        [
-            Analytics(name="returns", func=lambda x: x["returns"], result_to="returns"),
-        ]
-    )
-    df_output = df_analytics.on_dataframe(df_input)
-    logger.info(f"Writing output file to {output_path}")
-    df_output.to_csv(output_path, index=False)
+def calc_log_returns(df: pd.DataFrame) -> pd.DataFrame:
+    df["log_returns"] = np.log(df["close"] / df["close"].shift(1))
+    return df
+
+def calc_parkinson(df: pd.DataFrame, window: int) -> pd.DataFrame:
+    df[f"parkinson_{window}"] = stats.parkinson(df["high"], df["low"], window)
+    return df
+
+def calc_garman_klass(df: pd.DataFrame, window: int) -> pd.DataFrame:
+    df[f"garman_klass_{window}"] = stats.garman_klass(df["open"], df["high"], df["low"],
+                                                      df["close"], window)
+    return df
+
+def build_pipeline(window: int) -> list[Analytics | Flow]:
+    return [
+        LambdaAnalytics(name="returns", func=calc_returns, result_to="returns", inputs=("close",),
+                        outputs=("returns",), lookback=2),
+        LambdaAnalytics(name="log_returns", func=calc_log_returns, result_to="log_returns",
+                        inputs=("close",), outputs=("log_returns",), lookback=2),
+        LambdaAnalytics(name="parkinson", func=partial(calc_parkinson, window=window),
+                        result_to="parkinson", inputs=("high", "low"),
+                        outputs=(f"parkinson_{window}",), lookback=window),
+        LambdaAnalytics(name="garman_klass", func=partial(calc_garman_klass, window=window),
+                        result_to="garman_klass", inputs=("open", "high", "low", "close"),
+                        outputs=(f"garman_klass_{window}",), lookback=window),
+        Flow("drawdown", Drawdown("close", window), "drawdown"),
+        Flow("runup", Runup("close", window), "runup"),
+        Flow("momentum", DrawdownMomentum("close", window), "momentum"),
+    ]
+
+def main(input_path: str, output_path: str, window: int = 100, chunk_size: int = 100_000,
+         workers: int | None = None) -> int:
+    logger.info(f"Reading input file from {input_path} in chunks of {chunk_size} bars")
+    chunks = pd.read_csv(input_path, chunksize=chunk_size)
+    if os.path.exists(output_path):
+        os.remove(output_path)
+
+    def write(df: pd.DataFrame):
+        df.to_csv(output_path, mode="a", header=not os.path.exists(output_path), index=False)
+
+    n_rows = engineer_features(chunks, build_pipeline(window), write, max_workers=workers)
+    logger.info(f"Wrote {n_rows} rows to {output_path}")
+    return n_rows
 
 
 
 if __name__ == "__main__":
+    from solvexity.logging import setup_logging
+    setup_logging()
     parser = argparse.ArgumentParser(description="Feature Engineering")
     parser.add_argument("--input", type=str, required=True, help="Input file path")
     parser.add_argument("--output", type=str, required=True, help="Output file path")
+    parser.add_argument("--window", type=int, default=100,
+                        help="Lookback of the rolling features in bars")
+    parser.add_argument("--chunk-size", type=int, default=100_000,
+                        help="Bars read and processed per chunk")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes, defaults to the CPU count")
     args = parser.parse_args()
-    main(args.input, args.output)
-
-
-
+    main(args.input, args.output, args.window, args.chunk_size, args.workers)
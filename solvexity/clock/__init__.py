@@ -0,0 +1,3 @@
+from .clock import Clock, WallClock, EventClock, get_clock, set_clock, use_clock
+
+__all__ = ["Clock", "WallClock", "EventClock", "get_clock", "set_clock", "use_clock"]
@@ -0,0 +1,101 @@
+import asyncio
+import heapq
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class Clock(ABC):
+    """Source of the current time and of sleeps for everything that would read the wall clock"""
+
+    @abstractmethod
+    def time(self) -> float:
+        """Seconds since the epoch"""
+        pass
+
+    def time_ms(self) -> int:
+        return int(self.time() * 1000)
+
+    @abstractmethod
+    async def sleep(self, seconds: float):
+        pass
+
+
+class WallClock(Clock):
+    def time(self) -> float:
+        return time.time()
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+
+class EventClock(Clock):
+    """
+    Time that only moves when events move it, such as the timestamps of replayed trades.
+
+    `advance` never goes backwards, so late events leave the time untouched. A `sleep`
+    returns as soon as the clock has been advanced past its deadline, however little real
+    time that took; sleepers are kept in a heap, so waking them is O(log n) each.
+    """
+
+    def __init__(self, start_ms: int = 0):
+        self._now_ms = start_ms
+        self._sleepers: list[tuple[float, int, asyncio.Future]] = []
+        self._seq = 0
+
+    def time(self) -> float:
+        return self._now_ms / 1000
+
+    def time_ms(self) -> int:
+        return self._now_ms
+
+    @property
+    def n_sleeping(self) -> int:
+        return len(self._sleepers)
+
+    def advance(self, now_ms: int) -> int:
+        """Move the time to `now_ms` if later and wake the sleeps due; returns how many woke"""
+        if now_ms > self._now_ms:
+            self._now_ms = now_ms
+        woken = 0
+        while len(self._sleepers) > 0 and self._sleepers[0][0] <= self._now_ms:
+            _, _, future = heapq.heappop(self._sleepers)
+            if not future.done():
+                future.set_result(None)
+                woken += 1
+        return woken
+
+    async def sleep(self, seconds: float):
+        deadline_ms = self._now_ms + seconds * 1000
+        if deadline_ms <= self._now_ms:
+            await asyncio.sleep(0)
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._seq += 1
+        heapq.heappush(self._sleepers, (deadline_ms, self._seq, future))
+        await future
+
+
+_clock: Clock = WallClock()
+
+
+def get_clock() -> Clock:
+    """The process-wide clock, the wall clock unless replaced"""
+    return _clock
+
+
+def set_clock(clock: Clock) -> Clock:
+    """Replace the process-wide clock; returns the previous one"""
+    global _clock
+    previous, _clock = _clock, clock
+    return previous
+
+
+@contextmanager
+def use_clock(clock: Clock) -> Iterator[Clock]:
+    previous = set_clock(clock)
+    try:
+        yield clock
+    finally:
+        set_clock(previous)
@@ -1,11 +1,12 @@
-import time
 import uuid
 from typing import Any
 
 from pydantic import BaseModel, Field
 
+from solvexity.clock import get_clock
+
 
 class Event(BaseModel):
-    time_ms: int = Field(default_factory=lambda: int(time.time() * 1000))
+    time_ms: int = Field(default_factory=lambda: get_clock().time_ms())
     uid: str = Field(default_factory=lambda: str(uuid.uuid4()))
     data: Any
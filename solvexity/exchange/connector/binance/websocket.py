@@ -1,11 +1,11 @@
 import asyncio
 import json
 import logging
-import time
 from typing import AsyncGenerator, Dict, Optional
 
 import websockets
 
+from solvexity.clock import Clock, get_clock
 from solvexity.connector.binance.rest import BinanceRestClient
 
 logger = logging.getLogger(__name__)
@@ -17,11 +17,13 @@ class BinanceUserDataStream:
         api_secret: str,
         use_testnet: bool = False,
         max_retries: int = 5,
+        clock: Clock | None = None,
     ):
         self.ws_url = "wss://stream.binance.com/ws/"
         if use_testnet:
             self.ws_url = "wss://testnet.binance.vision/ws/"
         self.max_retries = max_retries
+        self.clock = clock if clock is not None else get_clock()
         self._api_key = api_key
         self._api_secret = api_secret
         self._use_testnet = use_testnet
@@ -60,7 +62,7 @@ class BinanceUserDataStream:
         """Background task to keep the listen key alive every 30 minutes."""
         while True:
             try:
-                await asyncio.sleep(30 * 60)  # 30 minutes
+                await self.clock.sleep(30 * 60)  # 30 minutes
                 await self.rest_client.keep_alive_listen_key(listen_key)
                 logger.debug(f"Keep alive sent for listen key: {listen_key}")
             except asyncio.CancelledError:
@@ -103,14 +105,14 @@ class BinanceUserDataStream:
                     retry_count = 0  # Reset retry count on successful connection
 
                     # Record connection start time
-                    connection_start = time.time()
+                    connection_start = self.clock.time()
                     logger.info(
                         f"Connection started at {connection_start} for {ws_url}"
                     )
 
                     # Start connection timeout task
                     async def connection_timeout():
-                        await asyncio.sleep(max_connection_time)
+                        await self.clock.sleep(max_connection_time)
                         logger.info(
                             f"Connection timeout reached for {ws_url} (23h 55m), closing connection for reconnection"
                         )
@@ -121,7 +123,7 @@ class BinanceUserDataStream:
                     try:
                         async for message in ws:
                             # Check if we need to reconnect due to time limit
-                            current_time = time.time()
+                            current_time = self.clock.time()
                             connection_duration = current_time - connection_start
 
                             if connection_duration >= max_connection_time:
@@ -171,7 +173,7 @@ class BinanceUserDataStream:
                     retry_count += 1
                     delay = base_delay * (2 ** (retry_count - 1))  # Exponential backoff
                     logger.info(f"Retrying connection in {delay} seconds...")
-                    await asyncio.sleep(delay)
+                    await self.clock.sleep(delay)
                 else:
                     logger.error(
                         f"Max retries ({self.max_retries}) reached for {ws_url}. Stopping reconnection attempts.",
@@ -197,7 +199,7 @@ class BinanceUserDataStream:
                     retry_count += 1
                     delay = base_delay * (2 ** (retry_count - 1))
                     logger.info(f"Retrying connection in {delay} seconds...")
-                    await asyncio.sleep(delay)
+                    await self.clock.sleep(delay)
                 else:
                     logger.error(
                         f"Max retries ({self.max_retries}) reached for {ws_url}. Stopping reconnection attempts.",
@@ -253,11 +255,13 @@ class BinanceMarketDataStream:
         self,
         use_testnet: bool = False,
         max_retries: int = 5,
+        clock: Clock | None = None,
     ):
         self.ws_url = "wss://stream.binance.com/ws/"
         if use_testnet:
             self.ws_url = "wss://testnet.binance.vision/ws/"
         self.max_retries = max_retries
+        self.clock = clock if clock is not None else get_clock()
 
     async def _websocket_stream(self, ws_url: str) -> AsyncGenerator[Dict, None]:
         """Async generator that yields messages from a websocket connection with retry logic"""
@@ -275,7 +279,7 @@ class BinanceMarketDataStream:
                     retry_count = 0  # Reset retry count on successful connection
 
                     # Record connection start time
-                    connection_start = time.time()
+                    connection_start = self.clock.time()
                     logger.info(
                         f"Connection started at {connection_start} for {ws_url}"
                     )
@@ -284,7 +288,7 @@ class BinanceMarketDataStream:
 
                     # Start connection timeout task
                     async def connection_timeout():
-                        await asyncio.sleep(max_connection_time)
+                        await self.clock.sleep(max_connection_time)
                         logger.info(
                             f"Connection timeout reached for {ws_url} (23h 55m), closing connection for reconnection"
                         )
@@ -295,7 +299,7 @@ class BinanceMarketDataStream:
                     try:
                         async for message in ws:
                             # Check if we need to reconnect due to time limit
-                            current_time = time.time()
+                            current_time = self.clock.time()
                             connection_duration = current_time - connection_start
 
                             if connection_duration >= max_connection_time:
@@ -339,7 +343,7 @@ class BinanceMarketDataStream:
                     retry_count += 1
                     delay = base_delay * (2 ** (retry_count - 1))  # Exponential backoff
                     logger.info(f"Retrying connection in {delay} seconds...")
-                    await asyncio.sleep(delay)
+                    await self.clock.sleep(delay)
                 else:
                     logger.error(
                         f"Max retries ({self.max_retries}) reached for {ws_url}. Stopping reconnection attempts.",
@@ -359,7 +363,7 @@ class BinanceMarketDataStream:
                     retry_count += 1
                     delay = base_delay * (2 ** (retry_count - 1))
                     logger.info(f"Retrying connection in {delay} seconds...")
-                    await asyncio.sleep(delay)
+                    await self.clock.sleep(delay)
                 else:
                     logger.error(
                         f"Max retries ({self.max_retries}) reached for {ws_url}. Stopping reconnection attempts.",
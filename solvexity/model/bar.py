@@ -67,6 +67,20 @@ class Bar(BaseModel):
         self.taker_buy_quote_asset_volume += other.price * other.quantity if other.side == Side.SIDE_BUY else 0
         return self
     
+    def merge(self, other: 'Bar') -> 'Bar':
+        """Fold a later, contiguous bar of the same symbol into this one"""
+        self.current_id = other.current_id
+        self.next_id = other.next_id
+        self.high = max(self.high, other.high)
+        self.low = min(self.low, other.low)
+        self.close = other.close
+        self.volume += other.volume
+        self.quote_volume += other.quote_volume
+        self.number_of_trades += other.number_of_trades
+        self.taker_buy_base_asset_volume += other.taker_buy_base_asset_volume
+        self.taker_buy_quote_asset_volume += other.taker_buy_quote_asset_volume
+        return self
+
     def enclose(self, timestamp: int):
         self.close_time = timestamp
         self.is_closed = True
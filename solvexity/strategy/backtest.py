@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Offline replay of the osiris pipeline.
+
+Trades from recordings or a columnar tape go through the same `OsirisEngine` as live:
+reorder buffer, aggregator and analytics, dispatched synchronously without an event loop.
+During a run the process clock is an `EventClock` at the event time of the latest trade
+plus `latency_ms`, so the `recv_window` check, event stamps and clock sleeps see simulated
+time and a replay emits exactly the signals osiris would have published once live.
+
+    python -m solvexity.strategy.backtest --config config/osiris.yml --files trades.bin
+"""
+
+import argparse
+import logging
+import sys
+import time
+from typing import Callable, Iterable, Iterator
+import pandas as pd
+from pydantic import BaseModel
+from solvexity.clock import EventClock, use_clock
+from solvexity.model.bar import Bar
+from solvexity.model.shared import Exchange, Instrument, Side
+from solvexity.model.trade import Trade
+from solvexity.playback.serde.iterator import TradeIterator
+from solvexity.toolbox.aggregator import BarSpec, BarType, ReorderBuffer, TradeArrays
+from solvexity.toolbox.aggregator.checkpoint import load_checkpoint_file
+from solvexity.strategy.engine import OsirisEngine
+
+logger = logging.getLogger(__name__)
+
+
+class Signal(BaseModel):
+    next_id: int
+    close_time: int
+    time_ms: int
+    values: dict[str, float]
+
+
+class BacktestResult:
+    def __init__(self, bars: list[Bar], signals: list[Signal], n_trades: int, elapsed_s: float):
+        self.bars = bars
+        self.signals = signals
+        self.n_trades = n_trades
+        self.elapsed_s = elapsed_s
+
+    @property
+    def trades_per_minute(self) -> float:
+        return self.n_trades / self.elapsed_s * 60 if self.elapsed_s > 0 else float("inf")
+
+    def bars_frame(self) -> pd.DataFrame:
+        return pd.DataFrame([bar.model_dump() for bar in self.bars])
+
+    def signals_frame(self) -> pd.DataFrame:
+        return pd.DataFrame([{"next_id": s.next_id, "close_time": s.close_time,
+                              "time_ms": s.time_ms, **s.values}
+                             for s in self.signals])
+
+
+def trades_of(arrays: TradeArrays, exchange: Exchange, instrument: Instrument) -> Iterator[Trade]:
+    """Trades of a columnar tape, built without validation since the columns already are"""
+    sides = {int(side): side for side in Side}
+    for id, price, quantity, timestamp, side in zip(arrays.ids.tolist(), arrays.prices.tolist(),
+                                                    arrays.quantities.tolist(),
+                                                    arrays.timestamps.tolist(),
+                                                    arrays.sides.tolist()):
+        yield Trade.model_construct(id=id, exchange=exchange, instrument=instrument,
+                                    symbol=arrays.symbol, side=sides[side], price=price,
+                                    quantity=quantity, timestamp=timestamp)
+
+
+class Backtest:
+    """
+    Replays trades through an `OsirisEngine`, recording every closed bar and every signal.
+
+    `on_signal` callbacks run synchronously on each signal, in place of the event bus
+    subscribers live. Loggers in `quiet` only emit warnings and above during `run`.
+    """
+
+    def __init__(self, engine: OsirisEngine, latency_ms: int = 0,
+                 quiet: tuple[str, ...] = ("solvexity.toolbox.aggregator",)):
+        self.engine = engine
+        self.latency_ms = latency_ms
+        self.quiet = quiet
+        self.clock = EventClock()
+        self.on_signal: list[Callable[[Bar, Signal], None]] = []
+        self.bars: list[Bar] = []
+        self.signals: list[Signal] = []
+        engine.on_closed.append(self._record_bar)
+
+    def _record_bar(self, bar: Bar, values: dict[str, float]):
+        # Copied since a repair of the aggregator may still rewrite a closed bar
+        self.bars.append(bar.model_copy())
+
+    def _emit(self, bar: Bar):
+        if not self.engine.is_fresh(bar):
+            return
+        signal = Signal(next_id=bar.next_id, close_time=bar.close_time,
+                        time_ms=self.clock.time_ms(), values=dict(self.engine.values))
+        self.signals.append(signal)
+        for callback in self.on_signal:
+            callback(bar, signal)
+
+    def run(self, trades: Iterable[Trade]) -> BacktestResult:
+        levels = {}
+        for name in self.quiet:
+            log = logging.getLogger(name)
+            levels[name] = log.level
+            log.setLevel(max(log.getEffectiveLevel(), logging.WARNING))
+        ingest = self.engine.ingest
+        advance = self.clock.advance
+        latency_ms = self.latency_ms
+        n_trades = 0
+        start = time.perf_counter()
+        try:
+            with use_clock(self.clock):
+                for trade in trades:
+                    n_trades += 1
+                    advance(trade.timestamp + latency_ms)
+                    if bar := ingest(trade):
+                        self._emit(bar)
+                # Like osiris at shutdown: trades still held for reordering are dropped, not flushed
+                self.engine.reorder.discard()
+        finally:
+            for name, level in levels.items():
+                logging.getLogger(name).setLevel(level)
+        elapsed = time.perf_counter() - start
+        logger.info(f"Replayed {n_trades} trades into {len(self.bars)} bars and "
+                    f"{len(self.signals)} signals in {elapsed:.2f}s")
+        return BacktestResult(self.bars, self.signals, n_trades, elapsed)
+
+    def run_files(self, filenames: list[str]) -> BacktestResult:
+        return self.run(TradeIterator().replay_from_files(filenames))
+
+    def run_arrays(self, arrays: TradeArrays, exchange: Exchange,
+                   instrument: Instrument) -> BacktestResult:
+        return self.run(trades_of(arrays, exchange, instrument))
+
+
+def main() -> int:
+    from solvexity.strategy.config import OsirisConfig
+
+    parser = argparse.ArgumentParser(
+        description="Replay recorded trades through the osiris pipeline"
+    )
+    parser.add_argument("--config", type=str, default="config/osiris.yml",
+                        help="osiris configuration file")
+    parser.add_argument("--files", type=str, nargs="+", required=True,
+                        help="Recorded trade files, in order")
+    parser.add_argument("--checkpoint", type=str, default=None,
+                        help="Aggregator checkpoint to take the bar spec from, "
+                             "osiris's deserialize_from by default")
+    parser.add_argument("--latency-ms", type=int, default=0,
+                        help="Simulated delivery latency of each trade")
+    parser.add_argument("--bars", type=str, default=None,
+                        help="Write the closed bars to this CSV file")
+    parser.add_argument("--signals", type=str, default=None,
+                        help="Write the signals to this CSV file")
+    args = parser.parse_args()
+
+    config = OsirisConfig.from_yaml(args.config)
+    bar_type = BarType.from_str(config.aggregator.type)
+    # Bars as osiris builds them: the spec of the checkpoint it starts from, replayed from no bars
+    restored = load_checkpoint_file(args.checkpoint or config.aggregator.deserialize_from, bar_type)
+    engine = OsirisEngine(
+        BarSpec.of(restored, bar_type).create(),
+        reorder=ReorderBuffer(max_id_distance=config.aggregator.reorder_window_trades,
+                              max_delay_ms=config.aggregator.reorder_window_ms),
+        recv_window=config.alpha.recv_window
+    )
+    result = Backtest(engine, latency_ms=args.latency_ms).run_files(args.files)
+    logger.info(f"{result.trades_per_minute:,.0f} trades per minute")
+    if args.bars:
+        result.bars_frame().to_csv(args.bars, index=False)
+    if args.signals:
+        result.signals_frame().to_csv(args.signals, index=False)
+    return 0
+
+
+if __name__ == "__main__":
+    from solvexity.logging import setup_logging
+    setup_logging()
+    sys.exit(main())
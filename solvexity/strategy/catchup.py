@@ -0,0 +1,58 @@
+import logging
+from typing import Callable
+from solvexity.clock import get_clock
+
+logger = logging.getLogger(__name__)
+
+
+def _process_time() -> float:
+    return get_clock().time()
+
+
+class CatchUpGate:
+    """
+    Decides when a replaying consumer has caught up with the live stream.
+
+    The stream is live once a message is at most `max_lag_ms` behind the clock and, when
+    the consumer reports it, at most `max_pending` messages are left to deliver. The
+    decision latches: a burst of lag after going live does not re-enter catch-up. Between
+    `begin()` and going live the `quiet` loggers only emit warnings and above. `clock`
+    defaults to the process clock.
+    """
+
+    def __init__(self, max_lag_ms: int = 5000, max_pending: int = 0, quiet: tuple[str, ...] = (),
+                 clock: Callable[[], float] | None = None):
+        if clock is None:
+            clock = _process_time
+        self.max_lag_ms = max_lag_ms
+        self.max_pending = max_pending
+        self.quiet = quiet
+        self.clock = clock
+        self.live = False
+        self.n_replayed = 0
+        self._started_at = clock()
+        self._levels: dict[str, int] = {}
+
+    def begin(self):
+        self._started_at = self.clock()
+        for name in self.quiet:
+            log = logging.getLogger(name)
+            self._levels[name] = log.level
+            log.setLevel(max(log.getEffectiveLevel(), logging.WARNING))
+
+    def observe(self, event_time_ms: int, pending: int | None = None) -> bool:
+        """Record one replayed message; returns True on the message that goes live"""
+        if self.live:
+            return False
+        self.n_replayed += 1
+        lag_ms = self.clock() * 1000 - event_time_ms
+        if lag_ms > self.max_lag_ms or (pending is not None and pending > self.max_pending):
+            return False
+        self.live = True
+        for name, level in self._levels.items():
+            logging.getLogger(name).setLevel(level)
+        self._levels.clear()
+        elapsed = self.clock() - self._started_at
+        logger.info(f"Caught up after replaying {self.n_replayed} messages in {elapsed:.1f}s "
+                    f"(lag {lag_ms:.0f} ms)")
+        return True
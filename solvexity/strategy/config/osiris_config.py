@@ -10,6 +10,10 @@ class AggregatorConfig(BaseModel):
     type: str = "quote_volume"
     serialize_to: str = ""
     deserialize_from: str = ""
+    checkpoint_every_bars: int = 0
+    checkpoint_every_seconds: float = 0
+    reorder_window_trades: int = 0
+    reorder_window_ms: int = 0
     
 class ConsumerConfig(BaseModel):
     nats_url: str = "nats://localhost:4222"
@@ -35,6 +39,14 @@ class ConsumerConfig(BaseModel):
 class AlphaConfig(BaseModel):
     recv_window: int = 5000
 
+class FeatureConfig(BaseModel):
+    store_to: str = ""
+
+class CatchUpConfig(BaseModel):
+    enabled: bool = True
+    max_lag_ms: int = 5000
+    max_pending: int = 0
+
 
 
 class OsirisConfig(BaseModel):
@@ -42,6 +54,8 @@ class OsirisConfig(BaseModel):
     aggregator: AggregatorConfig
     consumer: ConsumerConfig
     alpha: AlphaConfig
+    catchup: CatchUpConfig = CatchUpConfig()
+    features: FeatureConfig = FeatureConfig()
 
     @classmethod
     def from_yaml(cls, yaml_path: str, substitute_env: bool = True) -> "OsirisConfig":
@@ -59,8 +73,12 @@ class OsirisConfig(BaseModel):
             ```yaml
             aggregator:
               type: quote_volume
-              serialize_to: ./artifacts/aggregator.json
-              deserialize_from: ./artifacts/aggregator.json
+              serialize_to: ./artifacts/aggregator.ckpt
+              deserialize_from: ./artifacts/aggregator.ckpt
+              checkpoint_every_bars: 100
+              checkpoint_every_seconds: 60
+              reorder_window_trades: 100
+              reorder_window_ms: 1000
             consumer:
               nats_url: nats://localhost:4222
               stream: TRADE
@@ -68,6 +86,12 @@ class OsirisConfig(BaseModel):
               filter_subject: trade.binance.spot.btcusdt
             alpha:
               recv_window: 5000
+            catchup:
+              enabled: true
+              max_lag_ms: 5000
+              max_pending: 0
+            features:
+              store_to: ./artifacts/features
             ```
         """
         config_dict = yml_to_dict(yaml_path, substitute_env=substitute_env)
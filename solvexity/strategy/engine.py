@@ -0,0 +1,101 @@
+import logging
+from typing import Callable, Protocol
+from solvexity.clock import get_clock
+from solvexity.model.bar import Bar
+from solvexity.model.trade import Trade
+from solvexity.toolbox.aggregator import BarAggregator, BarKey, ReorderBuffer, next_bar_key
+from solvexity.toolbox.analytics import DrawdownMomentum
+
+logger = logging.getLogger(__name__)
+
+
+class BarAnalytics(Protocol):
+    def on_bar(self, bar: Bar) -> dict[str, float]: ...
+
+
+class OsirisEngine:
+    """
+    The synchronous per-trade path of osiris: reorder buffer, aggregator and one analytics
+    update per closed bar.
+
+    osiris drives it from JetStream and the backtester from recorded trades, so both build
+    the same bars and signals from the same input. The `recv_window` check reads the
+    process clock: wall time live, trade event time in a backtest. `on_closed` callbacks
+    receive every newly closed bar with the analytics values after it; `bar_key` is the
+    (next_id, seq) key of that bar. New bars are found by their index in the aggregator's
+    buffer, so bars sharing a `next_id` are each applied once. Keys restored from a buffer
+    start counting `seq` at its oldest bar.
+    """
+
+    def __init__(self, aggregator: BarAggregator, analytics: BarAnalytics | None = None,
+                 reorder: ReorderBuffer | None = None, recv_window: int = 5000):
+        self.aggregator = aggregator
+        if analytics is None:
+            analytics = DrawdownMomentum("close", window=aggregator.buf_size)
+        self.analytics = analytics
+        self.reorder = reorder if reorder is not None else ReorderBuffer(
+            next_id=aggregator.bars[-1].next_id if aggregator.size() > 0 else None
+        )
+        self.recv_window = recv_window
+        self.on_closed: list[Callable[[Bar, dict[str, float]], None]] = []
+        self.values: dict[str, float] = {}
+        self.bar_key: BarKey | None = None
+        # Buffer index after the last bar applied
+        self._end = aggregator.bars.start
+        # Seed the analytics with the bars the aggregator was restored with
+        for index, bar in enumerate(aggregator.bars, aggregator.bars.start):
+            if bar.is_closed:
+                self.values = self.analytics.on_bar(bar)
+                self.bar_key = next_bar_key(self.bar_key, bar)
+                self._end = index + 1
+
+    def ingest(self, trade: Trade) -> Bar | None:
+        """Feed a trade to the aggregator; returns the last closed bar if new with a full buffer"""
+        for released in self.reorder.push(trade):
+            self.aggregator.on_trade(released)
+        return self._collect()
+
+    def flush(self) -> Bar | None:
+        """Release the trades still held for reordering into the aggregator"""
+        for released in self.reorder.flush():
+            self.aggregator.on_trade(released)
+        return self._collect()
+
+    def close_until(self, now_ms: int, emit_empty: bool = False) -> Bar | None:
+        """
+        Close time bars on the clock, see `TimeBarAggregator.close_until`. Empty bars share
+        the `next_id` of the last traded bar and get the following `seq` in `bar_key`.
+        """
+        self.aggregator.close_until(now_ms, emit_empty)
+        return self._collect()
+
+    def _collect(self) -> Bar | None:
+        bars = self.aggregator.bars
+        closed = []
+        for position in range(len(bars) - 1, max(self._end - bars.start, 0) - 1, -1):
+            if bars[position].is_closed:
+                closed.append(bars[position])
+        if len(closed) == 0:
+            return None
+        # Only the last bar can still be open
+        self._end = bars.end if bars[-1].is_closed else bars.end - 1
+        for bar in reversed(closed):
+            self.values = self.analytics.on_bar(bar)
+            self.bar_key = next_bar_key(self.bar_key, bar)
+            for callback in self.on_closed:
+                callback(bar, self.values)
+        if self.aggregator.size() != self.aggregator.buf_size:
+            return None
+        return closed[0]
+
+    def is_fresh(self, bar: Bar, now_ms: int | None = None) -> bool:
+        """
+        Whether a bar closed within `recv_window` of `now_ms`, by default the clock; stale
+        bars are not acted on
+        """
+        if now_ms is None:
+            now_ms = get_clock().time_ms()
+        if bar.close_time < now_ms - self.recv_window:
+            logger.info(f"Close time {bar.close_time} is less than {now_ms - self.recv_window}")
+            return False
+        return True
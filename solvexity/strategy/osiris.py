@@ -1,5 +1,5 @@
 import asyncio
-import json
+import contextlib
 import logging
 import signal
 import sys
@@ -14,9 +14,17 @@ from solvexity.strategy.config import OsirisConfig
 from solvexity.logging import setup_logging
 from solvexity.model.trade import Trade
 import solvexity.strategy as strategy
-from solvexity.toolbox.aggregator import (
-    AggregatorFactory,
-    BarType
+from solvexity.strategy.catchup import CatchUpGate
+from solvexity.strategy.engine import OsirisEngine
+from solvexity.model.bar import Bar
+from solvexity.toolbox.aggregator import BarType, ReorderBuffer
+from solvexity.toolbox.analytics import DrawdownMomentum
+from solvexity.toolbox.aggregator.manager import BarSpec
+from solvexity.toolbox.features import FeatureStore, FeatureWriter, definition_of
+from solvexity.toolbox.aggregator.checkpoint import (
+    CheckpointWriter,
+    load_checkpoint_file,
+    save_checkpoint
 )
 from solvexity.eventbus import EventBus
 from solvexity.eventbus.event import Event
@@ -106,6 +114,14 @@ async def cleanup_consumer(js, stream_name: str, consumer_name: str):
     except Exception as e:
         logger.error(f"Failed to remove JetStream consumer {consumer_name}: {e}")
 
+
+def pending_of(msg: Msg) -> int | None:
+    """Messages left in the stream for this consumer, None if the message is not from JetStream"""
+    try:
+        return msg.metadata.num_pending
+    except Exception:
+        return None
+
 async def main(config_path: str = "config/osiris.json"):
     # Load configuration
 
@@ -121,56 +137,79 @@ async def main(config_path: str = "config/osiris.json"):
     # Set up signal handlers
     signal.signal(signal.SIGINT, signal_handler(shutdown_event))
     signal.signal(signal.SIGTERM, signal_handler(shutdown_event))
-    with open(config.aggregator.deserialize_from, "r") as f:
-        bar_type = BarType.from_str(config.aggregator.type)
-        aggregator = AggregatorFactory.from_dict(bar_type, json.load(f))
+    bar_type = BarType.from_str(config.aggregator.type)
+    aggregator = load_checkpoint_file(config.aggregator.deserialize_from, bar_type)
+    checkpoint = CheckpointWriter(
+        config.aggregator.serialize_to,
+        aggregator,
+        every_bars=config.aggregator.checkpoint_every_bars,
+        every_seconds=config.aggregator.checkpoint_every_seconds
+    )
+    checkpoint_task = None
+    engine = OsirisEngine(
+        aggregator,
+        # Drawdown and runup momentum over the buffer, updated once per closed bar
+        DrawdownMomentum("close", window=aggregator.buf_size),
+        ReorderBuffer(
+            max_id_distance=config.aggregator.reorder_window_trades,
+            max_delay_ms=config.aggregator.reorder_window_ms,
+            next_id=aggregator.bars[-1].next_id if aggregator.size() > 0 else None
+        ),
+        recv_window=config.alpha.recv_window
+    )
+    momentum = engine.analytics
     
     nc = None
     js = None
     consumer_created = False
     eb = EventBus()
     
-    bar_id = 0
+    gate = CatchUpGate(
+        max_lag_ms=config.catchup.max_lag_ms,
+        max_pending=config.catchup.max_pending,
+        quiet=("solvexity.toolbox.aggregator",)
+    )
+
+    features: FeatureWriter | None = None
+    def open_features(trade: Trade) -> FeatureWriter:
+        spec = BarSpec.of(aggregator, bar_type)
+        market = (trade.exchange, trade.instrument, trade.symbol)
+        return FeatureStore(config.features.store_to).writer(
+            market, spec, momentum.outputs, definition_of(momentum)
+        )
+
+    def on_closed(bar: Bar, value: dict[str, float]):
+        if features is not None:
+            features.append(engine.bar_key, value)
+        checkpoint.on_bar()
+
+    engine.on_closed.append(on_closed)
+
+    def ingest(trade: Trade) -> Bar | None:
+        """Feed a trade to the engine; returns the last closed bar if new with a full buffer"""
+        nonlocal features
+        if features is None and config.features.store_to:
+            features = open_features(trade)
+        return engine.ingest(trade)
+
+    async def publish_bar(bar: Bar):
+        if engine.is_fresh(bar):
+            await eb.publish("on_momentum", Event(data=engine.values))
+
     async def on_trade(e: Event):
-        aggregator.on_trade(e.data)
-        nonlocal bar_id
-        if aggregator.size() != aggregator.buf_size:
-            return
-        if bar := aggregator.last(is_closed=True):
-            if bar_id != bar.next_id:
-                logger.info(f"New bar: {bar}")
-                bar_id = bar.next_id
-            else: # same bar
-                return
-            if bar.close_time < int(time.time() * 1000) - config.alpha.recv_window:
-                logger.info(f"Close time {bar.close_time} is less than {int(time.time() * 1000) - config.alpha.recv_window}")
-                return
-            df = aggregator.to_dataframe(is_closed=True)
-            await eb.publish("on_dataframe", Event(data=df))
+        if bar := ingest(e.data):
+            logger.info(f"New bar: {bar}")
+            await publish_bar(bar)
 
     eb.subscribe("on_trade", on_trade)
 
-    async def on_dataframe(e: Event):
-        df = e.data
-        logger.info(f"Dataframe: {df.shape}")
-        df["cummax.close"] = df["close"].cummax()
-        df["drawdown.close"] = (df["cummax.close"] - df["close"]) / df["cummax.close"]
-        drawdown_momentum = np.sum(df["drawdown.close"] ** 2)
-        logger.info(f"Drawdown momentum: {drawdown_momentum}")
-        df["cummin.close"] = df["close"].cummin()
-        df["runup.close"] = (df["close"] - df["cummin.close"]) / df["cummin.close"]
-        runup_momentum = np.sum(df["runup.close"] ** 2)
-        logger.info(f"Runup momentum: {runup_momentum}")
-        ratio = drawdown_momentum / runup_momentum
-        logger.info(f"Ratio: {ratio}")
-        """
-        ref = df.iloc[-1]["close_time"]
-        output_path = Path("./artifacts") / f"dataframe_{ref}.csv"
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        df.to_csv(output_path, index=False)
-        """
-
-    eb.subscribe("on_dataframe", on_dataframe)
+    async def on_momentum(e: Event):
+        value = e.data
+        logger.info(f"Drawdown momentum: {value['close.drawdown_momentum']}")
+        logger.info(f"Runup momentum: {value['close.runup_momentum']}")
+        logger.info(f"Ratio: {value['close.momentum_ratio']}")
+
+    eb.subscribe("on_momentum", on_momentum)
     
     try:
         logger.info(f"Attempting to connect to NATS servers: {config.consumer.nats_url}")
@@ -191,11 +230,30 @@ async def main(config_path: str = "config/osiris.json"):
 
         async def trade_handler(msg: Msg):
             trade = Trade.from_protobuf_bytes(msg.data)
-            await eb.publish("on_trade", Event(data=trade))
-        
+            if gate.live:
+                await eb.publish("on_trade", Event(data=trade))
+                return
+            # Catching up: ingest without logging or alpha, then run alpha once on the latest
+            # bar when live
+            ingest(trade)
+            if gate.observe(trade.timestamp, pending_of(msg)):
+                bar = aggregator.last(is_closed=True)
+                if aggregator.size() == aggregator.buf_size and bar:
+                    logger.info(f"Live at bar: {bar}")
+                    await publish_bar(bar)
+
+        if config.catchup.enabled:
+            gate.begin()
+        else:
+            gate.live = True
+
         # Subscribe to the fanout subject (push-based consumer)
         await nc.subscribe(config.consumer.deliver_subject, cb=trade_handler)
         logger.info(f"Subscribed to {config.consumer.deliver_subject}")
+
+        periodic = checkpoint.every_bars > 0 or checkpoint.every_seconds > 0
+        if config.aggregator.serialize_to and periodic:
+            checkpoint_task = asyncio.create_task(checkpoint.run())
         
         logger.info("Waiting for trade messages... Press Ctrl+C to stop")
         
@@ -208,6 +266,11 @@ async def main(config_path: str = "config/osiris.json"):
         logger.error(f"Full traceback: {traceback.format_exc()}")
     finally:
         logger.info("Entering finally block...")
+        if checkpoint_task:
+            checkpoint_task.cancel()
+            # A snapshot still being written would race the final save of the same file
+            with contextlib.suppress(asyncio.CancelledError):
+                await checkpoint_task
         # Clean up the consumer before closing connection
         if js and consumer_created:
             await cleanup_consumer(js, config.consumer.stream, config.consumer.name)
@@ -216,10 +279,15 @@ async def main(config_path: str = "config/osiris.json"):
             await nc.close()
             logger.info("Disconnected from NATS")
         
+        # Held trades are redelivered from the open bar on restart; releasing them now would
+        # close the bars across their gaps and reset the aggregator before the final save
+        if n_held := engine.reorder.discard():
+            logger.info(f"Discarded {n_held} trades held for reordering")
+        if features is not None:
+            features.close()
         if config.aggregator.serialize_to:
-            with open(config.aggregator.serialize_to, "w") as f:
-                json.dump(aggregator.to_dict(), f, indent=4)
-                logger.info(f"Serialized aggregator to {config.aggregator.serialize_to}")
+            save_checkpoint(aggregator, config.aggregator.serialize_to)
+            logger.info(f"Serialized aggregator to {config.aggregator.serialize_to}")
         
         logger.info("Shutdown complete")
 
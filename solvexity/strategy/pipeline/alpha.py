@@ -1,33 +1,386 @@
+import asyncio
 import logging
+import time
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing import shared_memory
 from typing import Callable
+import numpy as np
 import pandas as pd
+from solvexity.model.bar import Bar
 from solvexity.model.trade import Trade
-from solvexity.toolbox.analytics import Analytics
+from solvexity.toolbox.analytics import Analytics, IncrementalAnalytics
 from solvexity.eventbus.eventbus import EventBus
 from solvexity.eventbus.event import Event
 
 logger = logging.getLogger(__name__)
-    
+
 class Flow:
-    def __init__(self, name: str, analytics: Analytics, result_to: str):
+    def __init__(self, name: str, analytics: Analytics, result_to: str,
+                 inputs: tuple[str, ...] | None = None, outputs: tuple[str, ...] | None = None,
+                 executor: str | None = None):
         self.name = name
         self.analytics = analytics
         self.result_to = result_to
-    
+        self.inputs = tuple(inputs) if inputs is not None else tuple(analytics.inputs)
+        self.outputs = tuple(outputs) if outputs is not None else tuple(analytics.outputs)
+        self.executor = executor if executor is not None else analytics.executor
+        self.lookback = analytics.lookback
+
     def on_dataframe(self, dataframe: pd.DataFrame) -> pd.DataFrame:
         dataframe = self.analytics.on_dataframe(dataframe)
         return dataframe
 
+
+# A row segment (start, keep, stop): the composer runs on rows [start, stop) and rows
+# [keep, stop) of its outputs are kept, the ones before only give them their history
+Segment = tuple[int, int, int]
+
+
+def _compute(composer: Analytics | Flow, frame: pd.DataFrame, outputs: tuple[str, ...],
+             segments: list[Segment]) -> list[dict[str, np.ndarray]]:
+    pieces = []
+    for start, keep, stop in segments:
+        part = frame if (start, stop) == (0, len(frame)) else frame.iloc[start:stop].copy()
+        part = composer.on_dataframe(part)
+        pieces.append({column: part[column].to_numpy(copy=True)[keep - start:]
+                       for column in outputs})
+    return pieces
+
+
+def _run_in_thread(composer: Analytics | Flow, frame: pd.DataFrame, outputs: tuple[str, ...],
+                   segments: list[Segment]) -> tuple[list[dict], float]:
+    start = time.perf_counter()
+    pieces = _compute(composer, frame, outputs, segments)
+    return pieces, time.perf_counter() - start
+
+
+def _run_in_process(composer: Analytics | Flow, shm_name: str, shape: tuple[int, int],
+                    inputs: tuple[str, ...], outputs: tuple[str, ...],
+                    segments: list[Segment]) -> tuple[list[dict], float]:
+    start = time.perf_counter()
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        arrays = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        frame = pd.DataFrame({column: arrays[i] for i, column in enumerate(inputs)}, copy=False)
+        pieces = _compute(composer, frame, outputs, segments)
+        del frame, arrays
+    finally:
+        shm.close()
+    return pieces, time.perf_counter() - start
+
+
+class _Node:
+    __slots__ = ("name", "composer", "inputs", "outputs", "result_to", "executor", "upstream",
+                 "downstream", "lookback", "depth", "cache")
+
+    def __init__(self, name: str, composer: Analytics | Flow):
+        self.name = name
+        self.composer = composer
+        self.inputs = tuple(composer.inputs)
+        self.outputs = tuple(composer.outputs)
+        self.result_to = getattr(composer, "result_to", None)
+        self.executor = getattr(composer, "executor", "thread")
+        if self.executor not in ("thread", "process"):
+            raise ValueError(f"Unknown executor {self.executor} of {name}")
+        self.upstream: list[_Node] = []
+        self.downstream: list[_Node] = []
+        self.lookback: int | None = getattr(composer, "lookback", None)
+        # Rows of bar history an output row depends on through the upstream composers
+        self.depth: int | None = None
+        # Number, input and output columns of the last frame with bar ids it ran on
+        self.cache: tuple[int, dict[str, np.ndarray], dict[str, np.ndarray]] | None = None
+
+    @property
+    def incremental(self) -> IncrementalAnalytics | None:
+        analytics = self.composer.analytics if isinstance(self.composer, Flow) else self.composer
+        return analytics if isinstance(analytics, IncrementalAnalytics) else None
+
+
 class Alpha:
-    def __init__(self, composers: list[Analytics]):
+    """
+    Runs composers as a dependency graph of the columns they declare.
+
+    A composer depends on the composers producing its `inputs`; columns nobody produces
+    are read from the bars. Composers run in topological order and every column is
+    produced once per bar, however many composers consume it. The outputs of each
+    composer are cached per row: when a frame shares bars with the previous one, by
+    `next_id`, and a composer's inputs are unchanged on them, the rows computed before
+    are reused and the composer only runs on the new rows plus its `lookback`. A frame
+    that slid forward also recomputes its first `depth - 1` rows, whose history it cut
+    off. Like chunked feature engineering, reused rows match a full run up to the
+    rounding of window sums. Composers without a bounded lookback are only reused on the
+    same bars, and ones that declare no outputs are never cached.
+
+    `evaluate` runs independent branches of the graph concurrently off the event loop:
+    each composer gets a copy of its input columns on the thread pool, or in shared
+    memory on the process pool, and its outputs are written back on the event loop.
+    Composers without declared outputs run last, one at a time, on the whole frame.
+    The seconds each composer took are kept in `timings`.
+    """
+
+    def __init__(self, composers: list[Analytics | Flow], thread_pool: Executor | None = None,
+                 process_pool: Executor | None = None):
         self.composers = composers
         self.eventbus = EventBus()
-        for composer in self.composers:
-            self.eventbus.subscribe(composer.name, composer.on_dataframe)
-        
+        self.nodes = self._schedule([
+            _Node(getattr(composer, "name", f"{type(composer).__name__}_{i}"), composer)
+            for i, composer in enumerate(composers)
+        ])
+        self.thread_pool = thread_pool
+        self.process_pool = process_pool
+        self._owned_pools: list[Executor] = []
+        self.timings: dict[str, float] = {}
+        for node, depth in zip(self.nodes, self._depths(self.nodes)):
+            node.depth = depth
+        self._next_ids: np.ndarray | None = None
+        self._n_frames = 0
+        self._bar: Bar | None = None
+        self._values: dict[str, float] = {}
+
+    @staticmethod
+    def _schedule(nodes: list[_Node]) -> list[_Node]:
+        producers: dict[str, _Node] = {}
+        for node in nodes:
+            for column in node.outputs:
+                if column in producers:
+                    raise ValueError(f"Column {column} is produced by both "
+                                     f"{producers[column].name} and {node.name}")
+                producers[column] = node
+        n_dependencies: dict[int, int] = {}
+        for node in nodes:
+            upstream = {id(producers[column]): producers[column]
+                        for column in node.inputs if column in producers}
+            upstream.pop(id(node), None)
+            n_dependencies[id(node)] = len(upstream)
+            node.upstream = list(upstream.values())
+            for parent in node.upstream:
+                parent.downstream.append(node)
+
+        # Kahn's algorithm, ties are broken by declaration order
+        ready = deque(node for node in nodes if n_dependencies[id(node)] == 0)
+        order = []
+        while len(ready) > 0:
+            node = ready.popleft()
+            order.append(node)
+            for child in node.downstream:
+                n_dependencies[id(child)] -= 1
+                if n_dependencies[id(child)] == 0:
+                    ready.append(child)
+        if len(order) != len(nodes):
+            cyclic = [node.name for node in nodes if n_dependencies[id(node)] > 0]
+            raise ValueError(f"Composers have a dependency cycle: {cyclic}")
+        return order
+
+    @staticmethod
+    def _depths(nodes: list[_Node]) -> list[int | None]:
+        depth: dict[int, int | None] = {}
+        for node in nodes:
+            upstream = [depth[id(parent)] for parent in node.upstream]
+            if node.lookback is None or None in upstream:
+                depth[id(node)] = None
+            else:
+                depth[id(node)] = node.lookback + max(upstream, default=1) - 1
+        return list(depth.values())
+
+    @property
+    def lookback(self) -> int | None:
+        """Rows of history the last row of the graph depends on, None when unbounded"""
+        depths = [node.depth for node in self.nodes]
+        return None if None in depths else max(depths, default=1)
+
+    def _offset(self, dataframe: pd.DataFrame) -> int | None:
+        """Row of the previous frame the first row of `dataframe` is, if the two share bars"""
+        previous = self._next_ids
+        self._n_frames += 1
+        if len(dataframe) == 0 or "next_id" not in dataframe.columns:
+            self._next_ids = None
+            return None
+        next_ids = self._next_ids = dataframe["next_id"].to_numpy(copy=True)
+        if previous is None:
+            return None
+        for offset in np.flatnonzero(previous == next_ids[0]).tolist():
+            n = min(len(previous) - offset, len(next_ids))
+            if np.array_equal(previous[offset:offset + n], next_ids[:n]):
+                return offset
+        return None
+
+    def _plan(self, node: _Node, dataframe: pd.DataFrame,
+              offset: int | None) -> list[Segment | slice]:
+        """Row segments to compute and slices of the cached rows, in row order"""
+        n = len(dataframe)
+        if offset is None or node.cache is None or node.cache[0] != self._n_frames - 1:
+            return [(0, 0, n)]
+        _, inputs, outputs = node.cache
+        n_shared = min(len(outputs[node.outputs[0]]) - offset, n)
+        for column in node.inputs:
+            shared = dataframe[column].to_numpy()[:n_shared]
+            if not np.array_equal(shared, inputs[column][offset:offset + n_shared], equal_nan=True):
+                return [(0, 0, n)]
+        if offset == 0 and n_shared == n:
+            return [slice(0, n)]
+        if node.depth is None or node.lookback is None:
+            return [(0, 0, n)]
+        head = node.depth - 1 if offset > 0 else 0
+        if head >= n_shared:
+            return [(0, 0, n)]
+        plan: list[Segment | slice] = [(0, 0, head)] if head > 0 else []
+        plan.append(slice(offset + head, offset + n_shared))
+        if n_shared < n:
+            plan.append((max(n_shared - node.lookback + 1, 0), n_shared, n))
+        return plan
+
+    @staticmethod
+    def _assemble(node: _Node, plan: list[Segment | slice],
+                  pieces: list[dict]) -> dict[str, np.ndarray]:
+        pieces = iter(pieces)
+        parts = [{column: node.cache[2][column][part] for column in node.outputs}
+                 if isinstance(part, slice) else next(pieces) for part in plan]
+        if len(parts) == 1:
+            return parts[0]
+        return {column: np.concatenate([part[column] for part in parts]) for column in node.outputs}
+
+    def _remember(self, node: _Node, dataframe: pd.DataFrame, columns: dict[str, np.ndarray]):
+        if self._next_ids is None:
+            node.cache = None
+            return
+        node.cache = (self._n_frames,
+                      {column: dataframe[column].to_numpy(copy=True) for column in node.inputs},
+                      columns)
 
     def on_dataframe(self, dataframe: pd.DataFrame) -> pd.DataFrame:
-        for composer in self.composers:
-            dataframe = composer.on_dataframe(dataframe)
-            self.eventbus.publish(composer.result_to, Event(data=dataframe))
-        return dataframe
\ No newline at end of file
+        offset = self._offset(dataframe)
+        for node in self.nodes:
+            if len(node.outputs) == 0:
+                dataframe = node.composer.on_dataframe(dataframe)
+                continue
+            plan = self._plan(node, dataframe, offset)
+            if plan == [(0, 0, len(dataframe))]:
+                dataframe = node.composer.on_dataframe(dataframe)
+                columns = {column: dataframe[column].to_numpy(copy=True) for column in node.outputs}
+            else:
+                segments = [part for part in plan if not isinstance(part, slice)]
+                columns = self._assemble(node, plan,
+                                         _compute(node.composer, dataframe, node.outputs, segments))
+                for column, values in columns.items():
+                    dataframe[column] = values
+            self._remember(node, dataframe, columns)
+        return dataframe
+
+    def _pool(self, executor: str) -> Executor:
+        if executor == "process":
+            if self.process_pool is None:
+                self.process_pool = ProcessPoolExecutor()
+                self._owned_pools.append(self.process_pool)
+            return self.process_pool
+        if self.thread_pool is None:
+            self.thread_pool = ThreadPoolExecutor(thread_name_prefix="alpha")
+            self._owned_pools.append(self.thread_pool)
+        return self.thread_pool
+
+    async def evaluate(self, dataframe: pd.DataFrame) -> pd.DataFrame:
+        """Run the graph concurrently off the event loop; results match `on_dataframe`"""
+        loop = asyncio.get_running_loop()
+        offset = self._offset(dataframe)
+        n_pending = {id(node): len(node.upstream) for node in self.nodes}
+        running: dict[asyncio.Future, tuple[_Node, list, shared_memory.SharedMemory | None]] = {}
+        sinks: list[_Node] = []
+
+        def dispatch(node: _Node):
+            if len(node.outputs) == 0:
+                sinks.append(node)
+                return
+            plan = self._plan(node, dataframe, offset)
+            segments = [part for part in plan if not isinstance(part, slice)]
+            if len(segments) == 0:
+                finish(node, plan, [], 0.0)
+                return
+            shm = None
+            if node.executor == "process":
+                arrays = dataframe[list(node.inputs)].to_numpy(dtype=np.float64).T
+                shm = shared_memory.SharedMemory(create=True, size=max(arrays.nbytes, 1))
+                np.ndarray(arrays.shape, dtype=np.float64, buffer=shm.buf)[:] = arrays
+                future = loop.run_in_executor(self._pool("process"), _run_in_process, node.composer,
+                                              shm.name, arrays.shape, node.inputs, node.outputs,
+                                              segments)
+            else:
+                frame = dataframe[list(node.inputs)] if len(node.inputs) > 0 else dataframe
+                frame = frame.copy()
+                future = loop.run_in_executor(self._pool("thread"), _run_in_thread, node.composer,
+                                              frame, node.outputs, segments)
+            running[future] = (node, plan, shm)
+
+        def finish(node: _Node, plan: list, pieces: list[dict], elapsed: float):
+            columns = self._assemble(node, plan, pieces)
+            for column, values in columns.items():
+                dataframe[column] = values
+            self._remember(node, dataframe, columns)
+            self.timings[node.name] = elapsed
+            done(node)
+
+        def done(node: _Node):
+            for child in node.downstream:
+                n_pending[id(child)] -= 1
+                if n_pending[id(child)] == 0:
+                    dispatch(child)
+
+        for node in self.nodes:
+            if n_pending[id(node)] == 0:
+                dispatch(node)
+        try:
+            while len(running) > 0:
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for future in finished:
+                    node, plan, shm = running.pop(future)
+                    if shm is not None:
+                        shm.close()
+                        shm.unlink()
+                    pieces, elapsed = future.result()
+                    finish(node, plan, pieces, elapsed)
+        finally:
+            for _, _, shm in running.values():
+                if shm is not None:
+                    shm.close()
+                    shm.unlink()
+
+        for node in sinks:
+            start = time.perf_counter()
+            dataframe = await loop.run_in_executor(self._pool("thread"), node.composer.on_dataframe,
+                                                   dataframe)
+            self.timings[node.name] = time.perf_counter() - start
+        logger.debug(f"Alpha timings: {self.timings}")
+        return dataframe
+
+    def close(self):
+        """Shut down the pools Alpha created itself"""
+        for pool in self._owned_pools:
+            pool.shutdown()
+        self._owned_pools.clear()
+
+    def on_bar(self, bar: Bar) -> dict[str, float]:
+        """
+        Update the incremental composers with a closed bar in dependency order and return
+        every value they produce. A bar is applied once: passing the same bar again returns
+        the cache. Bars of a split trade share their `next_id`, so it is not compared.
+        """
+        if bar is self._bar:
+            return self._values
+        values: dict[str, float] = {}
+        for node in self.nodes:
+            analytics = node.incremental
+            if analytics is None:
+                continue
+            src_col = analytics.src_col
+            x = values[src_col] if src_col in values else getattr(bar, src_col)
+            analytics.update(x)
+            values.update(analytics.value())
+        self._bar = bar
+        self._values = values
+        return values
+
+    async def on_event(self, event: Event):
+        """Run the graph on a published dataframe and publish it to every composer's `result_to`"""
+        dataframe = await self.evaluate(event.data)
+        for node in self.nodes:
+            if node.result_to:
+                await self.eventbus.publish(node.result_to, Event(data=dataframe))
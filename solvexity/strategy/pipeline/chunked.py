@@ -0,0 +1,88 @@
+import logging
+import os
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator
+import pandas as pd
+from solvexity.toolbox.analytics import Analytics
+from .alpha import Alpha, Flow
+
+logger = logging.getLogger(__name__)
+
+_worker_alpha: Alpha | None = None
+
+
+def _init_worker(composers: list[Analytics | Flow]):
+    global _worker_alpha
+    _worker_alpha = Alpha(composers)
+
+
+def _run_chunk(frame: pd.DataFrame, n_overlap: int,
+               composers: list[Analytics | Flow] | None = None) -> pd.DataFrame:
+    alpha = Alpha(composers) if composers is not None else _worker_alpha
+    return alpha.on_dataframe(frame).iloc[n_overlap:].reset_index(drop=True)
+
+
+def overlapping(chunks: Iterable[pd.DataFrame], overlap: int) -> Iterator[tuple[pd.DataFrame, int]]:
+    """Prefix each chunk with the `overlap` rows before it; yields (frame, rows prefixed)"""
+    tail = None
+    for chunk in chunks:
+        if len(chunk) == 0:
+            continue
+        chunk = chunk.reset_index(drop=True)
+        if tail is None or overlap == 0:
+            frame, n_overlap = chunk, 0
+        else:
+            frame, n_overlap = pd.concat([tail, chunk], ignore_index=True), len(tail)
+        yield frame, n_overlap
+        if overlap > 0:
+            tail = frame.iloc[-overlap:].reset_index(drop=True)
+
+
+def engineer_features(chunks: Iterable[pd.DataFrame], composers: list[Analytics | Flow],
+                      write: Callable[[pd.DataFrame], None], pool: Executor | None = None,
+                      max_workers: int | None = None, max_in_flight: int | None = None) -> int:
+    """
+    Run `composers` over a bar stream split into chunks, in bounded memory.
+
+    Each chunk is prefixed with the rows before it that the graph looks back on, so every
+    output row is computed from the same bars as over the whole stream. Window sums are
+    anchored at the start of the frame they run over, so values agree with a whole-stream
+    run up to the rounding of one window, a few ulps, while NaN, exact zeros and extremes
+    are identical. Chunks are computed on a process pool, at most `max_in_flight` at a
+    time, twice `max_workers` by default, and handed to `write` in order. `max_workers`
+    should give the size of a caller's `pool`. Composers must be picklable and have a
+    bounded `lookback`. Returns the rows written.
+    """
+    lookback = Alpha(composers).lookback
+    if lookback is None:
+        raise ValueError("Chunked feature engineering needs composers with a bounded lookback")
+    owned = pool is None
+    if owned:
+        pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                   initargs=(composers,))
+    if max_in_flight is None:
+        max_in_flight = 2 * (max_workers or os.cpu_count() or 1)
+
+    in_flight: deque[Future] = deque()
+    n_rows = 0
+
+    def drain(n: int):
+        nonlocal n_rows
+        while len(in_flight) > n:
+            result = in_flight.popleft().result()
+            write(result)
+            n_rows += len(result)
+
+    try:
+        for i, (frame, n_overlap) in enumerate(overlapping(chunks, lookback - 1)):
+            # A pool of our own has the composers from its initializer, others get them per chunk
+            in_flight.append(pool.submit(_run_chunk, frame, n_overlap,
+                                         None if owned else composers))
+            logger.debug(f"Submitted chunk {i} with {len(frame) - n_overlap} rows")
+            drain(max_in_flight - 1)
+        drain(0)
+    finally:
+        if owned:
+            pool.shutdown(cancel_futures=True)
+    return n_rows
@@ -1,19 +1,12 @@
 from solvexity.model.trade import Trade
 from solvexity.toolbox.aggregator import (
     BarAggregator,
-    BarType, TimeBarAggregator, TickBarAggregator, BaseVolumeBarAggregator, QuoteVolumeBarAggregator
+    BarType, AggregatorFactory
 )
 from solvexity.model.bar import Bar
 
 def get_aggregator(bar_type: BarType, buf_size: int, reference_cutoff: int|float) -> BarAggregator:
-    if bar_type == BarType.TIME:
-        return TimeBarAggregator(buf_size, reference_cutoff)
-    elif bar_type == BarType.TICK:
-        return TickBarAggregator(buf_size, reference_cutoff)
-    elif bar_type == BarType.BASE_VOLUME:
-        return BaseVolumeBarAggregator(buf_size, reference_cutoff)
-    elif bar_type == BarType.QUOTE_VOLUME:
-        return QuoteVolumeBarAggregator(buf_size, reference_cutoff)
+    return AggregatorFactory.create(bar_type, buf_size, reference_cutoff)
 
 class DataframeTrigger:
     def __init__(self, bar_type: BarType, buf_size: int, reference_cutoff: int|float):
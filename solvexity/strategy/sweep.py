@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Parameter sweeps over aggregator and alpha configurations.
+
+Trades are decoded once into columnar `TradeArrays` and placed in one shared memory block
+that every worker process maps without copying. The grid is split by bar spec: a worker
+builds the bars of a spec once with the batch aggregator and then scores every alpha
+parameter set of that spec on them, so a sweep costs one decode plus the aggregation of
+each distinct spec. Scores of all configurations come back as one table.
+
+    python -m solvexity.strategy.sweep --files trades.bin --bar-types quote_volume \\
+        --cutoffs 1e6 5e6 --buf-sizes 50 100 200 -o sweep.csv
+"""
+
+import argparse
+import itertools
+import logging
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+from solvexity.model.shared import Symbol
+from solvexity.playback.serde.iterator import TradeIterator
+from solvexity.toolbox.aggregator import BarSpec, BarType, BatchBarAggregator, TradeArrays
+from solvexity.toolbox.analytics import Analytics, DrawdownMomentum
+from .pipeline import Alpha, Flow
+
+logger = logging.getLogger(__name__)
+
+_TRADE_COLUMNS = (("ids", np.int64), ("prices", np.float64), ("quantities", np.float64),
+                  ("timestamps", np.int64), ("sides", np.int8))
+
+
+class SweepConfig(BaseModel):
+    model_config = {"frozen": True}
+
+    spec: BarSpec
+    params: dict[str, Any] = {}
+
+
+def grid(bar_types: list[BarType], reference_cutoffs: list[int | float], buf_sizes: list[int],
+         **params: list) -> list[SweepConfig]:
+    """Cartesian product of aggregator settings and alpha parameters"""
+    names = list(params)
+    configs = []
+    for bar_type, cutoff, buf_size in itertools.product(bar_types, reference_cutoffs, buf_sizes):
+        spec = BarSpec(type=bar_type, reference_cutoff=cutoff, buf_size=buf_size)
+        for values in itertools.product(*(params[name] for name in names)):
+            configs.append(SweepConfig(spec=spec, params=dict(zip(names, values))))
+    return configs
+
+
+def momentum_alpha(spec: BarSpec, window: int | None = None) -> list[Analytics | Flow]:
+    """The osiris alpha: drawdown momentum over the buffer unless `window` is given"""
+    return [DrawdownMomentum("close", window=window if window is not None else spec.buf_size)]
+
+
+def momentum_score(frame: pd.DataFrame, signal: str = "close.momentum_ratio") -> dict[str, float]:
+    """
+    Bar count, signal coverage and the rank correlation of the signal with the next bar's
+    log return
+    """
+    forward = np.log(frame["close"].shift(-1) / frame["close"])
+    valid = frame[signal].notna() & forward.notna()
+    ic = float("nan")
+    if valid.sum() > 2:
+        ic = frame[signal][valid].rank().corr(forward[valid].rank())
+    return {
+        "n_bars": len(frame),
+        "coverage": float(valid.mean()) if len(frame) > 0 else 0.0,
+        "ic": float(ic),
+    }
+
+
+class SharedTrades:
+    """The columns of a `TradeArrays` in one shared memory block; `handle` lets processes attach"""
+
+    def __init__(self, trades: TradeArrays):
+        n = len(trades)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(n * 8 * len(_TRADE_COLUMNS), 1))
+        self.handle = (self.shm.name, trades.symbol, n)
+        for i, (name, dtype) in enumerate(_TRADE_COLUMNS):
+            column = np.ndarray(n, dtype=dtype, buffer=self.shm.buf, offset=i * n * 8)
+            column[:] = getattr(trades, name)
+
+    def __enter__(self) -> 'SharedTrades':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def attach(handle: tuple[str, Symbol, int]) -> tuple[shared_memory.SharedMemory, TradeArrays]:
+    """Map shared trades without copying; keep the SharedMemory alive while the arrays are used"""
+    name, symbol, n = handle
+    shm = shared_memory.SharedMemory(name=name)
+    columns = [np.ndarray(n, dtype=dtype, buffer=shm.buf, offset=i * n * 8)
+               for i, (_, dtype) in enumerate(_TRADE_COLUMNS)]
+    return shm, TradeArrays(symbol, *columns)
+
+
+_worker_shm: shared_memory.SharedMemory | None = None
+_worker_trades: TradeArrays | None = None
+
+
+def _init_worker(handle: tuple[str, Symbol, int]):
+    global _worker_shm, _worker_trades
+    _worker_shm, _worker_trades = attach(handle)
+
+
+def _run_spec(spec: BarSpec, params: list[dict], alpha: Callable[..., list[Analytics | Flow]],
+              score: Callable[[pd.DataFrame], dict],
+              trades: TradeArrays | None = None) -> list[dict]:
+    trades = trades if trades is not None else _worker_trades
+    aggregator = BatchBarAggregator(spec.type, spec.buf_size, spec.reference_cutoff,
+                                    spec.completeness_threshold)
+    aggregator.on_trades(trades)
+    bars = aggregator.bars().to_dataframe()
+    bars = bars[bars["is_closed"]].reset_index(drop=True)
+    return [score(Alpha(alpha(spec, **p)).on_dataframe(bars.copy())) for p in params]
+
+
+def sweep(trades: TradeArrays, configs: list[SweepConfig],
+          alpha: Callable[..., list[Analytics | Flow]] = momentum_alpha,
+          score: Callable[[pd.DataFrame], dict] = momentum_score,
+          pool: Executor | None = None, max_workers: int | None = None) -> pd.DataFrame:
+    """
+    Score every configuration on the same trades; one row per configuration, in order.
+
+    `alpha(spec, **params)` builds the composers of a configuration and `score(frame)`
+    turns the evaluated bar frame into metrics. Both must be picklable for the default
+    process pool, which reads the trades from shared memory. Any other pool gets them
+    passed with every task. Bars are built in batch with float accumulation, so
+    fixed-point specs are rejected.
+    """
+    groups: dict[BarSpec, list[int]] = {}
+    for i, config in enumerate(configs):
+        if config.spec.fixed_point is not None:
+            raise ValueError(f"Batch aggregation accumulates floats, fixed-point specs are not "
+                             f"supported: {config.spec}")
+        groups.setdefault(config.spec, []).append(i)
+    logger.info(f"Sweeping {len(configs)} configurations over {len(groups)} bar specs "
+                f"and {len(trades)} trades")
+
+    shared = None
+    owned = pool is None
+    try:
+        if owned:
+            shared = SharedTrades(trades)
+            pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                       initargs=(shared.handle,))
+        futures = {
+            spec: pool.submit(_run_spec, spec, [configs[i].params for i in indices], alpha, score,
+                              None if owned else trades)
+            for spec, indices in groups.items()
+        }
+        scores: list[dict | None] = [None] * len(configs)
+        for spec, future in futures.items():
+            for i, result in zip(groups[spec], future.result()):
+                scores[i] = result
+    finally:
+        if owned and pool is not None:
+            pool.shutdown(cancel_futures=True)
+        if shared is not None:
+            shared.close()
+
+    rows = []
+    for config, result in zip(configs, scores):
+        rows.append({"type": config.spec.type.value,
+                     "reference_cutoff": config.spec.reference_cutoff,
+                     "buf_size": config.spec.buf_size, **config.params, **result})
+    return pd.DataFrame(rows)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Score a grid of aggregator configurations on recorded trades"
+    )
+    parser.add_argument("--files", type=str, nargs="+", required=True,
+                        help="Recorded trade files of one market, in order")
+    parser.add_argument("--bar-types", type=str, nargs="+", default=["quote_volume"],
+                        help="Bar types")
+    parser.add_argument("--cutoffs", type=float, nargs="+", required=True, help="Reference cutoffs")
+    parser.add_argument("--buf-sizes", type=int, nargs="+", default=[100],
+                        help="Aggregator buffer sizes")
+    parser.add_argument("--windows", type=int, nargs="+", default=None,
+                        help="Momentum windows, the buffer size if omitted")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes, defaults to the CPU count")
+    parser.add_argument("-o", "--output", type=str, default=None,
+                        help="Write the table to this CSV file")
+    args = parser.parse_args()
+
+    trades = TradeArrays.from_trades(TradeIterator().replay_from_files(args.files))
+    bar_types = [BarType.from_str(bar_type) for bar_type in args.bar_types]
+    cutoffs = [int(cutoff) if cutoff.is_integer() else cutoff for cutoff in args.cutoffs]
+    params = {"window": args.windows} if args.windows else {}
+    table = sweep(trades, grid(bar_types, cutoffs, args.buf_sizes, **params),
+                  max_workers=args.workers)
+    if args.output:
+        table.to_csv(args.output, index=False)
+    else:
+        print(table.to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    from solvexity.logging import setup_logging
+    setup_logging()
+    sys.exit(main())
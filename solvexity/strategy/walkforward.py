@@ -0,0 +1,182 @@
+"""
+Walk-forward evaluation over bars built once.
+
+`BarCache` builds the closed bars of a recording for a bar spec once with the batch
+aggregator and keeps them by (recording md5, bar spec), in memory and optionally on disk,
+so every experiment over the same data and spec reuses them. `WalkForward` splits the bars
+into train and test windows that are zero-copy views and fits and scores the folds in
+parallel, so a fold costs only its model work.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable
+import numpy as np
+import pandas as pd
+from solvexity.model.shared import Symbol
+from solvexity.toolbox.aggregator import BarSpec, BatchBarAggregator, BarColumns, TradeArrays
+from solvexity.toolbox.aggregator.batch import BAR_COLUMNS
+from solvexity.toolbox.aggregator.checkpoint import write_atomic
+from solvexity.toolbox.features.store import spec_path
+
+logger = logging.getLogger(__name__)
+
+
+def recording_md5(filenames: list[str]) -> str:
+    """md5 of the concatenated contents of recording files, in order"""
+    digest = hashlib.md5()
+    for filename in filenames:
+        with open(filename, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+class BarCache:
+    """
+    Closed bars by (recording md5, bar spec), built on first use.
+
+    With a `root`, bars are also stored as `<root>/<md5>/<spec>.npz` and loaded from there
+    by later processes. `load_trades` is only called when the bars are not cached yet.
+    """
+
+    def __init__(self, root: str | None = None):
+        self.root = root
+        self.n_built = 0
+        self._bars: dict[tuple[str, BarSpec], BarColumns] = {}
+
+    def path(self, md5: str, spec: BarSpec) -> str:
+        return os.path.join(self.root, md5, f"{spec_path(spec)}.npz")
+
+    def bars(self, md5: str, spec: BarSpec, load_trades: Callable[[], TradeArrays]) -> BarColumns:
+        _check_float_spec(spec)
+        key = (md5, spec)
+        bars = self._bars.get(key)
+        if bars is not None:
+            return bars
+        if self.root is not None and os.path.exists(self.path(md5, spec)):
+            bars = _load(self.path(md5, spec))
+            logger.info(f"Loaded {len(bars)} bars of {md5} from {self.path(md5, spec)}")
+        else:
+            bars = build_bars(load_trades(), spec)
+            self.n_built += 1
+            logger.info(f"Built {len(bars)} bars of {md5} for {spec}")
+            if self.root is not None:
+                _save(self.path(md5, spec), bars)
+        self._bars[key] = bars
+        return bars
+
+
+def _check_float_spec(spec: BarSpec):
+    if spec.fixed_point is not None:
+        raise ValueError(f"Batch aggregation accumulates floats, fixed-point specs are not "
+                         f"supported: {spec}")
+
+
+def build_bars(trades: TradeArrays, spec: BarSpec) -> BarColumns:
+    _check_float_spec(spec)
+    aggregator = BatchBarAggregator(spec.type, spec.buf_size, spec.reference_cutoff,
+                                    spec.completeness_threshold)
+    aggregator.on_trades(trades)
+    bars = aggregator.bars()
+    closed = bars["is_closed"]
+    return BarColumns(bars.symbol, {name: column[closed] for name, column in bars.columns.items()})
+
+
+def _save(path: str, bars: BarColumns):
+    buffer = io.BytesIO()
+    symbol = json.dumps(bars.symbol.model_dump() if bars.symbol is not None else None)
+    np.savez(buffer, symbol=np.array(symbol), **bars.columns)
+    write_atomic(path, buffer.getvalue())
+
+
+def _load(path: str) -> BarColumns:
+    with np.load(path) as data:
+        symbol = json.loads(str(data["symbol"]))
+        columns = {name: data[name] for name in BAR_COLUMNS}
+    return BarColumns(Symbol.model_validate(symbol) if symbol is not None else None, columns)
+
+
+_worker_bars: BarColumns | None = None
+
+
+def _init_worker(bars: BarColumns):
+    global _worker_bars
+    _worker_bars = bars
+
+
+def _run_fold(split: tuple[int, int, int, int], fit: Callable[[BarColumns], Any],
+              score: Callable[[Any, BarColumns], dict], bars: BarColumns | None = None) -> dict:
+    bars = bars if bars is not None else _worker_bars
+    train_start, train_stop, test_start, test_stop = split
+    model = fit(bars.slice(train_start, train_stop))
+    return score(model, bars.slice(test_start, test_stop))
+
+
+class WalkForward:
+    """
+    Rolling train/test splits of `train_size` then `test_size` bars, advancing `step` bars
+    (`test_size` by default). With `expanding` every train window starts at the first bar.
+    """
+
+    def __init__(self, train_size: int, test_size: int, step: int | None = None,
+                 expanding: bool = False):
+        step = step if step is not None else test_size
+        for name, value in (("train_size", train_size), ("test_size", test_size), ("step", step)):
+            if not isinstance(value, int) or isinstance(value, bool) or value <= 0:
+                raise ValueError(f"{name} must be a positive int, got {value!r}")
+        self.train_size = train_size
+        self.test_size = test_size
+        self.step = step
+        self.expanding = expanding
+
+    def splits(self, n_bars: int) -> list[tuple[int, int, int, int]]:
+        """(train start, train stop, test start, test stop) of every fold that fits in `n_bars`"""
+        splits = []
+        start = 0
+        while start + self.train_size + self.test_size <= n_bars:
+            train_stop = start + self.train_size
+            splits.append((0 if self.expanding else start, train_stop, train_stop,
+                           train_stop + self.test_size))
+            start += self.step
+        return splits
+
+    def run(self, bars: BarColumns, fit: Callable[[BarColumns], Any],
+            score: Callable[[Any, BarColumns], dict], pool: Executor | None = None,
+            max_workers: int | None = None) -> pd.DataFrame:
+        """
+        `fit(train)` and then `score(model, test)` per fold, one row per fold. The default
+        process pool receives the bars once per worker and each fold as four indices;
+        any other pool gets the bars with every fold. `fit` and `score` must be picklable.
+        """
+        splits = self.splits(len(bars))
+        owned = pool is None
+        if owned:
+            pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                       initargs=(bars,))
+        try:
+            shipped = None if owned else bars
+            futures = [pool.submit(_run_fold, split, fit, score, shipped) for split in splits]
+            results = [future.result() for future in futures]
+        finally:
+            if owned:
+                pool.shutdown(cancel_futures=True)
+
+        next_ids = bars["next_id"]
+        rows = []
+        for i, (split, result) in enumerate(zip(splits, results)):
+            train_start, train_stop, test_start, test_stop = split
+            rows.append({
+                "fold": i,
+                "train_start_id": int(bars["start_id"][train_start]),
+                "train_next_id": int(next_ids[train_stop - 1]),
+                "test_start_id": int(bars["start_id"][test_start]),
+                "test_next_id": int(next_ids[test_stop - 1]),
+                **result,
+            })
+        logger.info(f"Evaluated {len(rows)} folds over {len(bars)} bars")
+        return pd.DataFrame(rows)
@@ -1,8 +1,13 @@
 from .bar_aggregator import (
     BarType, BarAggregator, 
     TimeBarAggregator, TickBarAggregator, BaseVolumeBarAggregator, QuoteVolumeBarAggregator,
-    AggregatorFactory
+    AggregatorFactory, FixedPoint, BarBuffer, BarKey, next_bar_key
 )
+from .batch import BatchBarAggregator, TradeArrays, BarColumns
+from .multi_resolution import MultiTimeBarAggregator, RollupBarAggregator
+from .manager import AggregatorManager, BarSpec
+from .reorder import ReorderBuffer
+from .timer import TimingWheel, TimeBarClock
 
 __all__ = [
     "BarType",
@@ -12,4 +17,18 @@ __all__ = [
     "BaseVolumeBarAggregator",
     "QuoteVolumeBarAggregator",
     "AggregatorFactory",
+    "FixedPoint",
+    "BarBuffer",
+    "BarKey",
+    "next_bar_key",
+    "BatchBarAggregator",
+    "TradeArrays",
+    "BarColumns",
+    "MultiTimeBarAggregator",
+    "RollupBarAggregator",
+    "AggregatorManager",
+    "BarSpec",
+    "ReorderBuffer",
+    "TimingWheel",
+    "TimeBarClock",
 ]
\ No newline at end of file
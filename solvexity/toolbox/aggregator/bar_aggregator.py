@@ -4,6 +4,7 @@ from typing import Literal
 from pydantic import BaseModel
 from solvexity.model.trade import Trade
 from solvexity.model.bar import Bar
+from solvexity.model.shared import Side
 from enum import Enum
 import logging
 import pandas as pd
@@ -43,7 +44,43 @@ class Interval(BaseModel):
     def n_trades(self) -> int:
         return self.end_id - self.start_id
 
+class FixedPoint(BaseModel):
+    """Integer units per 1.0 of price and quantity, e.g. 100 for cents and 10**8 for satoshis"""
+    model_config = {"frozen": True}
+
+    price_scale: int
+    quantity_scale: int
+
+    def price_units(self, price: float) -> int:
+        return round(price * self.price_scale)
+
+    def quantity_units(self, quantity: float) -> int:
+        return round(quantity * self.quantity_scale)
+
+
 class AggregatorFactory:
+    @classmethod
+    def create(cls, bar_type: BarType, buf_size: int, reference_cutoff: int | float,
+               completeness_threshold: float = 1.0, repair_window: int = 0,
+               fixed_point: FixedPoint | None = None) -> 'BarAggregator':
+        if fixed_point is not None and bar_type not in (BarType.BASE_VOLUME, BarType.QUOTE_VOLUME):
+            raise ValueError(f"Fixed-point accumulation only applies to volume bars, "
+                             f"not {bar_type}")
+        if bar_type == BarType.TIME:
+            return TimeBarAggregator(buf_size, reference_cutoff, completeness_threshold,
+                                     repair_window)
+        elif bar_type == BarType.TICK:
+            return TickBarAggregator(buf_size, reference_cutoff, completeness_threshold,
+                                     repair_window)
+        elif bar_type == BarType.BASE_VOLUME:
+            return BaseVolumeBarAggregator(buf_size, reference_cutoff, completeness_threshold,
+                                           repair_window, fixed_point)
+        elif bar_type == BarType.QUOTE_VOLUME:
+            return QuoteVolumeBarAggregator(buf_size, reference_cutoff, completeness_threshold,
+                                            repair_window, fixed_point)
+        else:
+            raise ValueError(f"Unknown aggregator type: {bar_type}")
+
     @classmethod
     def from_dict(cls, bar_type: BarType, data: dict) -> 'BarAggregator':
         logger.info(f"Creating aggregator from dict: {bar_type}")
@@ -58,16 +95,72 @@ class AggregatorFactory:
         else:
             raise ValueError(f"Unknown aggregator type: {bar_type}")
 
+BarKey = tuple[int, int]
+
+
+def next_bar_key(previous: BarKey | None, bar: Bar) -> BarKey:
+    """
+    Key of a closed bar from the key of the closed bar before it. `next_id` alone is not
+    unique: the bars a large trade is split across and the empty bars closed on the clock
+    share it, so bars are keyed by (next_id, seq) with `seq` counting the bars sharing it.
+    """
+    if previous is not None and previous[0] == bar.next_id:
+        return bar.next_id, previous[1] + 1
+    return bar.next_id, 0
+
+
+class BarBuffer(deque):
+    """
+    The bar deque of an aggregator, numbering bars in the order they were opened: the bar
+    at position i has index `start + i`. Bars evicted on the left keep their indices, bars
+    popped by a repair rewind hand theirs to the bars rebuilt in their place, and a reset
+    does not restart the numbering.
+    """
+
+    def __init__(self, iterable=(), maxlen: int | None = None):
+        super().__init__(iterable, maxlen)
+        self.end = len(self)
+
+    @property
+    def start(self) -> int:
+        return self.end - len(self)
+
+    def append(self, bar: Bar):
+        super().append(bar)
+        self.end += 1
+
+    def pop(self) -> Bar:
+        bar = super().pop()
+        self.end -= 1
+        return bar
+
+
+class _RepairPoint:
+    """Aggregator state just before the trade that revealed a missing interval"""
+
+    def __init__(self, interval: Interval, anchor: Bar, state):
+        self.interval = interval
+        self.anchor = anchor  # the live last bar, located again by identity when rewinding
+        self.snapshot = anchor.model_copy()
+        self.state = state
+
+
 class BarAggregator(ABC):
-    def __init__(self, buf_size: int, reference_cutoff: int, completeness_threshold: float = 1.0):
+    def __init__(self, buf_size: int, reference_cutoff: int, completeness_threshold: float = 1.0,
+                 repair_window: int = 0):
         self.buf_size = buf_size
         self.reference_cutoff = reference_cutoff
-        self.bars: deque[Bar] = deque(maxlen=buf_size)
+        self.bars = BarBuffer(maxlen=buf_size)
         
         self.completeness_threshold = completeness_threshold
         self.missing_trades = 0
         self.missing_intervals: deque[Interval] = deque(maxlen=buf_size)
 
+        # Gaps stay repairable while at most `repair_window` live trades arrived after them
+        self.repair_window = repair_window
+        self._repairs: list[_RepairPoint] = []
+        self._repair_log: list[Trade] = []
+
     def to_dict(self) -> dict:
         return {
             "buf_size": self.buf_size,
@@ -77,11 +170,13 @@ class BarAggregator(ABC):
             "completeness_threshold": self.completeness_threshold,
             "missing_trades": self.missing_trades,
             "missing_intervals": [interval.model_dump() for interval in self.missing_intervals],
+            "repair_window": self.repair_window,
         }
 
     @classmethod
     def from_dict(cls, data: dict) -> 'BarAggregator':
-        aggregator = cls(data["buf_size"], data["reference_cutoff"], data["completeness_threshold"])
+        aggregator = cls(data["buf_size"], data["reference_cutoff"], data["completeness_threshold"],
+                         data.get("repair_window", 0))
         for bar in data["bars"]:
             aggregator.bars.append(Bar.model_validate(bar))
         aggregator.missing_trades = data["missing_trades"]
@@ -93,11 +188,14 @@ class BarAggregator(ABC):
         self.bars.clear()
         self.missing_intervals.clear()
         self.missing_trades = 0
+        self._repairs.clear()
+        self._repair_log.clear()
 
     def validate(self, trade: Trade) -> TradeStatus:
         if len(self.bars) == 0:
             return TradeStatus.ACCEPTED
         if self.bars[-1].next_id == trade.id:
+            self._log_for_repair(trade)
             return TradeStatus.ACCEPTED
         if self.bars[-1].next_id > trade.id:
             return TradeStatus.BYPASS
@@ -106,8 +204,104 @@ class BarAggregator(ABC):
         self.missing_intervals.append(interval)
         self.missing_trades += interval.n_trades
         self._correct_missing_intervals()
+        if self.repair_window > 0:
+            self._repairs.append(_RepairPoint(interval, self.bars[-1], self._save_state()))
+        self._log_for_repair(trade)
         return TradeStatus.MISSING
 
+    def _log_for_repair(self, trade: Trade):
+        if len(self._repairs) == 0:
+            return
+        if len(self._repair_log) >= self.repair_window:
+            logger.warning(f"Giving up repair of {len(self._repairs)} missing intervals "
+                           f"after {self.repair_window} trades")
+            self._repairs.clear()
+            self._repair_log.clear()
+            self._reset_if_invalid()
+            return
+        self._repair_log.append(trade)
+
+    def _reset_if_invalid(self):
+        # A pending repair may still fill the gaps, so the bars are kept until it is given up
+        if len(self._repairs) == 0 and not self.is_valid():
+            self.reset()
+
+    @property
+    def pending_repairs(self) -> list[Interval]:
+        """Missing intervals that `repair()` can still splice trades into"""
+        return [point.interval for point in self._repairs]
+
+    def repair(self, trades: list[Trade]) -> int:
+        """
+        Splice backfilled trades for pending missing intervals into the bars.
+
+        The aggregator is rewound to its state just before the earliest gap the trades fall
+        in, then the backfilled trades and the live trades logged since are replayed in id
+        order. Bars older than that gap are left untouched; the ones after it are rebuilt
+        with the boundaries they would have had without the gap. Repaired intervals leave
+        `missing_intervals`, whatever the trades did not cover is recorded again. While a
+        repair is pending the aggregator is not reset for missing trades; it is once the
+        repair is given up and the gaps still break `completeness_threshold`.
+
+        The live path does not call it: osiris and the backtest drop trades that arrive
+        after the reorder window. It is for callers that backfill gaps themselves, e.g.
+        from an exchange's trade history.
+        Returns the number of backfilled trades spliced in.
+        """
+        backfill = {
+            trade.id: trade for trade in trades
+            if any(point.interval.start_id <= trade.id < point.interval.end_id
+                   for point in self._repairs)
+        }
+        if len(backfill) == 0:
+            return 0
+        first_id = min(backfill)
+        index = next(i for i, point in enumerate(self._repairs) if point.interval.end_id > first_id)
+        point = self._repairs[index]
+        if not self._rewind(point):
+            logger.warning(f"Cannot repair {point.interval}: its bars left the buffer")
+            del self._repairs[:index + 1]
+            if len(self._repairs) == 0:
+                self._repair_log.clear()
+                self._reset_if_invalid()
+            return 0
+
+        replay = list(backfill.values())
+        replay.extend(trade for trade in self._repair_log if trade.id >= point.interval.end_id)
+        replay.sort(key=lambda trade: trade.id)
+        self._repair_log = [trade for trade in self._repair_log
+                            if trade.id < point.interval.start_id]
+        del self._repairs[index:]
+        logger.info(f"Repairing {point.interval} with {len(backfill)} trades, "
+                    f"replaying {len(replay)}")
+        for trade in replay:
+            self.on_trade(trade)
+        return len(backfill)
+
+    def _save_state(self):
+        """Accumulation state needed to resume from the current last bar"""
+        return self.accumulator
+
+    def _restore_state(self, state):
+        self.accumulator = state
+
+    def _rewind(self, point: _RepairPoint) -> bool:
+        for position in range(len(self.bars) - 1, -1, -1):
+            if self.bars[position] is point.anchor:
+                break
+        else:
+            return False
+        while len(self.bars) > position + 1:
+            self.bars.pop()
+        # In place: earlier repair points of gaps in the same bar are anchored to this object
+        for name, value in point.snapshot:
+            setattr(point.anchor, name, value)
+        self._restore_state(point.state)
+        start_id = point.interval.start_id
+        while len(self.missing_intervals) > 0 and self.missing_intervals[-1].start_id >= start_id:
+            self.missing_trades -= self.missing_intervals.pop().n_trades
+        return True
+
     def _correct_missing_intervals(self):
         if len(self.bars) == 0 or len(self.missing_intervals) == 0:
             return
@@ -119,7 +313,8 @@ class BarAggregator(ABC):
         if len(self.bars) == 0:
             return True
         n_total_trades = self.bars[-1].next_id - self.bars[0].start_id
-        if abs(self.missing_trades - n_total_trades * self.completeness_threshold) <= 1e-13:
+        # At most a (1 - completeness_threshold) share of the buffered trades may be missing
+        if self.missing_trades <= n_total_trades * (1 - self.completeness_threshold) + 1e-13:
             return True
         logger.warning(f"Invalid completeness: {self.missing_trades=} and {n_total_trades=} and {self.completeness_threshold=}")
         return False
@@ -151,8 +346,9 @@ class BarAggregator(ABC):
         return df
 
 class TimeBarAggregator(BarAggregator):
-    def __init__(self, buf_size: int, reference_cutoff: int, completeness_threshold: float = 1.0):
-        super().__init__(buf_size, reference_cutoff, completeness_threshold)
+    def __init__(self, buf_size: int, reference_cutoff: int, completeness_threshold: float = 1.0,
+                 repair_window: int = 0):
+        super().__init__(buf_size, reference_cutoff, completeness_threshold, repair_window)
         self.accumulator = 0
 
     def to_dict(self) -> dict:
@@ -174,8 +370,7 @@ class TimeBarAggregator(BarAggregator):
     def on_trade(self, trade: Trade):
         status = self.validate(trade)
         if status == TradeStatus.MISSING:
-            if not self.is_valid():
-                self.reset()
+            self._reset_if_invalid()
         if status == TradeStatus.BYPASS:
             return
         # else status == TradeStatus.ACCEPTED
@@ -188,22 +383,101 @@ class TimeBarAggregator(BarAggregator):
         prev_reference_index = self.bars[-1].open_time // self.reference_cutoff
         next_reference_index = int(self.accumulator // self.reference_cutoff)
         # logger.info(f"prev_reference_index: {prev_reference_index}, next_reference_index: {next_reference_index}")
-        if prev_reference_index == next_reference_index:
+        if prev_reference_index == next_reference_index and not self.bars[-1].is_closed:
             self.bars[-1] += trade
             # logger.info(f"Add time bar: {self.bars[-1]}")
         elif next_reference_index > prev_reference_index:
-            self.bars[-1].enclose(next_reference_index * self.reference_cutoff - 1)
-            logger.info(f"Enclose time bar: {self.bars[-1]}")
+            if not self.bars[-1].is_closed:
+                self.bars[-1].enclose(next_reference_index * self.reference_cutoff - 1)
+                logger.info("Enclose time bar: %s", self.bars[-1])
             self.bars.append(Bar.from_trade(trade))
             self.bars[-1].open_time = next_reference_index * self.reference_cutoff
+        elif self.bars[-1].is_closed:
+            self._fold_late(trade, next_reference_index)
         else:
             logger.warning(f"Invalid reference index: {prev_reference_index} and next reference index: {next_reference_index}")
-    
-    
+
+    def _fold_late(self, trade: Trade, index: int):
+        """
+        Fold a trade into the bar of its interval after `close_until` closed that interval
+        or a later one. The empty bars emitted since the last traded bar make way: the one
+        covering the trade takes its prices and volume, the later ones its id and close, so
+        the next trade still follows `bars[-1].next_id`. A trade older than every kept bar
+        goes into the earliest one.
+        """
+        i = len(self.bars) - 1
+        while (i > 0 and self.bars[i].number_of_trades == 0
+               and self.bars[i].open_time // self.reference_cutoff > index):
+            i -= 1
+        bar = self.bars[i]
+        bar_index = bar.open_time // self.reference_cutoff
+        if bar_index != index:
+            logger.warning(f"Late trade {trade.id} for time bar at {index * self.reference_cutoff} "
+                           f"is older than the kept bars")
+        else:
+            # Closed by close_until() before this late trade arrived
+            logger.warning(f"Late trade {trade.id} for closed time bar at {bar.open_time}")
+        if bar.number_of_trades == 0:
+            bar.start_id = trade.id
+            bar.open = bar.high = bar.low = trade.price
+        bar += trade
+        for j in range(i + 1, len(self.bars)):
+            empty = self.bars[j]
+            empty.start_id = empty.next_id = trade.id + 1
+            empty.current_id = trade.id
+            empty.open = empty.high = empty.low = empty.close = trade.price
+
+    def close_until(self, now_ms: int, emit_empty: bool = False) -> list[Bar]:
+        """
+        Enclose the open bar if `now_ms` is past its interval, without waiting for the next
+        trade. With `emit_empty`, intervals elapsed since then without any trade get closed
+        zero-volume bars at the last close. They keep the `next_id` of the last traded bar,
+        the trade the aggregator waits for, and are told apart by their `next_bar_key` seq.
+        A late trade for one of them takes its place, see `_fold_late`. Returns the bars
+        closed by this call.
+        """
+        if len(self.bars) == 0:
+            return []
+        last = self.bars[-1]
+        last_index = last.open_time // self.reference_cutoff
+        now_index = now_ms // self.reference_cutoff
+        if now_index <= last_index:
+            return []
+        closed = []
+        if not last.is_closed:
+            last.enclose((last_index + 1) * self.reference_cutoff - 1)
+            logger.info("Enclose time bar on clock: %s", last)
+            closed.append(last)
+        if emit_empty:
+            # Older empty bars would be evicted from the buffer right away
+            for index in range(max(last_index + 1, now_index - self.buf_size), now_index):
+                self.bars.append(Bar(
+                    symbol=last.symbol,
+                    start_id=last.next_id,
+                    current_id=last.current_id,
+                    next_id=last.next_id,
+                    open_time=index * self.reference_cutoff,
+                    close_time=(index + 1) * self.reference_cutoff - 1,
+                    open=last.close,
+                    high=last.close,
+                    low=last.close,
+                    close=last.close,
+                    volume=0.0,
+                    quote_volume=0.0,
+                    is_closed=True,
+                    number_of_trades=0,
+                    taker_buy_base_asset_volume=0.0,
+                    taker_buy_quote_asset_volume=0.0,
+                ))
+                closed.append(self.bars[-1])
+        return closed
+
+
 
 class TickBarAggregator(BarAggregator):
-    def __init__(self, buf_size: int, reference_cutoff: int, completeness_threshold: float = 1.0):
-        super().__init__(buf_size, reference_cutoff, completeness_threshold)
+    def __init__(self, buf_size: int, reference_cutoff: int, completeness_threshold: float = 1.0,
+                 repair_window: int = 0):
+        super().__init__(buf_size, reference_cutoff, completeness_threshold, repair_window)
         self.accumulator = 0
 
     def to_dict(self) -> dict:
@@ -224,8 +498,7 @@ class TickBarAggregator(BarAggregator):
     def on_trade(self, trade: Trade):
         status = self.validate(trade)
         if status == TradeStatus.MISSING:
-            if not self.is_valid():
-                self.reset()
+            self._reset_if_invalid()
         if status == TradeStatus.BYPASS:
             return
         # else status == TradeStatus.ACCEPTED
@@ -240,128 +513,322 @@ class TickBarAggregator(BarAggregator):
             self.bars[-1] += trade
         elif next_reference_index > prev_reference_index:
             self.bars[-1].enclose(trade.timestamp - 1)
-            logger.info(f"Enclose tick bar: {self.bars[-1]}")
+            logger.info("Enclose tick bar: %s", self.bars[-1])
             self.bars.append(Bar.from_trade(trade))
         else:
             logger.warning(f"Invalid reference index: {prev_reference_index} and next reference index: {next_reference_index}")
     
 
 
+def _open_bar(trade: Trade) -> Bar:
+    """Bar.from_trade of a zero-quantity copy of `trade`, without validating or copying it"""
+    return Bar.model_construct(
+        symbol=trade.symbol,
+        start_id=trade.id,
+        current_id=trade.id,
+        next_id=trade.id + 1,
+        open_time=trade.timestamp,
+        close_time=trade.timestamp,
+        open=trade.price,
+        high=trade.price,
+        low=trade.price,
+        close=trade.price,
+        volume=0.0,
+        quote_volume=0.0,
+        is_closed=False,
+        number_of_trades=1,
+        taker_buy_base_asset_volume=0.0,
+        taker_buy_quote_asset_volume=0.0,
+    )
+
+
+def _fill(bar: Bar, trade_id: int, price: float, quantity: float, is_buy: bool):
+    """Same update as `bar += trade` for `quantity` of a trade, from scalars"""
+    bar.current_id = trade_id
+    bar.next_id = trade_id + 1
+    if price > bar.high:
+        bar.high = price
+    if price < bar.low:
+        bar.low = price
+    bar.close = price
+    bar.volume += quantity
+    bar.quote_volume += price * quantity
+    bar.number_of_trades += 1
+    if is_buy:
+        bar.taker_buy_base_asset_volume += quantity
+        bar.taker_buy_quote_asset_volume += price * quantity
+
+
+def _fill_units(bar: Bar, units: list[int], fixed_point: FixedPoint, trade: Trade, price_units: int,
+                quantity_units: int, is_buy: bool):
+    """
+    Add `quantity_units` of a trade to the open bar. `units` holds the bar's exact
+    [volume, quote volume, taker buy volume, taker buy quote volume] in scaled integers;
+    the float fields are derived from them with a single division each.
+    """
+    notional_units = price_units * quantity_units
+    units[0] += quantity_units
+    units[1] += notional_units
+    if is_buy:
+        units[2] += quantity_units
+        units[3] += notional_units
+    quantity_scale = fixed_point.quantity_scale
+    notional_scale = fixed_point.price_scale * quantity_scale
+    bar.current_id = trade.id
+    bar.next_id = trade.id + 1
+    if trade.price > bar.high:
+        bar.high = trade.price
+    if trade.price < bar.low:
+        bar.low = trade.price
+    bar.close = trade.price
+    bar.volume = units[0] / quantity_scale
+    bar.quote_volume = units[1] / notional_scale
+    bar.number_of_trades += 1
+    bar.taker_buy_base_asset_volume = units[2] / quantity_scale
+    bar.taker_buy_quote_asset_volume = units[3] / notional_scale
+
+
 class BaseVolumeBarAggregator(BarAggregator):
-    def __init__(self, buf_size: int, reference_cutoff: float, completeness_threshold: float = 1.0):
-        super().__init__(buf_size, reference_cutoff, completeness_threshold)
+    def __init__(self, buf_size: int, reference_cutoff: float, completeness_threshold: float = 1.0,
+                 repair_window: int = 0, fixed_point: FixedPoint | None = None):
+        super().__init__(buf_size, reference_cutoff, completeness_threshold, repair_window)
         self.accumulator = 0
+        # In fixed-point mode the accumulator counts scaled quantity units and the open bar's
+        # sums are exact
+        self.fixed_point = fixed_point
+        self.cutoff_units = 0
+        self.open_units = [0, 0, 0, 0]
+        if fixed_point is not None:
+            self.cutoff_units = fixed_point.quantity_units(self.reference_cutoff)
+            if self.cutoff_units <= 0:
+                raise ValueError(f"Reference cutoff {reference_cutoff} is below one unit "
+                                 f"of {fixed_point}")
 
     def to_dict(self) -> dict:
         data = super().to_dict()
         data["accumulator"] = self.accumulator
+        if self.fixed_point is not None:
+            data["fixed_point"] = self.fixed_point.model_dump()
+            data["open_units"] = list(self.open_units)
         return data
 
     @classmethod
     def from_dict(cls, data: dict) -> 'BaseVolumeBarAggregator':
-        obj = super(BaseVolumeBarAggregator, cls).from_dict(data)
+        if data.get("fixed_point") is None:
+            obj = super(BaseVolumeBarAggregator, cls).from_dict(data)
+        else:
+            obj = cls(data["buf_size"], data["reference_cutoff"], data["completeness_threshold"],
+                      data.get("repair_window", 0), FixedPoint.model_validate(data["fixed_point"]))
+            for bar in data["bars"]:
+                obj.bars.append(Bar.model_validate(bar))
+            obj.missing_trades = data["missing_trades"]
+            for interval in data["missing_intervals"]:
+                obj.missing_intervals.append(Interval.model_validate(interval))
+            obj.open_units = list(data["open_units"])
         obj.accumulator = data["accumulator"]
         return obj
 
     def reset(self):
         super().reset()
         self.accumulator = 0
+        self.open_units = [0, 0, 0, 0]
+
+    def _save_state(self):
+        return self.accumulator, list(self.open_units)
+
+    def _restore_state(self, state):
+        self.accumulator, open_units = state
+        self.open_units = list(open_units)
 
     def on_trade(self, trade: Trade):
         status = self.validate(trade)
         if status == TradeStatus.MISSING:
-            if not self.is_valid():
-                self.reset()
+            self._reset_if_invalid()
         if status == TradeStatus.BYPASS:
             return
         # else status == TradeStatus.ACCEPTED
-        while abs(trade.quantity) > 2 * 1e-13: # python's float precision is estimated to 15-17 digits
+        if self.fixed_point is not None:
+            self._on_trade_fixed(trade)
+            return
+        # The trade is split through the local `quantity`; neither the trade nor any fraction
+        # of it is copied
+        quantity = trade.quantity
+        price = trade.price
+        is_buy = trade.side == Side.SIDE_BUY
+        while abs(quantity) > 2 * 1e-13: # python's float precision is estimated to 15-17 digits
             if len(self.bars) == 0 or self.bars[-1].is_closed:
-                empty_trade = trade.model_copy(deep=False)
-                empty_trade.quantity = 0
-                self.bars.append(Bar.from_trade(empty_trade))
+                self.bars.append(_open_bar(trade))
+            bar = self.bars[-1]
 
             need = self.reference_cutoff - self.accumulator % self.reference_cutoff
-            if abs(trade.quantity - need) < 2 * 1e-13: # trade.quantity = need                
-                self.bars[-1] += trade
-                self.bars[-1].enclose(trade.timestamp)
-                logger.info(f"Enclose base volume bar: {self.bars[-1]} with {trade.quantity=} ~ {need=}")
+            if abs(quantity - need) < 2 * 1e-13: # quantity = need
+                _fill(bar, trade.id, price, quantity, is_buy)
+                bar.enclose(trade.timestamp)
+                logger.info("Enclose base volume bar: %s with quantity=%r ~ need=%r",
+                            bar, quantity, need)
                 self.accumulator += need + 1e-13
-                trade.quantity = 0
-            elif trade.quantity < need:
-                self.bars[-1] += trade
-                self.accumulator += trade.quantity
-                trade.quantity = 0
-                
-            elif trade.quantity > need:
-                trade_fraction = trade.model_copy(deep=False)
-                trade_fraction.quantity = need
-                self.bars[-1] += trade_fraction
-                self.bars[-1].enclose(trade.timestamp)
-                self.bars[-1].next_id = trade.id
-                logger.info(f"Enclose base volume bar: {self.bars[-1]} with {trade.quantity=} > {need=}")
-                trade.quantity -= need
+                quantity = 0
+            elif quantity < need:
+                _fill(bar, trade.id, price, quantity, is_buy)
+                self.accumulator += quantity
+                quantity = 0
+            elif quantity > need:
+                _fill(bar, trade.id, price, need, is_buy)
+                bar.enclose(trade.timestamp)
+                bar.next_id = trade.id
+                logger.info("Enclose base volume bar: %s with quantity=%r > need=%r",
+                            bar, quantity, need)
+                quantity -= need
                 self.accumulator += need + 1e-13
             else:
-                logger.warning(f"Undefined behavior: {self.accumulator=} and {trade.quantity=} and {need=}")
+                logger.warning(f"Undefined behavior: {self.accumulator=} and {quantity=} "
+                               f"and {need=}")
                 break
 
+    def _on_trade_fixed(self, trade: Trade):
+        quantity_units = self.fixed_point.quantity_units(trade.quantity)
+        price_units = self.fixed_point.price_units(trade.price)
+        is_buy = trade.side == Side.SIDE_BUY
+        while quantity_units > 0:
+            if len(self.bars) == 0 or self.bars[-1].is_closed:
+                self.bars.append(_open_bar(trade))
+                self.open_units = [0, 0, 0, 0]
+            bar = self.bars[-1]
+
+            need = self.cutoff_units - self.accumulator % self.cutoff_units
+            take = min(quantity_units, need)
+            _fill_units(bar, self.open_units, self.fixed_point, trade, price_units, take, is_buy)
+            self.accumulator += take
+            quantity_units -= take
+            if take == need:
+                bar.enclose(trade.timestamp)
+                if quantity_units > 0:
+                    bar.next_id = trade.id
+                logger.info("Enclose base volume bar: %s with take=%r units", bar, take)
+
 
 class QuoteVolumeBarAggregator(BarAggregator):
-    def __init__(self, buf_size: int, reference_cutoff: float, completeness_threshold: float = 1.0):
-        super().__init__(buf_size, reference_cutoff, completeness_threshold)
+    def __init__(self, buf_size: int, reference_cutoff: float, completeness_threshold: float = 1.0,
+                 repair_window: int = 0, fixed_point: FixedPoint | None = None):
+        super().__init__(buf_size, reference_cutoff, completeness_threshold, repair_window)
         self.accumulator = 0
+        # In fixed-point mode the accumulator counts scaled quote units and the open bar's
+        # sums are exact
+        self.fixed_point = fixed_point
+        self.cutoff_units = 0
+        self.open_units = [0, 0, 0, 0]
+        if fixed_point is not None:
+            scale = fixed_point.price_scale * fixed_point.quantity_scale
+            self.cutoff_units = round(self.reference_cutoff * scale)
+            if self.cutoff_units <= 0:
+                raise ValueError(f"Reference cutoff {reference_cutoff} is below one unit "
+                                 f"of {fixed_point}")
 
     def to_dict(self) -> dict:
         data = super().to_dict()
         data["accumulator"] = self.accumulator
+        if self.fixed_point is not None:
+            data["fixed_point"] = self.fixed_point.model_dump()
+            data["open_units"] = list(self.open_units)
         return data
 
     @classmethod
     def from_dict(cls, data: dict) -> 'QuoteVolumeBarAggregator':
-        obj = super(QuoteVolumeBarAggregator, cls).from_dict(data)
+        if data.get("fixed_point") is None:
+            obj = super(QuoteVolumeBarAggregator, cls).from_dict(data)
+        else:
+            obj = cls(data["buf_size"], data["reference_cutoff"], data["completeness_threshold"],
+                      data.get("repair_window", 0), FixedPoint.model_validate(data["fixed_point"]))
+            for bar in data["bars"]:
+                obj.bars.append(Bar.model_validate(bar))
+            obj.missing_trades = data["missing_trades"]
+            for interval in data["missing_intervals"]:
+                obj.missing_intervals.append(Interval.model_validate(interval))
+            obj.open_units = list(data["open_units"])
         obj.accumulator = data["accumulator"]
         return obj
 
     def reset(self):
         super().reset()
         self.accumulator = 0
+        self.open_units = [0, 0, 0, 0]
+
+    def _save_state(self):
+        return self.accumulator, list(self.open_units)
+
+    def _restore_state(self, state):
+        self.accumulator, open_units = state
+        self.open_units = list(open_units)
 
     def on_trade(self, trade: Trade):
         status = self.validate(trade)
         if status == TradeStatus.MISSING:
-            if not self.is_valid():
-                self.reset()
+            self._reset_if_invalid()
         if status == TradeStatus.BYPASS:
             return
         # else status == TradeStatus.ACCEPTED
-        while abs(trade.quantity) > 2 * 1e-13: # python's float precision is estimated to 15-17 digits
+        if self.fixed_point is not None:
+            self._on_trade_fixed(trade)
+            return
+        # The trade is split through the local `quantity`; neither the trade nor any fraction
+        # of it is copied
+        quantity = trade.quantity
+        price = trade.price
+        is_buy = trade.side == Side.SIDE_BUY
+        while abs(quantity) > 2 * 1e-13: # python's float precision is estimated to 15-17 digits
             if len(self.bars) == 0 or self.bars[-1].is_closed:
-                empty_trade = trade.model_copy(deep=False)
-                empty_trade.quantity = 0
-                self.bars.append(Bar.from_trade(empty_trade))
+                self.bars.append(_open_bar(trade))
+            bar = self.bars[-1]
 
             need_quote = self.reference_cutoff - self.accumulator % self.reference_cutoff
-            need_base = need_quote / trade.price
-            if abs(trade.quantity - need_base) < 2 * 1e-13: # trade.quantity = need_base               
-                self.bars[-1] += trade
-                self.bars[-1].enclose(trade.timestamp)
-                logger.info(f"Enclose quote volume bar: {self.bars[-1]} with {trade.quantity=} ~ {need_base=}")
+            need_base = need_quote / price
+            if abs(quantity - need_base) < 2 * 1e-13: # quantity = need_base
+                _fill(bar, trade.id, price, quantity, is_buy)
+                bar.enclose(trade.timestamp)
+                logger.info("Enclose quote volume bar: %s with quantity=%r ~ need_base=%r",
+                            bar, quantity, need_base)
                 self.accumulator += need_quote + 1e-13
-                trade.quantity = 0
-            elif trade.quantity < need_base:
-                self.bars[-1] += trade
-                self.accumulator += trade.quantity * trade.price
-                trade.quantity = 0
-            elif trade.quantity > need_base:
-                trade_fraction = trade.model_copy(deep=False)
-                trade_fraction.quantity = need_base
-                self.bars[-1] += trade_fraction
-                self.bars[-1].enclose(trade_fraction.timestamp)
-                self.bars[-1].next_id = trade_fraction.id
-                logger.info(f"Enclose quote volume bar: {self.bars[-1]} with {trade.quantity=} > {need_base=}")
+                quantity = 0
+            elif quantity < need_base:
+                _fill(bar, trade.id, price, quantity, is_buy)
+                self.accumulator += quantity * price
+                quantity = 0
+            elif quantity > need_base:
+                _fill(bar, trade.id, price, need_base, is_buy)
+                bar.enclose(trade.timestamp)
+                bar.next_id = trade.id
+                logger.info("Enclose quote volume bar: %s with quantity=%r > need_base=%r",
+                            bar, quantity, need_base)
                 self.accumulator += need_quote + 1e-13
-                trade.quantity -= trade_fraction.quantity
+                quantity -= need_base
             else:
-                logger.warning(f"Undefined behavior: {self.accumulator=} and {trade.quantity=} and {need_quote=}, {need_base=}")
+                logger.warning(f"Undefined behavior: {self.accumulator=} and {quantity=} "
+                               f"and {need_quote=}, {need_base=}")
                 break
+
+    def _on_trade_fixed(self, trade: Trade):
+        quantity_units = self.fixed_point.quantity_units(trade.quantity)
+        price_units = self.fixed_point.price_units(trade.price)
+        is_buy = trade.side == Side.SIDE_BUY
+        while quantity_units > 0:
+            if len(self.bars) == 0 or self.bars[-1].is_closed:
+                self.bars.append(_open_bar(trade))
+                self.open_units = [0, 0, 0, 0]
+            bar = self.bars[-1]
+
+            need = self.cutoff_units - self.accumulator % self.cutoff_units
+            if price_units * quantity_units < need:
+                _fill_units(bar, self.open_units, self.fixed_point, trade, price_units,
+                            quantity_units, is_buy)
+                self.accumulator += price_units * quantity_units
+                quantity_units = 0
+                continue
+            # Round the fill up to whole quantity units; the bar counts as exactly one cutoff
+            take = -(-need // price_units)
+            _fill_units(bar, self.open_units, self.fixed_point, trade, price_units, take, is_buy)
+            self.accumulator += need
+            quantity_units -= take
+            bar.enclose(trade.timestamp)
+            if quantity_units > 0:
+                bar.next_id = trade.id
+            logger.info("Enclose quote volume bar: %s with take=%r units", bar, take)
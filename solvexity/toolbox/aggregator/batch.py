@@ -0,0 +1,603 @@
+from collections import deque
+from typing import Iterable
+import bisect
+import logging
+import numpy as np
+import pandas as pd
+from solvexity.model.trade import Trade
+from solvexity.model.bar import Bar
+from solvexity.model.shared import Side, Symbol
+from .bar_aggregator import BarType, BarAggregator, AggregatorFactory, Interval
+
+logger = logging.getLogger(__name__)
+
+# Column order follows Bar.model_dump_flatten() so dataframes line up with
+# BarAggregator.to_dataframe()
+BAR_COLUMNS = (
+    "start_id", "current_id", "next_id", "open_time", "close_time",
+    "open", "high", "low", "close", "volume", "quote_volume", "is_closed",
+    "number_of_trades", "taker_buy_base_asset_volume", "taker_buy_quote_asset_volume",
+)
+
+BAR_DTYPES = {
+    "start_id": np.int64,
+    "current_id": np.int64,
+    "next_id": np.int64,
+    "open_time": np.int64,
+    "close_time": np.int64,
+    "open": np.float64,
+    "high": np.float64,
+    "low": np.float64,
+    "close": np.float64,
+    "volume": np.float64,
+    "quote_volume": np.float64,
+    "is_closed": np.bool_,
+    "number_of_trades": np.int64,
+    "taker_buy_base_asset_volume": np.float64,
+    "taker_buy_quote_asset_volume": np.float64,
+}
+
+# Same tolerances as the streaming volume aggregators
+_EPSILON = 2 * 1e-13
+_BOUNDARY_NUDGE = 1e-13
+# Below this many trades per bar the scalar replay beats the vectorized boundary search
+_VECTOR_MIN_SPAN = 64
+
+
+class TradeArrays:
+    """Columnar trade tape of a single market."""
+
+    def __init__(self, symbol: Symbol, ids: np.ndarray, prices: np.ndarray, quantities: np.ndarray,
+                 timestamps: np.ndarray, sides: np.ndarray):
+        self.symbol = symbol
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.prices = np.asarray(prices, dtype=np.float64)
+        self.quantities = np.asarray(quantities, dtype=np.float64)
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.sides = np.asarray(sides, dtype=np.int8)
+        n = len(self.ids)
+        lengths = (len(self.prices), len(self.quantities), len(self.timestamps), len(self.sides))
+        if any(length != n for length in lengths):
+            raise ValueError("Trade columns must have the same length")
+
+    @classmethod
+    def from_trades(cls, trades: Iterable[Trade]) -> 'TradeArrays':
+        trades = list(trades)
+        if len(trades) == 0:
+            raise ValueError("Cannot build TradeArrays from an empty trade sequence")
+        return cls(
+            symbol=trades[0].symbol,
+            ids=np.fromiter((t.id for t in trades), dtype=np.int64, count=len(trades)),
+            prices=np.fromiter((t.price for t in trades), dtype=np.float64, count=len(trades)),
+            quantities=np.fromiter((t.quantity for t in trades), dtype=np.float64,
+                                   count=len(trades)),
+            timestamps=np.fromiter((t.timestamp for t in trades), dtype=np.int64,
+                                   count=len(trades)),
+            sides=np.fromiter((int(t.side) for t in trades), dtype=np.int8, count=len(trades)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def slice(self, start: int, stop: int) -> 'TradeArrays':
+        """Zero-copy view over trades[start:stop]"""
+        return TradeArrays(
+            self.symbol, self.ids[start:stop], self.prices[start:stop], self.quantities[start:stop],
+            self.timestamps[start:stop], self.sides[start:stop],
+        )
+
+    @property
+    def is_buy(self) -> np.ndarray:
+        return self.sides == Side.SIDE_BUY
+
+
+class BarColumns:
+    """Columnar bar sequence, one numpy array per Bar field."""
+
+    def __init__(self, symbol: Symbol | None, columns: dict[str, np.ndarray]):
+        self.symbol = symbol
+        self.columns = columns
+
+    @classmethod
+    def empty(cls, symbol: Symbol | None = None) -> 'BarColumns':
+        return cls(symbol, {name: np.empty(0, dtype=BAR_DTYPES[name]) for name in BAR_COLUMNS})
+
+    @classmethod
+    def from_bars(cls, bars: Iterable[Bar]) -> 'BarColumns':
+        bars = list(bars)
+        if len(bars) == 0:
+            return cls.empty()
+        columns = {
+            name: np.array([getattr(bar, name) for bar in bars], dtype=BAR_DTYPES[name])
+            for name in BAR_COLUMNS
+        }
+        return cls(bars[0].symbol, columns)
+
+    def __len__(self) -> int:
+        return len(self.columns["start_id"])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def slice(self, start: int, stop: int) -> 'BarColumns':
+        """Zero-copy view over bars[start:stop]"""
+        return BarColumns(self.symbol,
+                          {name: col[start:stop] for name, col in self.columns.items()})
+
+    def to_dicts(self) -> list[dict]:
+        """Bars as Bar.model_dump() style dicts"""
+        symbol = self.symbol.model_dump() if self.symbol is not None else None
+        lists = {name: self.columns[name].tolist() for name in BAR_COLUMNS}
+        return [
+            {"symbol": symbol, **{name: lists[name][i] for name in BAR_COLUMNS}}
+            for i in range(len(self))
+        ]
+
+    def to_bars(self) -> list[Bar]:
+        return [Bar.model_validate(data) for data in self.to_dicts()]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Same layout as BarAggregator.to_dataframe(is_closed=False)"""
+        data = {
+            "symbol.base": [self.symbol.base if self.symbol else None] * len(self),
+            "symbol.quote": [self.symbol.quote if self.symbol else None] * len(self),
+        }
+        for name in BAR_COLUMNS:
+            data[name] = self.columns[name]
+        return pd.DataFrame(data)
+
+
+def _concat_columns(chunks: list[dict[str, np.ndarray]]) -> dict[str, np.ndarray]:
+    if len(chunks) == 0:
+        return {name: np.empty(0, dtype=BAR_DTYPES[name]) for name in BAR_COLUMNS}
+    return {
+        name: np.concatenate([chunk[name] for chunk in chunks]).astype(BAR_DTYPES[name], copy=False)
+        for name in BAR_COLUMNS
+    }
+
+
+def segment_sum(values: np.ndarray, starts: np.ndarray, lengths: np.ndarray,
+                seeds: np.ndarray | None = None) -> np.ndarray:
+    """
+    Left-to-right float sum of each segment values[starts[i]:starts[i] + lengths[i]].
+
+    np.add.reduceat uses pairwise summation and therefore rounds differently from a
+    running `bar.volume += quantity`. This kernel walks all segments in lockstep, one
+    element per numpy op, so results are bit-identical to the streaming accumulation
+    while staying vectorized across segments.
+    """
+    n_segments = len(starts)
+    if seeds is None:
+        out = np.zeros(n_segments, dtype=np.float64)
+    else:
+        out = np.array(seeds, dtype=np.float64)
+    if n_segments == 0:
+        return out
+    order = np.argsort(-lengths, kind="stable")
+    sorted_starts = starts[order]
+    sorted_lengths = lengths[order]
+    acc = out[order]
+    # Number of segments still active at step j is a prefix because lengths are sorted descending
+    active_counts = np.searchsorted(-sorted_lengths, -np.arange(1, sorted_lengths[0] + 1),
+                                    side="right")
+    for j, active in enumerate(active_counts):
+        acc[:active] += values[sorted_starts[:active] + j]
+    out[order] = acc
+    return out
+
+
+def sequential_sum(seed: float, values: np.ndarray) -> float:
+    """Left-to-right float sum seed + values[0] + values[1] + ..."""
+    if len(values) == 0:
+        return seed
+    return float(np.cumsum(np.concatenate(([seed], values)))[-1])
+
+
+class BatchBarAggregator:
+    """
+    Vectorized counterpart of the streaming BarAggregator classes.
+
+    Feeding the same trades to `on_trades` (in one or many calls) produces exactly the bar
+    sequence the streaming aggregator of the same type would build trade by trade, float
+    rounding included. Gap, duplicate and out-of-order trades are resolved with the same
+    rules as BarAggregator.validate, and `to_aggregator()` hands the final state over to a
+    streaming aggregator so live processing can continue where the backfill stopped.
+    """
+
+    def __init__(self, bar_type: BarType, buf_size: int, reference_cutoff: int | float,
+                 completeness_threshold: float = 1.0):
+        self.bar_type = bar_type
+        self.buf_size = buf_size
+        self.reference_cutoff = reference_cutoff
+        self.completeness_threshold = completeness_threshold
+        self.symbol: Symbol | None = None
+
+        self.accumulator: int | float = 0
+        self.missing_trades = 0
+        self.missing_intervals: deque[tuple[int, int]] = deque(maxlen=buf_size)
+
+        # Bar history: finished chunks, pending single rows, and the last (possibly open) bar
+        self._chunks: list[dict[str, np.ndarray]] = []
+        self._chunk_offsets: list[int] = []
+        self._rows: list[tuple] = []
+        self._n_history = 0
+        self._last: dict | None = None
+        self._epoch_start = 0  # global index of the first bar since the last reset
+        self._bar_span = 0  # trades in the most recently closed volume bar
+
+    # ------------------------------------------------------------------ history
+
+    @property
+    def n_bars(self) -> int:
+        return self._n_history + (1 if self._last is not None else 0)
+
+    def _push_last(self):
+        if self._last is None:
+            return
+        self._rows.append(tuple(self._last[name] for name in BAR_COLUMNS))
+        self._n_history += 1
+        self._last = None
+
+    def _flush_rows(self):
+        if len(self._rows) == 0:
+            return
+        transposed = list(zip(*self._rows))
+        chunk = {
+            name: np.array(transposed[i], dtype=BAR_DTYPES[name])
+            for i, name in enumerate(BAR_COLUMNS)
+        }
+        self._append_chunk(chunk, flush=False)
+        self._rows.clear()
+
+    def _append_chunk(self, chunk: dict[str, np.ndarray], flush: bool = True):
+        if flush:
+            self._flush_rows()
+        offset = self._chunk_offsets[-1] + len(self._chunks[-1]["start_id"]) if self._chunks else 0
+        self._chunks.append(chunk)
+        self._chunk_offsets.append(offset)
+        if flush:
+            self._n_history += len(chunk["start_id"])
+
+    def _history_value(self, index: int, name: str):
+        self._flush_rows()
+        k = bisect.bisect_right(self._chunk_offsets, index) - 1
+        return self._chunks[k][name][index - self._chunk_offsets[k]].item()
+
+    def _bar_value(self, index: int, name: str):
+        if self._last is not None and index == self._n_history:
+            return self._last[name]
+        return self._history_value(index, name)
+
+    def bars(self) -> BarColumns:
+        """Every bar produced so far, including bars later discarded by a reset"""
+        self._flush_rows()
+        chunks = list(self._chunks)
+        if self._last is not None:
+            chunks.append({name: np.array([self._last[name]], dtype=BAR_DTYPES[name])
+                           for name in BAR_COLUMNS})
+        return BarColumns(self.symbol, _concat_columns(chunks))
+
+    def retained_bars(self) -> BarColumns:
+        """Bars the streaming aggregator would hold in its `bars` deque"""
+        start = max(self._epoch_start, self.n_bars - self.buf_size)
+        return self.bars().slice(start, self.n_bars)
+
+    # ------------------------------------------------------------------ validation
+
+    def _retained_size(self) -> int:
+        return min(self.n_bars - self._epoch_start, self.buf_size)
+
+    def _first_retained_start_id(self) -> int:
+        return self._bar_value(self.n_bars - self._retained_size(), "start_id")
+
+    def _last_next_id(self) -> int:
+        return self._bar_value(self.n_bars - 1, "next_id")
+
+    def _reset(self):
+        self._push_last()
+        self._epoch_start = self.n_bars
+        self.missing_intervals.clear()
+        self.missing_trades = 0
+        self.accumulator = 0
+
+    def _is_valid(self) -> bool:
+        if self._retained_size() == 0:
+            return True
+        n_total_trades = self._last_next_id() - self._first_retained_start_id()
+        if self.missing_trades <= n_total_trades * (1 - self.completeness_threshold) + 1e-13:
+            return True
+        logger.warning(f"Invalid completeness: {self.missing_trades=} and {n_total_trades=} "
+                       f"and {self.completeness_threshold=}")
+        return False
+
+    def _admit(self, trade_id: int) -> bool:
+        """Mirror of BarAggregator.validate followed by the reset-on-invalid rule"""
+        if self._retained_size() == 0:
+            return True
+        next_id = self._last_next_id()
+        if next_id == trade_id:
+            return True
+        if next_id > trade_id:
+            return False
+        logger.warning(f"Missing trade from {next_id} to {trade_id}")
+        self.missing_intervals.append((next_id, trade_id))
+        self.missing_trades += trade_id - next_id
+        first_start_id = self._first_retained_start_id()
+        while len(self.missing_intervals) > 0 and first_start_id > self.missing_intervals[0][0]:
+            start_id, end_id = self.missing_intervals.popleft()
+            self.missing_trades -= end_id - start_id
+        if not self._is_valid():
+            self._reset()
+        return True
+
+    # ------------------------------------------------------------------ driver
+
+    def on_trades(self, trades: TradeArrays):
+        if len(trades) == 0:
+            return
+        if self.symbol is None:
+            self.symbol = trades.symbol
+        ids = trades.ids
+        keys = None
+        breaks = ids[1:] != ids[:-1] + 1
+        if self.bar_type == BarType.TIME:
+            keys = trades.timestamps // self.reference_cutoff
+            breaks |= keys[1:] < keys[:-1]
+        elif self.bar_type == BarType.TICK:
+            keys = ids // self.reference_cutoff
+        break_points = np.flatnonzero(breaks) + 1
+        pq = trades.prices * trades.quantities
+        is_buy = trades.is_buy
+        scalars = None
+        if self.bar_type in (BarType.BASE_VOLUME, BarType.QUOTE_VOLUME):
+            # Python scalars for the exact boundary replay, converted once per call
+            scalars = (ids.tolist(), trades.prices.tolist(), trades.quantities.tolist(),
+                       trades.timestamps.tolist(), is_buy.tolist())
+
+        pos = 0
+        n = len(trades)
+        while pos < n:
+            has_bars = self._retained_size() > 0
+            if not has_bars or self._last_next_id() != ids[pos]:
+                if not self._admit(int(ids[pos])):
+                    pos += 1
+                    continue
+            k = np.searchsorted(break_points, pos, side="right")
+            end = int(break_points[k]) if k < len(break_points) else n
+            if self.bar_type == BarType.TIME:
+                pos = self._time_run(trades, keys, pq, is_buy, pos, end)
+            elif self.bar_type == BarType.TICK:
+                pos = self._tick_run(trades, keys, pq, is_buy, pos, end)
+            else:
+                pos = self._volume_run(trades, scalars, pq, is_buy, pos, end)
+
+    # ------------------------------------------------------------------ time / tick
+
+    def _merge_into_last(self, trades: TradeArrays, pq: np.ndarray, is_buy: np.ndarray, start: int,
+                         end: int):
+        last = self._last
+        q = trades.quantities[start:end]
+        p = trades.prices[start:end]
+        last["current_id"] = int(trades.ids[end - 1])
+        last["next_id"] = last["current_id"] + 1
+        last["high"] = max(last["high"], float(p.max()))
+        last["low"] = min(last["low"], float(p.min()))
+        last["close"] = float(p[-1])
+        last["volume"] = sequential_sum(last["volume"], q)
+        last["quote_volume"] = sequential_sum(last["quote_volume"], pq[start:end])
+        last["number_of_trades"] += end - start
+        buy = is_buy[start:end]
+        last["taker_buy_base_asset_volume"] = sequential_sum(last["taker_buy_base_asset_volume"],
+                                                             np.where(buy, q, 0.0))
+        last["taker_buy_quote_asset_volume"] = sequential_sum(last["taker_buy_quote_asset_volume"],
+                                                              np.where(buy, pq[start:end], 0.0))
+
+    def _open_groups(self, trades: TradeArrays, pq: np.ndarray, is_buy: np.ndarray, start: int,
+                     end: int, keys: np.ndarray) -> tuple[dict[str, np.ndarray], np.ndarray]:
+        """One new bar per run of equal keys in trades[start:end], plus the key of each bar"""
+        k = keys[start:end]
+        group_starts = np.concatenate(([0], np.flatnonzero(k[1:] != k[:-1]) + 1))
+        lengths = np.diff(np.concatenate((group_starts, [end - start])))
+        group_ends = group_starts + lengths - 1
+        ids = trades.ids[start:end]
+        p = trades.prices[start:end]
+        q = trades.quantities[start:end]
+        buy = is_buy[start:end]
+        pq_run = pq[start:end]
+        groups = {
+            "start_id": ids[group_starts],
+            "current_id": ids[group_ends],
+            "next_id": ids[group_ends] + 1,
+            "open_time": trades.timestamps[start:end][group_starts],
+            "close_time": trades.timestamps[start:end][group_starts],
+            "open": p[group_starts],
+            "high": np.maximum.reduceat(p, group_starts),
+            "low": np.minimum.reduceat(p, group_starts),
+            "close": p[group_ends],
+            "volume": segment_sum(q, group_starts, lengths),
+            "quote_volume": segment_sum(pq_run, group_starts, lengths),
+            "is_closed": np.zeros(len(group_starts), dtype=np.bool_),
+            "number_of_trades": lengths.astype(np.int64),
+            "taker_buy_base_asset_volume": segment_sum(np.where(buy, q, 0.0), group_starts,
+                                                       lengths),
+            "taker_buy_quote_asset_volume": segment_sum(np.where(buy, pq_run, 0.0), group_starts,
+                                                        lengths),
+        }
+        return groups, k[group_starts]
+
+    def _close_and_extend(self, groups: dict[str, np.ndarray], close_times: np.ndarray):
+        """Enclose the current last bar and all but the final new group, then append them"""
+        n_groups = len(groups["start_id"])
+        if self._last is not None:
+            self._last["close_time"] = int(close_times[0])
+            self._last["is_closed"] = True
+            self._push_last()
+        groups["close_time"][:-1] = close_times[1:]
+        groups["is_closed"][:-1] = True
+        if n_groups > 1:
+            self._append_chunk({name: col[:-1] for name, col in groups.items()})
+        self._last = {name: groups[name][-1].item() for name in BAR_COLUMNS}
+
+    def _time_run(self, trades: TradeArrays, keys: np.ndarray, pq: np.ndarray, is_buy: np.ndarray,
+                  start: int, end: int) -> int:
+        cutoff = self.reference_cutoff
+        if self._last is not None:
+            current_key = self._last["open_time"] // cutoff
+            if keys[start] < current_key:
+                self.accumulator = int(trades.timestamps[start])
+                logger.warning(f"Invalid reference index: {current_key} "
+                               f"and next reference index: {keys[start]}")
+                return start + 1
+            split = start + int(np.searchsorted(keys[start:end], current_key, side="right"))
+            if split > start:
+                self._merge_into_last(trades, pq, is_buy, start, split)
+        else:
+            split = start
+        if split < end:
+            groups, group_keys = self._open_groups(trades, pq, is_buy, split, end, keys)
+            groups["open_time"] = (group_keys * cutoff).astype(np.int64)
+            self._close_and_extend(groups, group_keys * cutoff - 1)
+        self.accumulator = int(trades.timestamps[end - 1])
+        return end
+
+    def _tick_run(self, trades: TradeArrays, keys: np.ndarray, pq: np.ndarray, is_buy: np.ndarray,
+                  start: int, end: int) -> int:
+        split = start
+        if self._last is not None:
+            current_key = self._last["current_id"] // self.reference_cutoff
+            split = start + int(np.searchsorted(keys[start:end], current_key, side="right"))
+            if split > start:
+                self._merge_into_last(trades, pq, is_buy, start, split)
+        if split < end:
+            groups, _ = self._open_groups(trades, pq, is_buy, split, end, keys)
+            self._close_and_extend(groups, groups["open_time"] - 1)
+        self.accumulator = int(trades.ids[end - 1])
+        return end
+
+    # ------------------------------------------------------------------ volume
+
+    def _new_volume_bar(self, trade_id: int, price: float, timestamp: int):
+        self._push_last()
+        self._last = {
+            "start_id": trade_id, "current_id": trade_id, "next_id": trade_id + 1,
+            "open_time": timestamp, "close_time": timestamp,
+            "open": price, "high": price, "low": price, "close": price,
+            "volume": 0.0, "quote_volume": 0.0, "is_closed": False, "number_of_trades": 1,
+            "taker_buy_base_asset_volume": 0.0, "taker_buy_quote_asset_volume": 0.0,
+        }
+
+    def _add_fill(self, trade_id: int, price: float, quantity: float, buy: bool):
+        last = self._last
+        last["current_id"] = trade_id
+        last["next_id"] = trade_id + 1
+        last["high"] = max(last["high"], price)
+        last["low"] = min(last["low"], price)
+        last["close"] = price
+        last["volume"] += quantity
+        last["quote_volume"] += price * quantity
+        last["number_of_trades"] += 1
+        if buy:
+            last["taker_buy_base_asset_volume"] += quantity
+            last["taker_buy_quote_asset_volume"] += price * quantity
+
+    def _volume_trade(self, trade_id: int, price: float, quantity: float, timestamp: int,
+                      buy: bool):
+        """Exact scalar replay of one trade through the volume bar splitting loop"""
+        cutoff = self.reference_cutoff
+        quote = self.bar_type == BarType.QUOTE_VOLUME
+        while abs(quantity) > _EPSILON:
+            if self._last is None or self._last["is_closed"]:
+                self._new_volume_bar(trade_id, price, timestamp)
+            need_quote = cutoff - self.accumulator % cutoff
+            need = need_quote / price if quote else need_quote
+            if abs(quantity - need) < _EPSILON:
+                self._add_fill(trade_id, price, quantity, buy)
+                self._last["close_time"] = timestamp
+                self._last["is_closed"] = True
+                self.accumulator += need_quote + _BOUNDARY_NUDGE
+                quantity = 0
+            elif quantity < need:
+                self._add_fill(trade_id, price, quantity, buy)
+                self.accumulator += quantity * price if quote else quantity
+                quantity = 0
+            elif quantity > need:
+                self._add_fill(trade_id, price, need, buy)
+                self._last["close_time"] = timestamp
+                self._last["is_closed"] = True
+                self._last["next_id"] = trade_id
+                quantity -= need
+                self.accumulator += need_quote + _BOUNDARY_NUDGE
+            else:
+                logger.warning(f"Undefined behavior: {self.accumulator=} and {quantity=} "
+                               f"and {need_quote=}, {need=}")
+                break
+
+    def _volume_run(self, trades: TradeArrays, scalars: tuple[list, ...], pq: np.ndarray,
+                    is_buy: np.ndarray, start: int, end: int) -> int:
+        """
+        Trades that land strictly inside the open bar are found in bulk: the accumulator
+        trajectory is a running cumsum, so the first trade reaching a boundary is located
+        with one vectorized comparison per window. Boundary trades are replayed exactly.
+        Bars holding only a few trades are cheaper to replay in the scalar loop, so the
+        vectorized search only kicks in once the previous bar spanned enough trades.
+        """
+        cutoff = self.reference_cutoff
+        quote = self.bar_type == BarType.QUOTE_VOLUME
+        increments = pq if quote else trades.quantities
+        ids, prices, quantities, timestamps, buys = scalars
+        pos = start
+        window = _VECTOR_MIN_SPAN
+        while pos < end:
+            is_open = self._last is not None and not self._last["is_closed"]
+            if self._bar_span >= _VECTOR_MIN_SPAN and is_open:
+                stop = min(end, pos + window)
+                q = trades.quantities[pos:stop]
+                acc = np.cumsum(np.concatenate(([self.accumulator], increments[pos:stop])))
+                need = cutoff - acc[:-1] % cutoff
+                if quote:
+                    need = need / trades.prices[pos:stop]
+                inside = (np.abs(q) > _EPSILON) & ~(np.abs(q - need) < _EPSILON) & (q < need)
+                n_inside = int(np.argmin(inside)) if not inside.all() else len(inside)
+                if n_inside > 0:
+                    self._merge_into_last(trades, pq, is_buy, pos, pos + n_inside)
+                    self.accumulator = float(acc[n_inside])
+                    pos += n_inside
+                if n_inside == len(inside):
+                    window *= 2
+                    continue
+                window = max(_VECTOR_MIN_SPAN, 2 * n_inside)
+            i = pos
+            is_open = self._last is not None and not self._last["is_closed"]
+            last = self._last if is_open else None
+            self._volume_trade(ids[i], prices[i], quantities[i], timestamps[i], buys[i])
+            pos += 1
+            if last is not None and last["is_closed"]:
+                # The trade closed the open bar, whether or not its remainder opened the next one
+                self._bar_span = last["number_of_trades"]
+            if self._last is None or self._last["next_id"] != ids[i] + 1:
+                # The trade was skipped or split exactly up to a boundary; the driver
+                # re-validates the next one
+                return pos
+        return pos
+
+    # ------------------------------------------------------------------ handoff
+
+    def to_dict(self) -> dict:
+        """Same layout as BarAggregator.to_dict() of the equivalent streaming aggregator"""
+        return {
+            "buf_size": self.buf_size,
+            "reference_cutoff": self.reference_cutoff,
+            "bars": self.retained_bars().to_dicts(),
+            "completeness_threshold": self.completeness_threshold,
+            "missing_trades": self.missing_trades,
+            "missing_intervals": [
+                Interval(start_id=start_id, end_id=end_id).model_dump()
+                for start_id, end_id in self.missing_intervals
+            ],
+            "repair_window": 0,
+            "accumulator": self.accumulator,
+        }
+
+    def to_aggregator(self) -> BarAggregator:
+        """Streaming aggregator continuing exactly where this batch stopped"""
+        return AggregatorFactory.from_dict(self.bar_type, self.to_dict())
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Aggregator benchmark suite.
+
+Feeds synthetic trade streams with realistic gap patterns to every bar aggregator and
+reports throughput, memory and `to_dataframe()` latency per bar type and `buf_size` as
+JSON, so results of two commits can be compared:
+
+    python -m solvexity.toolbox.aggregator.benchmark -o before.json
+    python -m solvexity.toolbox.aggregator.benchmark -o after.json --baseline before.json
+"""
+
+import argparse
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from operator import itemgetter
+import numpy as np
+from solvexity.model.trade import Trade
+from solvexity.model.shared import Symbol, Exchange, Instrument, Side
+from .bar_aggregator import BarType, BarAggregator, AggregatorFactory
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CUTOFFS = {
+    BarType.TIME: 1000,
+    BarType.TICK: 100,
+    BarType.BASE_VOLUME: 1.0,
+    BarType.QUOTE_VOLUME: 50000.0,
+}
+
+
+def make_trades(n: int, seed: int = 0, gap_rate: float = 0.0002, max_gap: int = 50,
+                whale_rate: float = 0.01) -> list[Trade]:
+    """
+    BTCUSDT-like tape: exponential inter-arrival times, a log-normal random walk price,
+    exponential sizes with occasional whales, and id gaps of 1..`max_gap` trades at `gap_rate`.
+    """
+    rng = np.random.default_rng(seed)
+    steps = np.ones(n, dtype=np.int64)
+    gaps = rng.random(n) < gap_rate
+    steps[gaps] += rng.integers(1, max_gap + 1, int(gaps.sum()))
+    ids = 1_000_000 + np.cumsum(steps)
+    timestamps = 1_700_000_000_000 + np.cumsum(rng.exponential(50, n)).astype(np.int64)
+    prices = np.round(50000.0 * np.exp(np.cumsum(rng.normal(0, 1e-4, n))), 2)
+    quantities = np.round(rng.exponential(0.02, n), 5)
+    whales = rng.random(n) < whale_rate
+    quantities[whales] *= 100
+    is_buy = rng.random(n) < 0.5
+    symbol = Symbol(base="BTC", quote="USDT")
+    return [
+        Trade(
+            id=int(ids[i]),
+            exchange=Exchange.EXCHANGE_BINANCE,
+            instrument=Instrument.INSTRUMENT_SPOT,
+            symbol=symbol,
+            side=Side.SIDE_BUY if is_buy[i] else Side.SIDE_SELL,
+            price=float(prices[i]),
+            quantity=float(quantities[i]),
+            timestamp=int(timestamps[i]),
+        )
+        for i in range(n)
+    ]
+
+
+@contextmanager
+def quiet():
+    """Silence the per-bar INFO and per-gap WARNING logs while measuring"""
+    logging.disable(logging.WARNING)
+    try:
+        yield
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def feed(aggregator: BarAggregator, trades: list[Trade]) -> float:
+    start = time.perf_counter()
+    for trade in trades:
+        aggregator.on_trade(trade)
+    return time.perf_counter() - start
+
+
+def bench_aggregator(bar_type: BarType, buf_size: int, trades: list[Trade],
+                     reference_cutoff: int | float, completeness_threshold: float = 0.98,
+                     repeat: int = 3, dataframe_repeat: int = 5) -> dict:
+    def create() -> BarAggregator:
+        return AggregatorFactory.create(bar_type, buf_size, reference_cutoff,
+                                        completeness_threshold)
+
+    with quiet():
+        timings = []
+        for _ in range(repeat):
+            aggregator = create()
+            timings.append(feed(aggregator, trades))
+
+        # Memory is traced in a separate pass, tracemalloc slows the interpreter down.
+        # CPython has no cumulative allocation counter, so blocks are the net growth in
+        # live blocks, what the aggregator retains; transient garbage shows up in the
+        # traced peak instead.
+        aggregator = create()
+        blocks_before = sys.getallocatedblocks()
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        feed(aggregator, trades)
+        after, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        blocks_after = sys.getallocatedblocks()
+
+        dataframe_timings = []
+        for _ in range(dataframe_repeat):
+            start = time.perf_counter()
+            aggregator.to_dataframe(is_closed=True)
+            dataframe_timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    n_bars = aggregator.size()
+    return {
+        "bar_type": bar_type.value,
+        "buf_size": buf_size,
+        "reference_cutoff": reference_cutoff,
+        "n_trades": len(trades),
+        "n_bars": n_bars,
+        "trades_per_sec": len(trades) / best,
+        "us_per_trade": best / len(trades) * 1e6,
+        "retained_blocks_per_trade": (blocks_after - blocks_before) / len(trades),
+        "retained_bytes_per_bar": (after - before) / n_bars if n_bars > 0 else 0.0,
+        "transient_peak_bytes": peak - after,
+        "to_dataframe_ms": statistics.median(dataframe_timings) * 1e3,
+    }
+
+
+def run_suite(n_trades: int = 200_000, buf_sizes: tuple[int, ...] = (100, 1_000, 10_000),
+              bar_types: tuple[BarType, ...] = tuple(BarType), seed: int = 0,
+              repeat: int = 3) -> dict:
+    trades = make_trades(n_trades, seed=seed)
+    results = []
+    for bar_type in bar_types:
+        for buf_size in buf_sizes:
+            result = bench_aggregator(bar_type, buf_size, trades, DEFAULT_CUTOFFS[bar_type],
+                                      repeat=repeat)
+            logger.info(f"{bar_type.value} buf_size={buf_size}: "
+                        f"{result['trades_per_sec']:,.0f} trades/s, "
+                        f"{result['retained_bytes_per_bar']:,.0f} B/bar, "
+                        f"to_dataframe {result['to_dataframe_ms']:.2f} ms")
+            results.append(result)
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "n_trades": n_trades,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, tolerance: float = 0.1) -> list[str]:
+    """Describe every result more than `tolerance` slower or larger than the baseline"""
+    key = itemgetter("bar_type", "buf_size")
+    previous = {key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        base = previous.get(key(result))
+        if base is None:
+            continue
+        checks = [
+            ("trades_per_sec", base["trades_per_sec"] / result["trades_per_sec"]),
+            ("retained_bytes_per_bar",
+             result["retained_bytes_per_bar"] / base["retained_bytes_per_bar"]
+                if base["retained_bytes_per_bar"] > 0 else 1.0),
+            ("to_dataframe_ms", result["to_dataframe_ms"] / base["to_dataframe_ms"]
+                if base["to_dataframe_ms"] > 0 else 1.0),
+        ]
+        for metric, ratio in checks:
+            if ratio > 1 + tolerance:
+                regressions.append(f"{result['bar_type']} buf_size={result['buf_size']}: "
+                                   f"{metric} {base[metric]:.4g} -> {result[metric]:.4g}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the bar aggregators and emit JSON results",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("-n", "--n-trades", type=int, default=200_000,
+                        help="Trades per synthetic stream")
+    parser.add_argument("-b", "--buf-sizes", type=int, nargs="+", default=[100, 1_000, 10_000],
+                        help="Buffer sizes")
+    parser.add_argument("-t", "--bar-types", type=str, nargs="+",
+                        default=[bar_type.value for bar_type in BarType],
+                        help="Bar types to benchmark")
+    parser.add_argument("-r", "--repeat", type=int, default=3,
+                        help="Timed runs per case, the best one is reported")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic stream")
+    parser.add_argument("-o", "--output", type=str, default=None,
+                        help="Write results to this JSON file")
+    parser.add_argument("--baseline", type=str, default=None,
+                        help="Compare against an earlier results file")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    results = run_suite(args.n_trades, args.buf_sizes,
+                        [BarType.from_str(t) for t in args.bar_types], args.seed, args.repeat)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(json.load(f), results, args.tolerance)
+        for regression in regressions:
+            logger.warning(f"Regression: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    from solvexity.logging import setup_logging
+    setup_logging()
+    sys.exit(main())
@@ -0,0 +1,201 @@
+import asyncio
+import json
+import logging
+import os
+import struct
+import tempfile
+import numpy as np
+from solvexity.model.bar import Bar
+from solvexity.model.shared import Symbol
+from .bar_aggregator import (
+    BarType, BarAggregator, AggregatorFactory, Interval, FixedPoint,
+    TimeBarAggregator, TickBarAggregator, BaseVolumeBarAggregator, QuoteVolumeBarAggregator
+)
+from .batch import BAR_COLUMNS, BAR_DTYPES, BarColumns
+
+logger = logging.getLogger(__name__)
+
+# File layout:
+#   MAGIC | version (u16) | header length (u32) | JSON header | bar columns | missing intervals
+# The JSON header holds the scalars; every array is raw little-endian data in BAR_COLUMNS order.
+MAGIC = b"SLVXCKPT"
+VERSION = 1
+_PREAMBLE = struct.Struct("<8sHI")
+
+_BAR_TYPES = {
+    TimeBarAggregator: BarType.TIME,
+    TickBarAggregator: BarType.TICK,
+    BaseVolumeBarAggregator: BarType.BASE_VOLUME,
+    QuoteVolumeBarAggregator: BarType.QUOTE_VOLUME,
+}
+
+
+def bar_type_of(aggregator: BarAggregator) -> BarType:
+    try:
+        return _BAR_TYPES[type(aggregator)]
+    except KeyError:
+        raise ValueError(f"Checkpoints are not supported for {type(aggregator).__name__}")
+
+
+def dump_checkpoint(aggregator: BarAggregator) -> bytes:
+    bars = BarColumns.from_bars(aggregator.bars)
+    if any(bar.symbol != bars.symbol for bar in aggregator.bars):
+        raise ValueError("All bars of a checkpointed aggregator must share one symbol")
+    intervals = np.array(
+        [(interval.start_id, interval.end_id) for interval in aggregator.missing_intervals],
+        dtype="<i8",
+    ).reshape(-1, 2)
+    fixed_point = getattr(aggregator, "fixed_point", None)
+    header = json.dumps({
+        "bar_type": bar_type_of(aggregator).value,
+        "buf_size": aggregator.buf_size,
+        "reference_cutoff": aggregator.reference_cutoff,
+        "completeness_threshold": aggregator.completeness_threshold,
+        "repair_window": aggregator.repair_window,
+        "missing_trades": aggregator.missing_trades,
+        "accumulator": aggregator.accumulator,
+        "fixed_point": fixed_point.model_dump() if fixed_point is not None else None,
+        "open_units": aggregator.open_units if fixed_point is not None else None,
+        "symbol": bars.symbol.model_dump() if bars.symbol is not None else None,
+        "n_bars": len(bars),
+        "n_intervals": len(intervals),
+    }).encode()
+    parts = [_PREAMBLE.pack(MAGIC, VERSION, len(header)), header]
+    for name in BAR_COLUMNS:
+        parts.append(bars[name].astype(np.dtype(BAR_DTYPES[name]).newbyteorder("<"),
+                                       copy=False).tobytes())
+    parts.append(intervals.tobytes())
+    return b"".join(parts)
+
+
+def is_checkpoint(data: bytes) -> bool:
+    return data[:len(MAGIC)] == MAGIC
+
+
+def load_checkpoint(data: bytes) -> BarAggregator:
+    magic, version, header_len = _PREAMBLE.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Not an aggregator checkpoint")
+    if version != VERSION:
+        raise ValueError(f"Unsupported checkpoint version: {version}")
+    offset = _PREAMBLE.size
+    header = json.loads(data[offset:offset + header_len])
+    offset += header_len
+
+    n_bars = header["n_bars"]
+    columns = {}
+    for name in BAR_COLUMNS:
+        dtype = np.dtype(BAR_DTYPES[name]).newbyteorder("<")
+        columns[name] = np.frombuffer(data, dtype=dtype, count=n_bars, offset=offset).tolist()
+        offset += n_bars * dtype.itemsize
+    intervals = np.frombuffer(data, dtype="<i8", count=2 * header["n_intervals"], offset=offset)
+
+    bar_type = BarType.from_str(header["bar_type"])
+    fixed_point = header.get("fixed_point")
+    aggregator = AggregatorFactory.create(
+        bar_type, header["buf_size"], header["reference_cutoff"], header["completeness_threshold"],
+        header.get("repair_window", 0),
+        FixedPoint.model_validate(fixed_point) if fixed_point is not None else None,
+    )
+    symbol = Symbol.model_validate(header["symbol"]) if header["symbol"] is not None else None
+    # Values come straight from typed arrays, so per-bar validation is skipped
+    for row in zip(*(columns[name] for name in BAR_COLUMNS)):
+        aggregator.bars.append(Bar.model_construct(symbol=symbol, **dict(zip(BAR_COLUMNS, row))))
+    aggregator.missing_trades = header["missing_trades"]
+    for start_id, end_id in intervals.reshape(-1, 2).tolist():
+        aggregator.missing_intervals.append(Interval(start_id=start_id, end_id=end_id))
+    aggregator.accumulator = header["accumulator"]
+    if fixed_point is not None:
+        aggregator.open_units = list(header["open_units"])
+    return aggregator
+
+
+def write_atomic(path: str, data: bytes):
+    """Write to a temporary file next to `path`, then rename it over `path`"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def save_checkpoint(aggregator: BarAggregator, path: str):
+    write_atomic(path, dump_checkpoint(aggregator))
+
+
+def load_checkpoint_file(path: str, bar_type: BarType) -> BarAggregator:
+    """
+    Load a binary checkpoint, falling back to the JSON `to_dict()` format of older files.
+    If `path` does not exist yet, the sibling `.json` snapshot of an older deployment is
+    loaded instead.
+    """
+    if not os.path.exists(path):
+        legacy_path = os.path.splitext(path)[0] + ".json"
+        if legacy_path != path and os.path.exists(legacy_path):
+            logger.info(f"{path} does not exist, loading {legacy_path} instead")
+            path = legacy_path
+    with open(path, "rb") as f:
+        data = f.read()
+    if is_checkpoint(data):
+        return load_checkpoint(data)
+    logger.info(f"{path} is not a binary checkpoint, loading it as JSON")
+    return AggregatorFactory.from_dict(bar_type, json.loads(data))
+
+
+class CheckpointWriter:
+    """
+    Periodically snapshots an aggregator in the background.
+
+    A snapshot is taken every `every_bars` calls to `on_bar()` and/or every `every_seconds`
+    seconds. Serialization runs on the event loop, between trades, so the state is
+    consistent; only the file write goes to a worker thread.
+    """
+
+    def __init__(self, path: str, aggregator: BarAggregator, every_bars: int = 0,
+                 every_seconds: float = 0):
+        self.path = path
+        self.aggregator = aggregator
+        self.every_bars = every_bars
+        self.every_seconds = every_seconds
+        self.n_snapshots = 0
+        self._bars_since_snapshot = 0
+        self._due = asyncio.Event()
+
+    def on_bar(self):
+        self._bars_since_snapshot += 1
+        if self.every_bars > 0 and self._bars_since_snapshot >= self.every_bars:
+            self._due.set()
+
+    async def snapshot(self):
+        self._due.clear()
+        self._bars_since_snapshot = 0
+        data = dump_checkpoint(self.aggregator)
+        write = asyncio.ensure_future(asyncio.to_thread(write_atomic, self.path, data))
+        try:
+            await asyncio.shield(write)
+        except asyncio.CancelledError:
+            # The thread cannot be stopped; finish the write so no later save is overtaken by it
+            await write
+            raise
+        self.n_snapshots += 1
+        logger.info(f"Checkpointed aggregator to {self.path} ({len(data)} bytes)")
+
+    async def run(self):
+        """Snapshot loop; cancel the task and await it to stop it after any write in progress"""
+        timeout = self.every_seconds if self.every_seconds > 0 else None
+        while True:
+            try:
+                await asyncio.wait_for(self._due.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.snapshot()
+            except Exception as e:
+                logger.error(f"Failed to checkpoint aggregator to {self.path}: {e}")
@@ -0,0 +1,165 @@
+from collections import OrderedDict
+from typing import Callable, Iterator
+import logging
+from pydantic import BaseModel
+from solvexity.model.trade import Trade
+from solvexity.model.shared import Exchange, Instrument, Symbol
+from .bar_aggregator import BarType, BarAggregator, AggregatorFactory, FixedPoint
+from .timer import TimeBarClock
+
+logger = logging.getLogger(__name__)
+
+MarketKey = tuple[Exchange, Instrument, Symbol]
+
+
+class BarSpec(BaseModel):
+    """Template for the aggregator built for every market"""
+    model_config = {"frozen": True}
+
+    type: BarType
+    reference_cutoff: int | float
+    buf_size: int
+    completeness_threshold: float = 1.0
+    repair_window: int = 0
+    fixed_point: FixedPoint | None = None
+    # Time bars only: close on the clock `close_grace_ms` after the boundary, see TimeBarClock
+    close_grace_ms: int | None = None
+    emit_empty: bool = False
+
+    def create(self) -> BarAggregator:
+        return AggregatorFactory.create(self.type, self.buf_size, self.reference_cutoff,
+                                        self.completeness_threshold, self.repair_window,
+                                        self.fixed_point)
+
+    @classmethod
+    def of(cls, aggregator: BarAggregator, bar_type: BarType) -> 'BarSpec':
+        """The spec an aggregator of `bar_type` was created with, e.g. one from a checkpoint"""
+        return cls(type=bar_type, reference_cutoff=aggregator.reference_cutoff,
+                   buf_size=aggregator.buf_size,
+                   completeness_threshold=aggregator.completeness_threshold,
+                   repair_window=aggregator.repair_window,
+                   fixed_point=getattr(aggregator, "fixed_point", None))
+
+
+class AggregatorManager:
+    """
+    Routes a mixed trade stream (e.g. a `trade.>` subscription) to one aggregator per
+    (exchange, instrument, symbol, bar spec).
+
+    Aggregators are created lazily from `specs` on a market's first trade. Markets that
+    have not traded for `idle_timeout_ms` of event time are evicted; markets are kept in
+    last-trade order so eviction only ever looks at the stalest entries. Time aggregators
+    of specs with `close_grace_ms` are registered with `clock` while their market lives.
+    """
+
+    def __init__(self, specs: list[BarSpec], idle_timeout_ms: int | None = None,
+                 on_evict: Callable[[MarketKey, dict[BarSpec, BarAggregator]], None] | None = None,
+                 clock: TimeBarClock | None = None):
+        if len(specs) == 0:
+            raise ValueError("At least one bar spec is required")
+        self.specs = list(dict.fromkeys(specs))
+        self.idle_timeout_ms = idle_timeout_ms
+        self.on_evict = on_evict
+        self.clock = clock
+        self.markets: OrderedDict[MarketKey, dict[BarSpec, BarAggregator]] = OrderedDict()
+        self.last_seen: dict[MarketKey, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.markets)
+
+    def __contains__(self, market: MarketKey) -> bool:
+        return market in self.markets
+
+    def get(self, market: MarketKey, spec: BarSpec) -> BarAggregator | None:
+        aggregators = self.markets.get(market)
+        return aggregators.get(spec) if aggregators is not None else None
+
+    def items(self) -> Iterator[tuple[MarketKey, BarSpec, BarAggregator]]:
+        for market, aggregators in self.markets.items():
+            for spec, aggregator in aggregators.items():
+                yield market, spec, aggregator
+
+    def on_trade(self, trade: Trade) -> dict[BarSpec, BarAggregator]:
+        """Feed a trade to every aggregator of its market and return them"""
+        market = (trade.exchange, trade.instrument, trade.symbol)
+        aggregators = self.markets.get(market)
+        if aggregators is None:
+            aggregators = {spec: spec.create() for spec in self.specs}
+            self.markets[market] = aggregators
+            self._register(aggregators, trade.timestamp)
+            logger.info(f"Created aggregators for {market}")
+        else:
+            self.markets.move_to_end(market)
+        self.last_seen[market] = trade.timestamp
+        for aggregator in aggregators.values():
+            aggregator.on_trade(trade)
+        if self.idle_timeout_ms is not None:
+            self.evict_idle(trade.timestamp)
+        return aggregators
+
+    def evict_idle(self, now_ms: int) -> list[MarketKey]:
+        """Drop markets whose last trade is older than `idle_timeout_ms` before `now_ms`"""
+        evicted = []
+        if self.idle_timeout_ms is None:
+            return evicted
+        while len(self.markets) > 0:
+            market = next(iter(self.markets))
+            if now_ms - self.last_seen[market] <= self.idle_timeout_ms:
+                break
+            evicted.append(market)
+            self.evict(market)
+        return evicted
+
+    def _register(self, aggregators: dict[BarSpec, BarAggregator], now_ms: int):
+        if self.clock is None:
+            return
+        for spec, aggregator in aggregators.items():
+            if spec.type == BarType.TIME and spec.close_grace_ms is not None:
+                self.clock.register(aggregator, now_ms, spec.close_grace_ms, spec.emit_empty)
+
+    def evict(self, market: MarketKey):
+        aggregators = self.markets.pop(market)
+        self.last_seen.pop(market)
+        if self.clock is not None:
+            for aggregator in aggregators.values():
+                self.clock.unregister(aggregator)
+        logger.info(f"Evicted aggregators for {market}")
+        if self.on_evict is not None:
+            self.on_evict(market, aggregators)
+
+    def to_dict(self) -> dict:
+        return {
+            "specs": [spec.model_dump(mode="json") for spec in self.specs],
+            "idle_timeout_ms": self.idle_timeout_ms,
+            "markets": [
+                {
+                    "exchange": market[0].value,
+                    "instrument": market[1].value,
+                    "symbol": market[2].model_dump(),
+                    "last_seen": self.last_seen[market],
+                    "aggregators": [
+                        {"spec": spec.model_dump(mode="json"), "state": aggregator.to_dict()}
+                        for spec, aggregator in aggregators.items()
+                    ],
+                }
+                for market, aggregators in self.markets.items()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict,
+                  on_evict: Callable[[MarketKey, dict[BarSpec, BarAggregator]], None] | None = None,
+                  clock: TimeBarClock | None = None) -> 'AggregatorManager':
+        manager = cls([BarSpec.model_validate(spec) for spec in data["specs"]],
+                      data["idle_timeout_ms"], on_evict, clock)
+        for entry in data["markets"]:
+            market = (Exchange(entry["exchange"]), Instrument(entry["instrument"]),
+                      Symbol.model_validate(entry["symbol"]))
+            aggregators = {}
+            for item in entry["aggregators"]:
+                spec = BarSpec.model_validate(item["spec"])
+                aggregators[spec] = AggregatorFactory.from_dict(spec.type, item["state"])
+            manager.markets[market] = aggregators
+            manager.last_seen[market] = entry["last_seen"]
+            manager._register(aggregators, entry["last_seen"])
+        return manager
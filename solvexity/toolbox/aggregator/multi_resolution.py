@@ -0,0 +1,149 @@
+from collections import deque
+import logging
+from solvexity.model.trade import Trade
+from solvexity.model.bar import Bar
+from .bar_aggregator import BarAggregator, BarBuffer, TimeBarAggregator, Interval
+
+logger = logging.getLogger(__name__)
+
+
+class RollupBarAggregator(BarAggregator):
+    """
+    A coarser time level fed with the closed bars of the level below it.
+
+    The open bar only contains bars the finer level has already closed, so it trails the
+    live trade by at most one fine interval. Closed bars carry the same ids, times and
+    OHLC as a standalone TimeBarAggregator with this cutoff. Gap and completeness
+    accounting belongs to the finest level and is shared through `source`, and a trade
+    passed to `on_trade` goes to the finest level, which cascades into every level.
+
+    Levels are saved with their `MultiTimeBarAggregator` through `to_dict`; binary
+    checkpoints reject them, as they do the multi-resolution aggregator itself.
+    """
+
+    def __init__(self, buf_size: int, reference_cutoff: int, source: BarAggregator):
+        # Completeness state lives in `source`, so BarAggregator.__init__ is not reused
+        self.buf_size = buf_size
+        self.reference_cutoff = reference_cutoff
+        self.bars = BarBuffer(maxlen=buf_size)
+        self.source = source
+
+    @property
+    def completeness_threshold(self) -> float:
+        return self.source.completeness_threshold
+
+    @property
+    def missing_trades(self) -> int:
+        return self.source.missing_trades
+
+    @property
+    def missing_intervals(self) -> deque[Interval]:
+        return self.source.missing_intervals
+
+    def is_valid(self) -> bool:
+        return self.source.is_valid()
+
+    def reset(self):
+        self.bars.clear()
+
+    def on_trade(self, trade: Trade):
+        self.source.on_trade(trade)
+
+    def on_bar(self, bar: Bar, next_open_time: int) -> Bar | None:
+        """
+        Fold a closed finer bar in; `next_open_time` is the open time of the finer bar that
+        replaced it. Returns this level's bar when that crosses this level's boundary.
+        """
+        key = bar.open_time // self.reference_cutoff
+        if len(self.bars) == 0 or self.bars[-1].is_closed:
+            coarse = bar.model_copy()
+            coarse.open_time = key * self.reference_cutoff
+            coarse.is_closed = False
+            self.bars.append(coarse)
+        else:
+            self.bars[-1].merge(bar)
+        next_key = next_open_time // self.reference_cutoff
+        if next_key > key:
+            self.bars[-1].enclose(next_key * self.reference_cutoff - 1)
+            return self.bars[-1]
+        return None
+
+    def to_dict(self) -> dict:
+        return {
+            "reference_cutoff": self.reference_cutoff,
+            "bars": [bar.model_dump() for bar in self.bars],
+        }
+
+
+class MultiTimeBarAggregator(TimeBarAggregator):
+    """
+    Time bars at several resolutions from a single pass over the trades.
+
+    Each trade only updates the finest bar (this aggregator itself, validated exactly like
+    a TimeBarAggregator). Whenever a fine bar closes it cascades through the coarser
+    levels, so 1s/1m/5m/1h/1d bars cost one Bar update per trade plus one merge per closed
+    bar and level. Every cutoff must be a multiple of the previous one.
+    """
+
+    def __init__(self, buf_size: int, reference_cutoffs: list[int],
+                 completeness_threshold: float = 1.0):
+        cutoffs = sorted(reference_cutoffs)
+        if len(cutoffs) == 0:
+            raise ValueError("At least one reference cutoff is required")
+        for finer, coarser in zip(cutoffs[:-1], cutoffs[1:]):
+            if coarser % finer != 0:
+                raise ValueError(f"Reference cutoff {coarser} is not a multiple of {finer}")
+        super().__init__(buf_size, cutoffs[0], completeness_threshold)
+        self.reference_cutoffs = cutoffs
+        self.levels: list[RollupBarAggregator] = [
+            RollupBarAggregator(buf_size, cutoff, source=self) for cutoff in cutoffs[1:]
+        ]
+
+    def level(self, reference_cutoff: int) -> BarAggregator:
+        """Aggregator view for one resolution; the finest resolution is this aggregator"""
+        if reference_cutoff == self.reference_cutoff:
+            return self
+        for level in self.levels:
+            if level.reference_cutoff == reference_cutoff:
+                return level
+        raise KeyError(f"No level with reference cutoff {reference_cutoff}")
+
+    def to_dict(self) -> dict:
+        data = super().to_dict()
+        data["reference_cutoffs"] = self.reference_cutoffs
+        data["levels"] = [level.to_dict() for level in self.levels]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'MultiTimeBarAggregator':
+        aggregator = cls(data["buf_size"], data["reference_cutoffs"],
+                         data["completeness_threshold"])
+        for bar in data["bars"]:
+            aggregator.bars.append(Bar.model_validate(bar))
+        aggregator.missing_trades = data["missing_trades"]
+        for interval in data["missing_intervals"]:
+            aggregator.missing_intervals.append(Interval.model_validate(interval))
+        aggregator.accumulator = data["accumulator"]
+        for level, level_data in zip(aggregator.levels, data["levels"]):
+            for bar in level_data["bars"]:
+                level.bars.append(Bar.model_validate(bar))
+        return aggregator
+
+    def reset(self):
+        super().reset()
+        for level in self.levels:
+            level.reset()
+
+    def on_trade(self, trade: Trade):
+        previous = self.bars[-1] if len(self.bars) > 0 else None
+        super().on_trade(trade)
+        if previous is None or not previous.is_closed:
+            return
+        if len(self.bars) == 0 or self.bars[-1] is previous:
+            return
+        next_open_time = self.bars[-1].open_time
+        closed = previous
+        for level in self.levels:
+            closed = level.on_bar(closed, next_open_time)
+            if closed is None:
+                break
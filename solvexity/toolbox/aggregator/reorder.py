@@ -0,0 +1,92 @@
+import heapq
+import logging
+from solvexity.model.trade import Trade
+
+logger = logging.getLogger(__name__)
+
+
+class ReorderBuffer:
+    """
+    Holds slightly out-of-order trades of one stream and releases them in id order.
+
+    A trade is released as soon as every smaller id has been released. A trade waiting on
+    a missing id is released anyway, leaving the gap for the aggregator to record, once
+    it is `max_id_distance` ids behind the newest trade seen or `max_delay_ms` older than
+    the newest event time seen (or the `now_ms` given to `expire`). With both bounds at 0
+    trades pass straight through. Trades below the released sequence are duplicates or
+    arrived too late and are dropped. Without a `next_id` the sequence starts at the first
+    trade pushed. Push and release are O(log k) for k held trades.
+    """
+
+    def __init__(self, max_id_distance: int = 0, max_delay_ms: int = 0, next_id: int | None = None):
+        self.max_id_distance = max_id_distance
+        self.max_delay_ms = max_delay_ms
+        self.next_id = next_id
+        self.n_dropped = 0
+        self._heap: list[tuple[int, Trade]] = []
+        self._held: set[int] = set()
+        self._max_id: int | None = None
+        self._now_ms: int | None = None
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, trade: Trade) -> list[Trade]:
+        """Add a trade and return the trades it releases, in id order"""
+        if self.next_id is None:
+            self.next_id = trade.id
+        if (self.next_id is not None and trade.id < self.next_id) or trade.id in self._held:
+            self.n_dropped += 1
+            return []
+        heapq.heappush(self._heap, (trade.id, trade))
+        self._held.add(trade.id)
+        if self._max_id is None or trade.id > self._max_id:
+            self._max_id = trade.id
+        if self._now_ms is None or trade.timestamp > self._now_ms:
+            self._now_ms = trade.timestamp
+        return self._release()
+
+    def expire(self, now_ms: int) -> list[Trade]:
+        """Release what has waited `max_delay_ms` by `now_ms`, for streams that went quiet"""
+        if self._now_ms is None or now_ms > self._now_ms:
+            self._now_ms = now_ms
+        return self._release()
+
+    def flush(self) -> list[Trade]:
+        """Release every held trade regardless of gaps"""
+        released = []
+        while len(self._heap) > 0:
+            released.append(self._pop())
+        return released
+
+    def discard(self) -> int:
+        """Drop every held trade without releasing it; returns how many were dropped"""
+        n = len(self._heap)
+        self._heap.clear()
+        self._held.clear()
+        return n
+
+    def _expired(self, trade: Trade) -> bool:
+        if self.max_id_distance <= 0 and self.max_delay_ms <= 0:
+            return True
+        if self.max_id_distance > 0 and self._max_id - trade.id >= self.max_id_distance:
+            return True
+        return self.max_delay_ms > 0 and self._now_ms - trade.timestamp >= self.max_delay_ms
+
+    def _release(self) -> list[Trade]:
+        released = []
+        while len(self._heap) > 0:
+            trade_id, trade = self._heap[0]
+            if trade_id != self.next_id and not self._expired(trade):
+                break
+            if trade_id != self.next_id:
+                logger.warning(f"Reorder window expired waiting for trades "
+                               f"{self.next_id} to {trade_id}")
+            released.append(self._pop())
+        return released
+
+    def _pop(self) -> Trade:
+        trade_id, trade = heapq.heappop(self._heap)
+        self._held.discard(trade_id)
+        self.next_id = trade_id + 1
+        return trade
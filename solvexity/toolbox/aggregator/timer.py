@@ -0,0 +1,183 @@
+import logging
+from typing import Callable
+from solvexity.clock import Clock, get_clock
+from solvexity.model.bar import Bar
+from .bar_aggregator import TimeBarAggregator
+from .multi_resolution import MultiTimeBarAggregator
+
+logger = logging.getLogger(__name__)
+
+
+class Timer:
+    __slots__ = ("deadline_tick", "callback", "slot")
+
+    def __init__(self, deadline_tick: int, callback: Callable[[int], None]):
+        self.deadline_tick = deadline_tick
+        self.callback = callback
+        self.slot: dict | None = None
+
+
+class TimingWheel:
+    """
+    Hierarchical timing wheel with `levels` wheels of `wheel_size` slots of `tick_ms`.
+
+    Level 0 holds the timers due within one rotation, each further level covers
+    `wheel_size` times the span of the level below and is cascaded down as the lower
+    wheel wraps. Scheduling and cancelling are O(1); `advance` costs O(1) per elapsed
+    tick plus the timers it fires or cascades. Deadlines are rounded up to the next
+    tick, so callbacks never fire early. Callbacks get the `now_ms` passed to `advance`.
+    """
+
+    def __init__(self, tick_ms: int = 100, wheel_size: int = 256, levels: int = 4,
+                 start_ms: int = 0):
+        if wheel_size & (wheel_size - 1) != 0:
+            raise ValueError(f"Wheel size must be a power of two, got {wheel_size}")
+        self.tick_ms = tick_ms
+        self.wheel_size = wheel_size
+        self.levels = levels
+        self._bits = wheel_size.bit_length() - 1
+        self._mask = wheel_size - 1
+        self._slots: list[list[dict[int, Timer]]] = [
+            [{} for _ in range(wheel_size)] for _ in range(levels)
+        ]
+        self._due: dict[int, Timer] = {}
+        self._tick = start_ms // tick_ms
+        self._n_timers = 0
+
+    def __len__(self) -> int:
+        return self._n_timers
+
+    @property
+    def now_ms(self) -> int:
+        return self._tick * self.tick_ms
+
+    def schedule(self, deadline_ms: int, callback: Callable[[int], None]) -> Timer:
+        timer = Timer(-(-deadline_ms // self.tick_ms), callback)
+        self._place(timer)
+        self._n_timers += 1
+        return timer
+
+    def cancel(self, timer: Timer):
+        if timer.slot is None:
+            return
+        del timer.slot[id(timer)]
+        timer.slot = None
+        self._n_timers -= 1
+
+    def _index(self, tick: int, level: int) -> int:
+        return (tick >> (self._bits * level)) & self._mask
+
+    def _place(self, timer: Timer):
+        delta = timer.deadline_tick - self._tick
+        if delta <= 0:
+            slot = self._due
+        else:
+            for level in range(self.levels):
+                if delta < 1 << (self._bits * (level + 1)):
+                    slot = self._slots[level][self._index(timer.deadline_tick, level)]
+                    break
+            else:
+                raise ValueError(f"Deadline is beyond the wheel span "
+                                 f"of {self.wheel_size ** self.levels} ticks")
+        slot[id(timer)] = timer
+        timer.slot = slot
+
+    def _fire(self, slot: dict[int, Timer], now_ms: int) -> int:
+        timers = list(slot.values())
+        slot.clear()
+        for timer in timers:
+            timer.slot = None
+        self._n_timers -= len(timers)
+        for timer in timers:
+            try:
+                timer.callback(now_ms)
+            except Exception as e:
+                logger.error(f"Timer callback failed: {e}", exc_info=True)
+        return len(timers)
+
+    def advance(self, now_ms: int) -> int:
+        """Move the wheel to `now_ms` and fire every timer due by then; returns how many fired"""
+        target = now_ms // self.tick_ms
+        fired = self._fire(self._due, now_ms) if len(self._due) > 0 else 0
+        while self._tick < target:
+            if self._n_timers == 0:
+                self._tick = target
+                break
+            self._tick += 1
+            # Cascade every level whose lower wheel just wrapped
+            level = 1
+            while level < self.levels and self._index(self._tick, level - 1) == 0:
+                slot = self._slots[level][self._index(self._tick, level)]
+                timers = list(slot.values())
+                slot.clear()
+                for timer in timers:
+                    self._place(timer)
+                level += 1
+            slot = self._slots[0][self._tick & self._mask]
+            if len(slot) > 0:
+                fired += self._fire(slot, now_ms)
+            if len(self._due) > 0:
+                fired += self._fire(self._due, now_ms)
+        return fired
+
+
+class TimeBarClock:
+    """
+    Closes time bars on the clock instead of waiting for the next trade.
+
+    Each registered TimeBarAggregator gets one timer at its next boundary plus
+    `grace_ms`; when it fires the open bar is enclosed, zero-volume bars are added for
+    elapsed intervals without trades if `emit_empty` is set, `on_close` is called with
+    every bar closed this way and the timer is re-armed for the following boundary. One
+    wheel serves every aggregator of a process, so thousands of symbols cost one timer
+    each. `now_ms` comes from `clock`, the process clock by default, and the grace period
+    absorbs feed latency.
+    """
+
+    def __init__(self, wheel: TimingWheel | None = None,
+                 on_close: Callable[[TimeBarAggregator, Bar], None] | None = None,
+                 clock: Clock | None = None):
+        self.wheel = wheel if wheel is not None else TimingWheel()
+        self.on_close = on_close
+        self.clock = clock
+        self._timers: dict[int, Timer] = {}
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def register(self, aggregator: TimeBarAggregator, now_ms: int, grace_ms: int = 0,
+                 emit_empty: bool = False):
+        if (not isinstance(aggregator, TimeBarAggregator)
+                or isinstance(aggregator, MultiTimeBarAggregator)):
+            raise TypeError(f"Only single time bar aggregators can be closed by the clock, "
+                            f"not {type(aggregator).__name__}")
+        self.unregister(aggregator)
+        self.wheel.advance(now_ms)
+        self._arm(aggregator, now_ms, grace_ms, emit_empty)
+
+    def unregister(self, aggregator: TimeBarAggregator):
+        timer = self._timers.pop(id(aggregator), None)
+        if timer is not None:
+            self.wheel.cancel(timer)
+
+    def _arm(self, aggregator: TimeBarAggregator, now_ms: int, grace_ms: int, emit_empty: bool):
+        cutoff = aggregator.reference_cutoff
+        deadline = ((now_ms - grace_ms) // cutoff + 1) * cutoff + grace_ms
+
+        def on_timer(fired_ms: int):
+            for bar in aggregator.close_until(fired_ms - grace_ms, emit_empty):
+                if self.on_close is not None:
+                    self.on_close(aggregator, bar)
+            self._arm(aggregator, fired_ms, grace_ms, emit_empty)
+
+        self._timers[id(aggregator)] = self.wheel.schedule(deadline, on_timer)
+
+    def advance(self, now_ms: int) -> int:
+        return self.wheel.advance(now_ms)
+
+    async def run(self):
+        """Drive the wheel from the clock every tick; cancel the task to stop it"""
+        clock = self.clock if self.clock is not None else get_clock()
+        while True:
+            self.advance(clock.time_ms())
+            await clock.sleep(self.wheel.tick_ms / 1000)
@@ -1,4 +1,13 @@
-from .analytics import Analytics
-from .drawdown import Drawdown
+from .analytics import Analytics, IncrementalAnalytics
+from .drawdown import Drawdown, Runup, DrawdownMomentum
+from .expression import ExpressionAnalytics, ExpressionGraph
+from .rolling import RollingMax, RollingMin, RollingSum
+from .stats import (
+    WindowSum, SMA, EMA, RollingStd, VWAP, RollingDrawdown, Parkinson, GarmanKlass, YangZhang
+)
 
-__all__ = ["Analytics", "Drawdown"]
\ No newline at end of file
+__all__ = ["Analytics", "IncrementalAnalytics", "Drawdown", "Runup", "DrawdownMomentum",
+           "ExpressionAnalytics", "ExpressionGraph",
+           "RollingMax", "RollingMin", "RollingSum",
+           "WindowSum", "SMA", "EMA", "RollingStd", "VWAP", "RollingDrawdown", "Parkinson",
+           "GarmanKlass", "YangZhang"]
\ No newline at end of file
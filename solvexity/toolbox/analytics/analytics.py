@@ -1,12 +1,84 @@
 from abc import ABC, abstractmethod
+import copy
 import logging
+import numpy as np
 import pandas as pd
 from typing import Callable
+from solvexity.model.bar import Bar
 
 logger = logging.getLogger(__name__)
 
 
 class Analytics(ABC):
+    # Columns read and written by `on_dataframe`, used by Alpha to schedule and cache
+    inputs: tuple[str, ...] = ()
+    outputs: tuple[str, ...] = ()
+    # Where Alpha.evaluate runs it: "thread" for NumPy/pandas code that releases the GIL,
+    # "process" for pure-Python code, which must then be picklable
+    executor: str = "thread"
+    # Rows of history one output row depends on, including itself; None when unbounded
+    lookback: int | None = 1
+
     @abstractmethod
     def on_dataframe(self, dataframe: pd.DataFrame) -> pd.DataFrame:
         pass
+
+
+class IncrementalAnalytics(Analytics):
+    """
+    Analytics updated one closed bar at a time in O(1).
+
+    Subclasses implement `update` for the value of `src_col` of each bar, `value` for the
+    current outputs keyed by column name and `reset`, which must rebind its state rather
+    than clear it in place. `on_dataframe` is the compatibility adapter: it replays the
+    frame through a fresh copy, so the incremental state is left untouched, and writes
+    one column per output.
+    """
+
+    def __init__(self, src_col: str):
+        self.src_col = src_col
+
+    @property
+    def inputs(self) -> tuple[str, ...]:
+        return (self.src_col,)
+
+    @property
+    def lookback(self) -> int | None:
+        return getattr(self, "window", None)
+
+    @property
+    def outputs(self) -> tuple[str, ...]:
+        replica = copy.copy(self)
+        replica.reset()
+        return tuple(replica.value())
+
+    def on_bar(self, bar: Bar) -> dict[str, float]:
+        self.update(getattr(bar, self.src_col))
+        return self.value()
+
+    @abstractmethod
+    def update(self, x: float):
+        pass
+
+    @abstractmethod
+    def value(self) -> dict[str, float]:
+        pass
+
+    @abstractmethod
+    def reset(self):
+        pass
+
+    def on_dataframe(self, dataframe: pd.DataFrame) -> pd.DataFrame:
+        replica = copy.copy(self)
+        replica.reset()
+        rows = []
+        for x in dataframe[self.src_col].to_numpy(dtype=np.float64):
+            replica.update(float(x))
+            rows.append(replica.value())
+        if len(rows) == 0:
+            for key in self.outputs:
+                dataframe[key] = np.empty(0)
+            return dataframe
+        for key in rows[0]:
+            dataframe[key] = [row[key] for row in rows]
+        return dataframe
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Rolling statistics benchmark against pandas.
+
+Times every statistic of `stats` in batch over a bar series and incrementally per new
+bar, next to the pandas expression it replaces, and reports the results as JSON:
+
+    python -m solvexity.toolbox.analytics.benchmark -n 100000 -w 20 200
+"""
+
+import argparse
+import json
+import logging
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable
+import numpy as np
+import pandas as pd
+from . import stats
+from .rolling import RollingMax
+
+logger = logging.getLogger(__name__)
+
+
+def make_bars(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 50000.0 * np.exp(np.cumsum(rng.normal(0, 2e-3, n)))
+    opens = np.concatenate([[50000.0], close[:-1]]) * np.exp(rng.normal(0, 2e-4, n))
+    return pd.DataFrame({
+        "open": opens,
+        "high": np.maximum(opens, close) * np.exp(np.abs(rng.normal(0, 1e-3, n))),
+        "low": np.minimum(opens, close) * np.exp(-np.abs(rng.normal(0, 1e-3, n))),
+        "close": close,
+        "volume": rng.exponential(2.0, n),
+    })
+
+
+def _pandas_cases(df: pd.DataFrame, window: int) -> dict[str, Callable[[], object]]:
+    close, volume = df["close"], df["volume"]
+    log_hl = np.log(df["high"] / df["low"])
+    log_co = np.log(df["close"] / df["open"])
+    overnight = np.log(df["open"] / df["close"].shift(1))
+    rs = (np.log(df["high"] / df["close"]) * np.log(df["high"] / df["open"])
+          + np.log(df["low"] / df["close"]) * np.log(df["low"] / df["open"]))
+    k = 0.34 / (1.34 + (window + 1) / (window - 1))
+    return {
+        "sma": lambda: close.rolling(window).mean(),
+        "ema": lambda: close.ewm(span=window, adjust=False).mean(),
+        "rolling_std": lambda: close.rolling(window).std(),
+        "vwap": lambda: (close * volume).rolling(window).sum() / volume.rolling(window).sum(),
+        "rolling_max": lambda: close.rolling(window, min_periods=1).max(),
+        "rolling_drawdown": lambda: 1 - close / close.rolling(window, min_periods=1).max(),
+        "parkinson": lambda: np.sqrt((log_hl ** 2).rolling(window).mean() / (4 * np.log(2))),
+        "garman_klass": lambda: np.sqrt((0.5 * log_hl ** 2 - (2 * np.log(2) - 1) * log_co ** 2)
+                                        .rolling(window).mean()),
+        "yang_zhang": lambda: np.sqrt(overnight.rolling(window).var()
+                                      + k * log_co.rolling(window).var()
+                                      + (1 - k) * rs.rolling(window).mean()),
+    }
+
+
+Case = tuple[Callable[[], object], Callable[[], Callable], list[str]]
+
+
+def _cases(df: pd.DataFrame, window: int) -> dict[str, Case]:
+    """Per statistic: the batch call, a factory of incremental updates and the columns they take"""
+    o, h, lo, c, v = (df[name].to_numpy() for name in ("open", "high", "low", "close", "volume"))
+    return {
+        "sma": (lambda: stats.sma(c, window), lambda: stats.SMA(window).update, ["close"]),
+        "ema": (lambda: stats.ema(c, span=window), lambda: stats.EMA(span=window).update,
+                ["close"]),
+        "rolling_std": (lambda: stats.rolling_std(c, window),
+                        lambda: stats.RollingStd(window).update, ["close"]),
+        "vwap": (lambda: stats.vwap(c, v, window), lambda: stats.VWAP(window).update,
+                 ["close", "volume"]),
+        "rolling_max": (lambda: stats.rolling_max(c, window), lambda: RollingMax(window).update,
+                        ["close"]),
+        "rolling_drawdown": (lambda: stats.rolling_drawdown(c, window),
+                             lambda: stats.RollingDrawdown(window).update, ["close"]),
+        "parkinson": (lambda: stats.parkinson(h, lo, window),
+                      lambda: stats.Parkinson(window).update, ["high", "low"]),
+        "garman_klass": (lambda: stats.garman_klass(o, h, lo, c, window),
+                         lambda: stats.GarmanKlass(window).update,
+                         ["open", "high", "low", "close"]),
+        "yang_zhang": (lambda: stats.yang_zhang(o, h, lo, c, window),
+                       lambda: stats.YangZhang(window).update, ["open", "high", "low", "close"]),
+    }
+
+
+def best_of(func: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def bench_window(df: pd.DataFrame, window: int, repeat: int = 3) -> list[dict]:
+    pandas_cases = _pandas_cases(df, window)
+    tail = df.iloc[-window:]
+    results = []
+    for name, (batch, make_update, columns) in _cases(df, window).items():
+        rows = list(zip(*(df[column].tolist() for column in columns)))
+
+        def feed():
+            update = make_update()
+            for row in rows:
+                update(*row)
+
+        # What a live strategy pays per bar: pandas over the last window vs one incremental update
+        tail_case = _pandas_cases(tail, window)[name]
+        incremental = best_of(feed, repeat)
+        results.append({
+            "stat": name,
+            "window": window,
+            "n_bars": len(df),
+            "pandas_ms": best_of(pandas_cases[name], repeat) * 1e3,
+            "batch_ms": best_of(batch, repeat) * 1e3,
+            "pandas_window_us": best_of(tail_case, repeat) * 1e6,
+            "incremental_us_per_bar": incremental / len(df) * 1e6,
+        })
+    return results
+
+
+def run_suite(n_bars: int = 100_000, windows: tuple[int, ...] = (20, 200), seed: int = 0,
+              repeat: int = 3) -> dict:
+    df = make_bars(n_bars, seed)
+    results = []
+    for window in windows:
+        for result in bench_window(df, window, repeat):
+            logger.info(f"{result['stat']} window={window}: "
+                        f"batch {result['batch_ms']:.2f} ms "
+                        f"vs pandas {result['pandas_ms']:.2f} ms, "
+                        f"per bar {result['incremental_us_per_bar']:.2f} us "
+                        f"vs pandas {result['pandas_window_us']:.0f} us")
+            results.append(result)
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "n_bars": n_bars,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the rolling statistics against pandas and emit JSON results",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("-n", "--n-bars", type=int, default=100_000,
+                        help="Bars in the synthetic series")
+    parser.add_argument("-w", "--windows", type=int, nargs="+", default=[20, 200],
+                        help="Window lengths")
+    parser.add_argument("-r", "--repeat", type=int, default=3,
+                        help="Timed runs per case, the best one is reported")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic series")
+    parser.add_argument("-o", "--output", type=str, default=None,
+                        help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    output = json.dumps(run_suite(args.n_bars, args.windows, args.seed, args.repeat), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    from solvexity.logging import setup_logging
+    setup_logging()
+    sys.exit(main())
@@ -1,18 +1,110 @@
-from .analytics import Analytics
+from .analytics import IncrementalAnalytics
+from .rolling import RollingMax, RollingMin, RollingSum
 import pandas as pd
 
-class Drawdown(Analytics):
+class Drawdown(IncrementalAnalytics):
     """
     Calculate the drawdown of a given column.
     Drawdown is a positive value, the lower the better.
+    The peak is the maximum of the last `window` bars, or of every bar when `window` is None.
     """
-    def __init__(self, src_col: str):
-        self.src_col = src_col
-        self.df = None
-    
+    def __init__(self, src_col: str, window: int | None = None):
+        super().__init__(src_col)
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self.peak = RollingMax(self.window)
+        self.x = float("nan")
+
+    def update(self, x: float):
+        self.x = x
+        self.peak.update(x)
+
+    def value(self) -> dict[str, float]:
+        peak = self.peak.value()
+        return {
+            f"{self.src_col}.cummax": peak,
+            f"{self.src_col}.drawdown": peak - self.x,
+            f"{self.src_col}.drawdown_pct": (peak - self.x) / peak,
+        }
+
     def on_dataframe(self, dataframe: pd.DataFrame) -> pd.DataFrame:
-        dataframe[f"{self.src_col}.cummax"] = dataframe[self.src_col].cummax()
+        if self.window is None:
+            dataframe[f"{self.src_col}.cummax"] = dataframe[self.src_col].cummax()
+        else:
+            rolling = dataframe[self.src_col].rolling(self.window, min_periods=1)
+            dataframe[f"{self.src_col}.cummax"] = rolling.max()
         dataframe[f"{self.src_col}.drawdown"] = dataframe[f"{self.src_col}.cummax"] - dataframe[self.src_col]
         dataframe[f"{self.src_col}.drawdown_pct"] = dataframe[f"{self.src_col}.drawdown"] / dataframe[f"{self.src_col}.cummax"]
-        
-        return dataframe
\ No newline at end of file
+
+        return dataframe
+
+
+class Runup(IncrementalAnalytics):
+    """
+    Calculate the runup of a given column, the mirror of the drawdown from the trough.
+    The trough is the minimum of the last `window` bars, or of every bar when `window` is None.
+    """
+    def __init__(self, src_col: str, window: int | None = None):
+        super().__init__(src_col)
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self.trough = RollingMin(self.window)
+        self.x = float("nan")
+
+    def update(self, x: float):
+        self.x = x
+        self.trough.update(x)
+
+    def value(self) -> dict[str, float]:
+        trough = self.trough.value()
+        return {
+            f"{self.src_col}.cummin": trough,
+            f"{self.src_col}.runup": self.x - trough,
+            f"{self.src_col}.runup_pct": (self.x - trough) / trough,
+        }
+
+
+class DrawdownMomentum(IncrementalAnalytics):
+    """
+    Sum of squared drawdown and runup percentages over the last `window` bars and their ratio.
+
+    Each bar's drawdown is taken against the peak of the `window` bars ending at it and is
+    not revised when older bars leave the window. Recomputing `cummax` over the buffer on
+    every bar instead measures the first bars of the buffer against its first bar only.
+    """
+    def __init__(self, src_col: str = "close", window: int | None = None):
+        super().__init__(src_col)
+        self.window = window
+        self.reset()
+
+    @property
+    def lookback(self) -> int | None:
+        # The momentum window sums drawdowns that each look back a window
+        return 2 * self.window - 1 if self.window is not None else None
+
+    def reset(self):
+        self.drawdown = Drawdown(self.src_col, self.window)
+        self.runup = Runup(self.src_col, self.window)
+        self.drawdown_momentum = RollingSum(self.window)
+        self.runup_momentum = RollingSum(self.window)
+
+    def update(self, x: float):
+        self.drawdown.update(x)
+        self.runup.update(x)
+        peak, trough = self.drawdown.peak.value(), self.runup.trough.value()
+        self.drawdown_momentum.update(((peak - x) / peak) ** 2)
+        self.runup_momentum.update(((x - trough) / trough) ** 2)
+
+    def value(self) -> dict[str, float]:
+        drawdown_momentum = self.drawdown_momentum.value()
+        runup_momentum = self.runup_momentum.value()
+        ratio = drawdown_momentum / runup_momentum if runup_momentum != 0 else float("nan")
+        return {
+            f"{self.src_col}.drawdown_momentum": drawdown_momentum,
+            f"{self.src_col}.runup_momentum": runup_momentum,
+            f"{self.src_col}.momentum_ratio": ratio,
+        }
@@ -0,0 +1,254 @@
+"""
+Feature expressions over bar columns, e.g. `ema(ret(close, 1), 20) / rstd(ret(close, 1), 60)`.
+
+Expressions use Python syntax: bar columns by name, numbers, `+ - * / **`, unary minus and
+the functions in `FUNCTIONS`. Every expression of an `ExpressionAnalytics` is compiled into
+one graph in which identical subexpressions are a single node, so `ret(close, 1)` above is
+computed once however many features use it. Macros such as `ret` and `zscore` expand into
+primitives before that, so they share work with features written out by hand. Evaluation
+is one vectorized NumPy operation per node over the whole bar window.
+"""
+
+import ast
+import logging
+import numpy as np
+import pandas as pd
+from .analytics import Analytics
+from . import stats
+
+logger = logging.getLogger(__name__)
+
+_BINARY = {
+    ast.Add: ("add", np.add),
+    ast.Sub: ("sub", np.subtract),
+    ast.Mult: ("mul", np.multiply),
+    ast.Div: ("div", np.divide),
+    ast.Pow: ("pow", np.power),
+}
+
+
+def _lag(x: np.ndarray, n: int) -> np.ndarray:
+    out = np.empty_like(x)
+    out[:n] = np.nan
+    out[n:] = x[:len(x) - n]
+    return out
+
+
+def _rsum(x: np.ndarray, n: int) -> np.ndarray:
+    return stats.window_sum(x, n)
+
+
+def _after_warmup(kernel):
+    """
+    Apply a rolling kernel from the first row where every input is defined, NaN before, so
+    inputs such as `lag(close, 1)` warm up like a series that starts one row later. NaN and
+    inf further on are left to the kernels, which confine them to the windows holding them.
+    """
+    def apply(*args):
+        arrays = [arg for arg in args if isinstance(arg, np.ndarray)]
+        if len(arrays) == 0:
+            return kernel(*args)
+        n = len(arrays[0])
+        start = max(int(np.argmax(~np.isnan(a))) if not np.isnan(a).all() else n for a in arrays)
+        if start == 0:
+            return kernel(*args)
+        out = np.full(n, np.nan)
+        if start < n:
+            out[start:] = kernel(*(arg[start:] if isinstance(arg, np.ndarray) else arg
+                                   for arg in args))
+        return out
+    return apply
+
+
+def _elementwise(kernel):
+    return (kernel, lambda: 0)
+
+
+def _rolling(kernel, own=lambda n: n - 1):
+    return (_after_warmup(kernel), own)
+
+
+# name: (number of expression arguments, number of integer parameters, kernel,
+#        lookback beyond the arguments')
+_PRIMITIVES = {
+    "lag": (1, 1, _lag, lambda n: n),
+    "sma": (1, 1, *_rolling(stats.sma)),
+    "ema": (1, 1, _after_warmup(lambda x, span: stats.ema(x, span=span)), None),
+    "rstd": (1, 1, *_rolling(stats.rolling_std)),
+    "rmax": (1, 1, *_rolling(stats.rolling_max)),
+    "rmin": (1, 1, *_rolling(stats.rolling_min)),
+    "rsum": (1, 1, *_rolling(_rsum)),
+    "drawdown": (1, 1, *_rolling(stats.rolling_drawdown)),
+    "vwap": (2, 1, *_rolling(stats.vwap)),
+    "parkinson": (2, 1, *_rolling(stats.parkinson)),
+    "garman_klass": (4, 1, *_rolling(stats.garman_klass)),
+    "yang_zhang": (4, 1, *_rolling(stats.yang_zhang, lambda n: n)),
+    "log": (1, 0, *_elementwise(np.log)),
+    "exp": (1, 0, *_elementwise(np.exp)),
+    "sqrt": (1, 0, *_elementwise(np.sqrt)),
+    "abs": (1, 0, *_elementwise(np.abs)),
+    "sign": (1, 0, *_elementwise(np.sign)),
+    "max": (2, 0, *_elementwise(np.fmax)),
+    "min": (2, 0, *_elementwise(np.fmin)),
+}
+
+# name: (number of expression arguments, number of integer parameters,
+#        expansion into other functions)
+_MACROS = {
+    "diff": (1, 1, "x - lag(x, n)"),
+    "ret": (1, 1, "x / lag(x, n) - 1"),
+    "logret": (1, 1, "log(x / lag(x, n))"),
+    "zscore": (1, 1, "(x - sma(x, n)) / rstd(x, n)"),
+}
+
+FUNCTIONS = sorted(list(_PRIMITIVES) + list(_MACROS))
+
+
+class ExpressionGraph:
+    """Hash-consed expression nodes in topological order; equal subexpressions share a node"""
+
+    def __init__(self):
+        # Node: (op, argument node ids, parameters)
+        self.nodes: list[tuple[str, tuple[int, ...], tuple]] = []
+        self._ids: dict[tuple, int] = {}
+        self.outputs: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def _intern(self, op: str, args: tuple[int, ...] = (), params: tuple = ()) -> int:
+        key = (op, args, params)
+        node_id = self._ids.get(key)
+        if node_id is None:
+            node_id = len(self.nodes)
+            self.nodes.append(key)
+            self._ids[key] = node_id
+        return node_id
+
+    def add(self, name: str, expression: str) -> int:
+        try:
+            tree = ast.parse(expression, mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"Invalid expression for {name}: {expression}") from e
+        self.outputs[name] = self._build(tree.body, {}, expression)
+        return self.outputs[name]
+
+    def _build(self, node: ast.AST, scope: dict[str, int], expression: str) -> int:
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            return self._intern("const", (), (float(node.value),))
+        if isinstance(node, ast.Name):
+            if node.id in scope:
+                return scope[node.id]
+            return self._intern("column", (), (node.id,))
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+            left = self._build(node.left, scope, expression)
+            right = self._build(node.right, scope, expression)
+            return self._intern(_BINARY[type(node.op)][0], (left, right))
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            operand = self._build(node.operand, scope, expression)
+            return operand if isinstance(node.op, ast.UAdd) else self._intern("neg", (operand,))
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+            return self._build_call(node.func.id, node.args, scope, expression)
+        raise ValueError(f"Unsupported syntax {ast.dump(node)} in {expression}")
+
+    def _build_call(self, func: str, arg_nodes: list[ast.AST], scope: dict, expression: str) -> int:
+        if func in _PRIMITIVES:
+            n_args, n_params, _, _ = _PRIMITIVES[func]
+        elif func in _MACROS:
+            n_args, n_params, _ = _MACROS[func]
+        else:
+            raise ValueError(f"Unknown function {func} in {expression}, "
+                             f"expected one of {FUNCTIONS}")
+        if len(arg_nodes) != n_args + n_params:
+            raise ValueError(f"{func} takes {n_args} expressions and {n_params} integer "
+                             f"parameters in {expression}")
+        args = tuple(self._build(arg, scope, expression) for arg in arg_nodes[:n_args])
+        params = []
+        for arg in arg_nodes[n_args:]:
+            if not (isinstance(arg, ast.Constant) and isinstance(arg.value, int) and arg.value > 0):
+                raise ValueError(f"Parameters of {func} must be positive integers in {expression}")
+            params.append(arg.value)
+        if func in _MACROS:
+            return self._expand(_MACROS[func][2], args[0], params[0], expression)
+        return self._intern(func, args, tuple(params))
+
+    def _expand(self, template: str, x: int, n: int, expression: str) -> int:
+        # Macro templates name their expression argument `x` and their parameter `n`
+        class Substitute(ast.NodeTransformer):
+            def visit_Name(self, node: ast.Name):
+                return ast.Constant(n) if node.id == "n" else node
+
+        body = Substitute().visit(ast.parse(template, mode="eval").body)
+        return self._build(body, {"x": x}, expression)
+
+    def lookback(self) -> dict[int, int | None]:
+        """Extra rows of history each node needs beyond the current one, None when unbounded"""
+        extra: list[int | None] = []
+        for op, args, params in self.nodes:
+            upstream = [extra[arg] for arg in args]
+            if None in upstream:
+                extra.append(None)
+                continue
+            base = max(upstream, default=0)
+            if op in _PRIMITIVES:
+                own = _PRIMITIVES[op][3]
+                extra.append(None if own is None else base + own(*params))
+            else:
+                extra.append(base)
+        return dict(enumerate(extra))
+
+    def columns(self) -> list[str]:
+        return [params[0] for op, _, params in self.nodes if op == "column"]
+
+    def evaluate(self, columns: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+        """Evaluate every node once in order; returns the output arrays by name"""
+        values: list = []
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for op, args, params in self.nodes:
+                inputs = [values[arg] for arg in args]
+                if op == "column":
+                    value = np.asarray(columns[params[0]], dtype=np.float64)
+                elif op == "const":
+                    value = params[0]
+                elif op == "neg":
+                    value = np.negative(inputs[0])
+                elif op in ("add", "sub", "mul", "div", "pow"):
+                    value = _KERNELS[op](inputs[0], inputs[1])
+                else:
+                    value = _PRIMITIVES[op][2](*inputs, *params)
+                values.append(value)
+        n = len(next(iter(columns.values()))) if len(columns) > 0 else 0
+        return {name: np.broadcast_to(values[node_id], (n,)).astype(np.float64, copy=True)
+                for name, node_id in self.outputs.items()}
+
+
+_KERNELS = {name: kernel for name, kernel in _BINARY.values()}
+
+
+class ExpressionAnalytics(Analytics):
+    """
+    Features defined by expressions, compiled into one shared graph.
+
+    `features` maps output column names to expressions. Referenced bar columns become the
+    `inputs` and the lookback is the longest window chain of any feature, unbounded if an
+    `ema` is involved.
+    """
+
+    def __init__(self, features: dict[str, str], name: str = "expressions"):
+        self.name = name
+        self.features = dict(features)
+        self.graph = ExpressionGraph()
+        for feature, expression in self.features.items():
+            self.graph.add(feature, expression)
+        self.inputs = tuple(dict.fromkeys(self.graph.columns()))
+        self.outputs = tuple(self.features)
+        extra = self.graph.lookback()
+        lookbacks = [extra[node_id] for node_id in self.graph.outputs.values()]
+        self.lookback = None if None in lookbacks else max(lookbacks, default=0) + 1
+        logger.debug(f"Compiled {len(self.features)} features into {len(self.graph)} nodes")
+
+    def on_dataframe(self, dataframe: pd.DataFrame) -> pd.DataFrame:
+        columns = {column: dataframe[column].to_numpy(dtype=np.float64) for column in self.inputs}
+        for name, values in self.graph.evaluate(columns).items():
+            dataframe[name] = values
+        return dataframe
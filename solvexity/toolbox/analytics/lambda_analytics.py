@@ -3,10 +3,16 @@ from typing import Callable
 import pandas as pd
 
 class LambdaAnalytics(Analytics):
-    def __init__(self, name: str, func: Callable[[pd.DataFrame], pd.DataFrame], result_to: str):
+    def __init__(self, name: str, func: Callable[[pd.DataFrame], pd.DataFrame], result_to: str,
+                 inputs: tuple[str, ...] = (), outputs: tuple[str, ...] = (),
+                 executor: str = "thread", lookback: int | None = 1):
         self.name = name
         self.func = func
         self.result_to = result_to
+        self.inputs = inputs
+        self.outputs = tuple(outputs)
+        self.executor = executor
+        self.lookback = lookback
     
     def on_dataframe(self, dataframe: pd.DataFrame) -> pd.DataFrame:
         return self.func(dataframe)
\ No newline at end of file
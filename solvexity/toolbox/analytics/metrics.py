@@ -0,0 +1,141 @@
+"""
+Performance metrics of equity curves and returns, without pandas.
+
+Every function takes one curve as a 1D array or a batch of curves as a 2D array with one
+curve per row, such as the equity curves of all configurations of a sweep, and reduces
+along the last axis: a 1D input gives a scalar, a 2D input one value per row. All of them
+are O(n) NumPy passes, so multi-million-point curves cost a few array operations.
+
+Drawdowns are positive fractions of the running peak, as in `Drawdown`. Durations are in
+points of the curve. Ratios are per point unless `periods_per_year` annualizes them.
+"""
+
+import numpy as np
+from . import stats
+from .stats import as_float, window_moments, window_sum, window_variance
+
+
+def returns(equity: np.ndarray) -> np.ndarray:
+    """Simple returns between consecutive points, one fewer than the points"""
+    equity = as_float(equity)
+    return equity[..., 1:] / equity[..., :-1] - 1.0
+
+
+def drawdown(equity: np.ndarray) -> np.ndarray:
+    equity = as_float(equity)
+    peak = np.maximum.accumulate(equity, axis=-1)
+    return (peak - equity) / peak
+
+
+def max_drawdown(equity: np.ndarray) -> np.ndarray | float:
+    return drawdown(equity).max(axis=-1)
+
+
+def drawdown_duration(equity: np.ndarray) -> np.ndarray:
+    """
+    Points since the last peak at every point, zero at a new high.
+
+    The last peak is the top of a monotonic stack of earlier points that are at least as
+    high as everything after them; for a running peak that stack only ever holds the
+    latest high, so it reduces to a running maximum of the indices of new highs.
+    """
+    equity = as_float(equity)
+    index = np.arange(equity.shape[-1])
+    at_peak = equity >= np.maximum.accumulate(equity, axis=-1)
+    last_peak = np.maximum.accumulate(np.where(at_peak, index, 0), axis=-1)
+    return index - last_peak
+
+
+def max_drawdown_duration(equity: np.ndarray) -> np.ndarray | int:
+    """Longest stretch below a previous peak, counting a drawdown still open at the end"""
+    return drawdown_duration(equity).max(axis=-1)
+
+
+def sharpe(r: np.ndarray, periods_per_year: float = 1.0,
+           risk_free: float = 0.0) -> np.ndarray | float:
+    """Mean over standard deviation (ddof=1) of per-period returns in excess of `risk_free`"""
+    excess = as_float(r) - risk_free
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return excess.mean(axis=-1) / excess.std(axis=-1, ddof=1) * np.sqrt(periods_per_year)
+
+
+def sortino(r: np.ndarray, periods_per_year: float = 1.0,
+            risk_free: float = 0.0) -> np.ndarray | float:
+    """Mean over downside deviation, the root mean square of the negative excess returns"""
+    excess = as_float(r) - risk_free
+    downside = np.sqrt(np.mean(np.minimum(excess, 0.0) ** 2, axis=-1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return excess.mean(axis=-1) / downside * np.sqrt(periods_per_year)
+
+
+def cagr(equity: np.ndarray, periods_per_year: float = 1.0) -> np.ndarray | float:
+    """Compound growth per year, or per point with the default `periods_per_year`"""
+    equity = as_float(equity)
+    years = (equity.shape[-1] - 1) / periods_per_year
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (equity[..., -1] / equity[..., 0]) ** (1.0 / years) - 1.0
+
+
+def calmar(equity: np.ndarray, periods_per_year: float = 1.0) -> np.ndarray | float:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return cagr(equity, periods_per_year) / max_drawdown(equity)
+
+
+def turnover(positions: np.ndarray) -> np.ndarray | float:
+    """Mean absolute change of a position or weight series per period"""
+    return np.abs(np.diff(as_float(positions), axis=-1)).mean(axis=-1)
+
+
+def hit_rate(r: np.ndarray) -> np.ndarray | float:
+    """Share of positive returns among the non-zero ones, NaN without any"""
+    r = as_float(r)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (r > 0).sum(axis=-1) / (r != 0).sum(axis=-1)
+
+
+def rolling_sharpe(r: np.ndarray, window: int, periods_per_year: float = 1.0,
+                   risk_free: float = 0.0) -> np.ndarray:
+    """`sharpe` of the last `window` returns at every point, NaN until a full window"""
+    s1, s2, shift = window_moments(as_float(r) - risk_free, window)
+    std = np.sqrt(np.maximum(window_variance(s1, s2, window, 1), 0.0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (s1 / window + shift) / std * np.sqrt(periods_per_year)
+
+
+def rolling_sortino(r: np.ndarray, window: int, periods_per_year: float = 1.0,
+                    risk_free: float = 0.0) -> np.ndarray:
+    excess = as_float(r) - risk_free
+    mean = window_sum(excess, window) / window
+    downside = np.sqrt(np.maximum(window_sum(np.minimum(excess, 0.0) ** 2, window), 0.0) / window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return mean / downside * np.sqrt(periods_per_year)
+
+
+def rolling_hit_rate(r: np.ndarray, window: int) -> np.ndarray:
+    r = as_float(r)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        wins = window_sum((r > 0).astype(np.float64), window)
+        return wins / window_sum((r != 0).astype(np.float64), window)
+
+
+def rolling_drawdown(equity: np.ndarray, window: int) -> np.ndarray:
+    """
+    Drawdown from the peak of the last `window` points of one curve or of each row of a
+    batch, the same O(n) window peak as `stats.rolling_drawdown`
+    """
+    return stats.rolling_drawdown(equity, window)
+
+
+def summary(equity: np.ndarray, periods_per_year: float = 1.0) -> dict[str, np.ndarray | float]:
+    """The headline metrics of one curve or of each row of a batch"""
+    r = returns(equity)
+    return {
+        "total_return": as_float(equity)[..., -1] / as_float(equity)[..., 0] - 1.0,
+        "cagr": cagr(equity, periods_per_year),
+        "sharpe": sharpe(r, periods_per_year),
+        "sortino": sortino(r, periods_per_year),
+        "calmar": calmar(equity, periods_per_year),
+        "max_drawdown": max_drawdown(equity),
+        "max_drawdown_duration": max_drawdown_duration(equity),
+        "hit_rate": hit_rate(r),
+    }
@@ -0,0 +1,103 @@
+import math
+from collections import deque
+
+
+class RollingMax:
+    """
+    Maximum of the last `window` values, or of every value when `window` is None.
+
+    A monotonic deque keeps the candidates in decreasing order, so `update` is
+    amortized O(1): every value is pushed and popped at most once. NaN values are skipped,
+    a window holding nothing else gives NaN.
+    """
+
+    def __init__(self, window: int | None = None):
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self.n = 0
+        self._candidates: deque[tuple[int, float]] = deque()
+
+    def _dominates(self, a: float, b: float) -> bool:
+        return a >= b
+
+    def update(self, x: float) -> float:
+        candidates = self._candidates
+        if x == x:
+            while len(candidates) > 0 and self._dominates(x, candidates[-1][1]):
+                candidates.pop()
+            candidates.append((self.n, x))
+        self.n += 1
+        if len(candidates) == 0:
+            return math.nan
+        if self.window is not None and candidates[0][0] <= self.n - 1 - self.window:
+            candidates.popleft()
+            if len(candidates) == 0:
+                return math.nan
+        return candidates[0][1]
+
+    def value(self) -> float:
+        return self._candidates[0][1] if len(self._candidates) > 0 else math.nan
+
+
+class RollingMin(RollingMax):
+    """Minimum of the last `window` values, or of every value when `window` is None"""
+
+    def _dominates(self, a: float, b: float) -> bool:
+        return a <= b
+
+
+class RollingSum:
+    """
+    Sum of the last `window` values, or of every value when `window` is None.
+
+    Values are cut into blocks of `window` from the first one, and a window is the tail of
+    one block plus the head of the next: its sum is a suffix sum of the previous block,
+    computed once when that block completed, plus the running sum of the current block.
+    No value is ever subtracted, so rounding stays within the terms of one window, a
+    window of zeros sums to exactly 0 and a NaN or inf only affects the windows holding
+    it. `update` is amortized O(1). Where the stream started moves the block boundaries,
+    which changes a sum only by its rounding.
+    """
+
+    def __init__(self, window: int | None = None):
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self.n = 0
+        self.total = 0.0
+        self._prefix = 0.0
+        self._tails: list[float] = []
+        self._suffixes: list[float] = []
+
+    def update(self, x: float) -> float:
+        if self.window is None:
+            self.n += 1
+            self.total += x
+            return self.total
+        return self._add(x, x)
+
+    def _add(self, head: float, tail: float) -> float:
+        """Add a value counted as `head` in the current block and as `tail` once it is the last"""
+        j = self.n % self.window
+        self.n += 1
+        self._prefix = head if j == 0 else self._prefix + head
+        self._tails.append(tail)
+        if j == self.window - 1:
+            suffixes = self._tails
+            total = suffixes[-1]
+            for k in range(len(suffixes) - 2, -1, -1):
+                total = total + suffixes[k]
+                suffixes[k] = total
+            self._suffixes, self._tails = suffixes, []
+            self.total = self._prefix
+        elif self.n > self.window:
+            self.total = self._suffixes[j + 1] + self._prefix
+        else:
+            self.total = self._prefix
+        return self.total
+
+    def value(self) -> float:
+        return self.total
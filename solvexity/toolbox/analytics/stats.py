@@ -0,0 +1,351 @@
+"""
+Rolling statistics over contiguous bar arrays, without pandas.
+
+Every statistic comes in a batch form over whole arrays, such as `BarColumns` columns,
+and an incremental form updated with one new bar in O(1). Both forms run the same
+floating-point operations in the same order, so they return identical results:
+
+- window sums are block-anchored like `RollingSum`: rows are cut into blocks of `window`
+  and a window sums as a suffix sum of one block plus a prefix sum of the next, as
+  `np.cumsum` within blocks in batch and as running sums incrementally. Nothing is
+  subtracted, so rounding stays within one window however long the series, and a NaN or
+  inf only affects the windows that hold it
+- variances are computed on values shifted by the first finite value of the block before
+  the current one, at most two windows old, to avoid cancellation
+- logarithms go through `np.log` in both forms, libm's `math.log` can differ by an ulp
+
+Moment statistics are NaN until a full window has been seen. Extremes and drawdowns are
+defined from the first bar, like `RollingMax`, so a partial window gives the extreme so far;
+like it they skip NaN, which only gives NaN for a window without any other value.
+Volatilities are per bar and not annualized. The block boundaries are counted from the
+first row, so a series started elsewhere gives the same statistics up to rounding.
+"""
+
+import math
+import numpy as np
+from .rolling import RollingMax, RollingSum
+
+_FOUR_LN2 = 4.0 * math.log(2.0)
+_GK_CLOSE = 2.0 * math.log(2.0) - 1.0
+
+
+def _blocks(x: np.ndarray, window: int, fill: float) -> np.ndarray:
+    """The last axis cut into blocks of `window`, the last one padded with `fill`"""
+    n = x.shape[-1]
+    n_blocks = max(-(-n // window), 1)
+    padded = np.full(x.shape[:-1] + (n_blocks * window,), fill)
+    padded[..., :n] = x
+    return padded.reshape(x.shape[:-1] + (n_blocks, window))
+
+
+def window_sum(terms: np.ndarray, window: int, tails: np.ndarray | None = None) -> np.ndarray:
+    """
+    Sums of the last `window` terms along the last axis, NaN until a full window. `tails`
+    replace the terms in the suffix sums, the part of a window in the previous block.
+    """
+    n = terms.shape[-1]
+    head = _blocks(terms, window, 0.0)
+    tail = head if tails is None else _blocks(tails, window, 0.0)
+    sums = np.cumsum(head, axis=-1)
+    suffixes = np.cumsum(tail[..., ::-1], axis=-1)[..., ::-1]
+    sums[..., 1:, :-1] = suffixes[..., :-1, 1:] + sums[..., 1:, :-1]
+    sums[..., 0, :-1] = np.nan
+    return sums.reshape(terms.shape[:-1] + (-1,))[..., :n]
+
+
+def _shifts(x: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Per row, the shift of the windows ending in its block and of those ending in the next:
+    the first finite value of the block before, else the shift before that, else 0. The
+    first block uses its own first finite value.
+    """
+    n = x.shape[-1]
+    blocks = _blocks(x, window, np.nan)
+    finite = np.isfinite(blocks)
+    firsts = np.take_along_axis(blocks, finite.argmax(axis=-1)[..., None], axis=-1)[..., 0]
+    has_finite = finite.any(axis=-1)
+    # Shift of the windows ending in the block after each block
+    last = np.maximum.accumulate(np.where(has_finite, np.arange(firsts.shape[-1]), -1), axis=-1)
+    following = np.where(last >= 0, np.take_along_axis(firsts, np.maximum(last, 0), axis=-1), 0.0)
+    own = np.concatenate([following[..., :1], following[..., :-1]], axis=-1)
+    return np.repeat(own, window, axis=-1)[..., :n], np.repeat(following, window, axis=-1)[..., :n]
+
+
+def window_moments(x: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Window sums of the shifted values and of their squares, and the shift of every row"""
+    shift, following = _shifts(x, window)
+    head, tail = x - shift, x - following
+    return window_sum(head, window, tail), window_sum(head * head, window, tail * tail), shift
+
+
+def window_variance(s1: np.ndarray | float, s2: np.ndarray | float, window: int, ddof: int):
+    """Variance of a window from the sums of its shifted values and of their squares"""
+    return (s2 - s1 * s1 / window) / (window - ddof)
+
+
+def _yang_zhang_k(window: int) -> float:
+    return 0.34 / (1.34 + (window + 1) / (window - 1))
+
+
+def _sqrt_clipped(variance: float) -> float:
+    """math.sqrt of np.maximum(variance, 0.0), keeping NaN"""
+    if variance != variance:
+        return math.nan
+    return math.sqrt(variance) if variance > 0.0 else 0.0
+
+
+def as_float(x) -> np.ndarray:
+    """`x` as a float64 array, without a copy when it already is one"""
+    return np.asarray(x, dtype=np.float64)
+
+
+def sma(x: np.ndarray, window: int) -> np.ndarray:
+    return window_sum(as_float(x), window) / window
+
+
+def ema(x: np.ndarray, span: float | None = None, alpha: float | None = None) -> np.ndarray:
+    """
+    EMA seeded with the first finite value, `pandas.ewm(adjust=False, ignore_na=True)` up to
+    rounding; NaN and inf values are skipped and hold the average
+    """
+    alpha = _ema_alpha(span, alpha)
+    beta = 1.0 - alpha
+    values = as_float(x).tolist()
+    out = np.empty(len(values), dtype=np.float64)
+    y = math.nan
+    # The recursion has no vectorized form in NumPy; plain floats keep it identical to EMA.update
+    for i, value in enumerate(values):
+        if math.isfinite(value):
+            y = value if y != y else alpha * value + beta * y
+        out[i] = y
+    return out
+
+
+def rolling_std(x: np.ndarray, window: int, ddof: int = 1) -> np.ndarray:
+    x = as_float(x)
+    if len(x) == 0:
+        return x.copy()
+    s1, s2, _ = window_moments(x, window)
+    return np.sqrt(np.maximum(window_variance(s1, s2, window, ddof), 0.0))
+
+
+def vwap(price: np.ndarray, volume: np.ndarray, window: int) -> np.ndarray:
+    """Volume-weighted average of `price`, the bar close or typical price, over `window` bars"""
+    price, volume = as_float(price), as_float(volume)
+    return window_sum(price * volume, window) / window_sum(volume, window)
+
+
+def _rolling_extreme(x: np.ndarray, window: int, extreme: np.ufunc) -> np.ndarray:
+    """
+    `extreme` of the last `window` values along the last axis from van Herk/Gil-Werman
+    blocks: a window is the suffix of one block of `window` values and the prefix of the
+    next, and both are running extremes, so it is O(n) whatever the window
+    """
+    n = x.shape[-1]
+    blocks = _blocks(x, window, np.nan)
+    prefix = extreme.accumulate(blocks, axis=-1).reshape(blocks.shape[:-2] + (-1,))[..., :n]
+    suffix = extreme.accumulate(blocks[..., ::-1], axis=-1)[..., ::-1]
+    suffix = suffix.reshape(prefix.shape[:-1] + (-1,))[..., :n]
+    if n > window:
+        prefix[..., window:] = extreme(suffix[..., 1:n - window + 1], prefix[..., window:])
+    return prefix
+
+
+def rolling_max(x: np.ndarray, window: int) -> np.ndarray:
+    return _rolling_extreme(as_float(x), window, np.fmax)
+
+
+def rolling_min(x: np.ndarray, window: int) -> np.ndarray:
+    return _rolling_extreme(as_float(x), window, np.fmin)
+
+
+def rolling_drawdown(x: np.ndarray, window: int) -> np.ndarray:
+    """Drawdown from the peak of the last `window` bars as a fraction of the peak"""
+    x = as_float(x)
+    peak = rolling_max(x, window)
+    return (peak - x) / peak
+
+
+def parkinson(high: np.ndarray, low: np.ndarray, window: int) -> np.ndarray:
+    log_hl = np.log(as_float(high) / as_float(low))
+    return np.sqrt(window_sum(log_hl * log_hl, window) / (_FOUR_LN2 * window))
+
+
+def garman_klass(open: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                 window: int) -> np.ndarray:
+    log_hl = np.log(as_float(high) / as_float(low))
+    log_co = np.log(as_float(close) / as_float(open))
+    terms = 0.5 * (log_hl * log_hl) - _GK_CLOSE * (log_co * log_co)
+    return np.sqrt(np.maximum(window_sum(terms, window) / window, 0.0))
+
+
+def yang_zhang(open: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+               window: int) -> np.ndarray:
+    """Yang-Zhang volatility; the first bar only provides the previous close"""
+    open, high, low, close = as_float(open), as_float(high), as_float(low), as_float(close)
+    out = np.full(len(close), np.nan)
+    if len(close) < 2:
+        return out
+    overnight = np.log(open[1:] / close[:-1])
+    intraday = np.log(close[1:] / open[1:])
+    log_ho, log_hc = np.log(high[1:] / open[1:]), np.log(high[1:] / close[1:])
+    log_lo, log_lc = np.log(low[1:] / open[1:]), np.log(low[1:] / close[1:])
+    rogers_satchell = log_hc * log_ho + log_lc * log_lo
+
+    var_o = window_variance(*window_moments(overnight, window)[:2], window, 1)
+    var_c = window_variance(*window_moments(intraday, window)[:2], window, 1)
+    var_rs = window_sum(rogers_satchell, window) / window
+    k = _yang_zhang_k(window)
+    out[1:] = np.sqrt(np.maximum(var_o + k * var_c + (1.0 - k) * var_rs, 0.0))
+    return out
+
+
+def _log_ratio(a: float, b: float) -> float:
+    return float(np.log(a / b))
+
+
+def _ema_alpha(span: float | None, alpha: float | None) -> float:
+    if (span is None) == (alpha is None):
+        raise ValueError("Exactly one of span and alpha must be given")
+    return alpha if alpha is not None else 2.0 / (span + 1.0)
+
+
+class WindowSum(RollingSum):
+    """Incremental `window_sum`: the sum of the last `window` terms, NaN until a full window"""
+
+    @property
+    def full(self) -> bool:
+        return self.n >= self.window
+
+    def update(self, term: float, tail: float | None = None) -> float:
+        self._add(term, term if tail is None else tail)
+        return self.value()
+
+    def value(self) -> float:
+        return self.total if self.n >= self.window else math.nan
+
+
+class _ShiftedMoments:
+    """Window sums of values shifted as in `_shifts`, for the variance"""
+
+    def __init__(self, window: int, ddof: int = 1):
+        self.window = window
+        self.ddof = ddof
+        self.n = 0
+        # Shift of the windows ending in the current block and first finite value of the block
+        self.shift: float | None = None
+        self.first: float | None = None
+        self.s1 = WindowSum(window)
+        self.s2 = WindowSum(window)
+
+    def update(self, x: float) -> float:
+        if self.n % self.window == 0 and self.n > 0:
+            if self.first is not None:
+                self.shift = self.first
+            self.first = None
+        self.n += 1
+        if self.first is None and math.isfinite(x):
+            self.first = x
+            if self.n <= self.window:
+                self.shift = x
+        # Values before the first finite one are not finite, so any shift gives the same terms
+        shift = self.shift if self.shift is not None else 0.0
+        following = self.first if self.first is not None else shift
+        head, tail = x - shift, x - following
+        return window_variance(self.s1.update(head, tail), self.s2.update(head * head, tail * tail),
+                         self.window, self.ddof)
+
+
+class SMA:
+    def __init__(self, window: int):
+        self.window = window
+        self.sum = WindowSum(window)
+
+    def update(self, x: float) -> float:
+        return self.sum.update(float(x)) / self.window
+
+
+class EMA:
+    def __init__(self, span: float | None = None, alpha: float | None = None):
+        self.alpha = _ema_alpha(span, alpha)
+        self.beta = 1.0 - self.alpha
+        self.y = math.nan
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        if math.isfinite(x):
+            self.y = x if self.y != self.y else self.alpha * x + self.beta * self.y
+        return self.y
+
+
+class RollingStd:
+    def __init__(self, window: int, ddof: int = 1):
+        self.moments = _ShiftedMoments(window, ddof)
+
+    def update(self, x: float) -> float:
+        return _sqrt_clipped(self.moments.update(float(x)))
+
+
+class VWAP:
+    def __init__(self, window: int):
+        self.notional = WindowSum(window)
+        self.volume = WindowSum(window)
+
+    def update(self, price: float, volume: float) -> float:
+        price, volume = float(price), float(volume)
+        return self.notional.update(price * volume) / self.volume.update(volume)
+
+
+class RollingDrawdown:
+    def __init__(self, window: int):
+        self.peak = RollingMax(window)
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        peak = self.peak.update(x)
+        return (peak - x) / peak
+
+
+class Parkinson:
+    def __init__(self, window: int):
+        self.window = window
+        self.sum = WindowSum(window)
+
+    def update(self, high: float, low: float) -> float:
+        log_hl = float(np.log(float(high) / float(low)))
+        return _sqrt_clipped(self.sum.update(log_hl * log_hl) / (_FOUR_LN2 * self.window))
+
+
+class GarmanKlass:
+    def __init__(self, window: int):
+        self.window = window
+        self.sum = WindowSum(window)
+
+    def update(self, open: float, high: float, low: float, close: float) -> float:
+        log_hl = float(np.log(float(high) / float(low)))
+        log_co = float(np.log(float(close) / float(open)))
+        term = 0.5 * (log_hl * log_hl) - _GK_CLOSE * (log_co * log_co)
+        variance = self.sum.update(term) / self.window
+        return _sqrt_clipped(variance)
+
+
+class YangZhang:
+    def __init__(self, window: int):
+        self.window = window
+        self.k = _yang_zhang_k(window)
+        self.prev_close: float | None = None
+        self.overnight = _ShiftedMoments(window)
+        self.intraday = _ShiftedMoments(window)
+        self.rogers_satchell = WindowSum(window)
+
+    def update(self, open: float, high: float, low: float, close: float) -> float:
+        open, high, low, close = float(open), float(high), float(low), float(close)
+        prev_close, self.prev_close = self.prev_close, close
+        if prev_close is None:
+            return math.nan
+        var_o = self.overnight.update(_log_ratio(open, prev_close))
+        var_c = self.intraday.update(_log_ratio(close, open))
+        rogers_satchell = (_log_ratio(high, close) * _log_ratio(high, open)
+                           + _log_ratio(low, close) * _log_ratio(low, open))
+        var_rs = self.rogers_satchell.update(rogers_satchell) / self.window
+        return _sqrt_clipped(var_o + self.k * var_c + (1.0 - self.k) * var_rs)
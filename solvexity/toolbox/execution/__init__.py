@@ -0,0 +1,10 @@
+from .matching import OrderStatus, Order, Fill, MatchingEngine
+from .portfolio import Portfolio
+
+__all__ = [
+    "OrderStatus",
+    "Order",
+    "Fill",
+    "MatchingEngine",
+    "Portfolio",
+]
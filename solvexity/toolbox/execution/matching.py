@@ -0,0 +1,258 @@
+import heapq
+import logging
+from collections import deque
+from enum import IntEnum
+from typing import Callable
+from pydantic import BaseModel
+from solvexity.model.shared import Side, OrderType, TimeInForce
+from solvexity.model.trade import Trade
+
+logger = logging.getLogger(__name__)
+
+
+class OrderStatus(IntEnum):
+    NEW = 0
+    PARTIALLY_FILLED = 1
+    FILLED = 2
+    CANCELED = 3
+    EXPIRED = 4
+
+
+class Order(BaseModel):
+    id: int = 0
+    side: Side
+    type: OrderType
+    quantity: float
+    price: float | None = None
+    stop_price: float | None = None
+    time_in_force: TimeInForce = TimeInForce.TIME_IN_FORCE_GTC
+    # Quantity resting at the same price before this order; trades at the price consume it first
+    queue_ahead: float = 0.0
+    filled: float = 0.0
+    status: OrderStatus = OrderStatus.NEW
+    timestamp: int = 0
+
+    @property
+    def remaining(self) -> float:
+        return self.quantity - self.filled
+
+    @property
+    def is_open(self) -> bool:
+        return self.status in (OrderStatus.NEW, OrderStatus.PARTIALLY_FILLED)
+
+
+class Fill(BaseModel):
+    order_id: int
+    trade_id: int
+    side: Side
+    price: float
+    quantity: float
+    fee: float
+    is_maker: bool
+    timestamp: int
+
+
+class _BookSide:
+    """Resting limit orders of one side: FIFO queues per price level and a heap of their prices"""
+
+    def __init__(self, sign: int):
+        # Heap keys are sign * price, so the best level is on top for both sides
+        self.sign = sign
+        self.levels: dict[float, deque[Order]] = {}
+        self.heap: list[float] = []
+
+    def add(self, order: Order):
+        level = self.levels.get(order.price)
+        if level is None:
+            level = self.levels[order.price] = deque()
+            heapq.heappush(self.heap, self.sign * order.price)
+        level.append(order)
+
+    def best(self) -> float | None:
+        return self.sign * self.heap[0] if len(self.heap) > 0 else None
+
+    def pop_best(self):
+        del self.levels[self.sign * heapq.heappop(self.heap)]
+
+
+class MatchingEngine:
+    """
+    Simulated exchange matching for one market, filling orders against the trade tape.
+
+    Orders take effect on the first trade after they are submitted. MARKET orders and
+    marketable LIMIT orders then fill at that trade's price as takers: GTC orders in full,
+    IOC orders up to the trade's quantity with the rest expiring, and FOK orders in full
+    if the trade's quantity covers them and not at all otherwise. LIMIT orders that are
+    not marketable expire if IOC or FOK and rest if GTC. STOP_MARKET orders turn
+    into market orders on the first trade at or through their stop price. A resting order
+    fills as maker at its price: completely once a trade prints through the price, and
+    from the quantity of aggressor trades at the price once its `queue_ahead` is used up.
+    Levels and stops live in dicts and heaps, so a trade costs O(log n) per level or stop
+    it touches and O(1) when it touches none.
+    """
+
+    def __init__(self, maker_fee: float = 0.0, taker_fee: float = 0.0):
+        self.maker_fee = maker_fee
+        self.taker_fee = taker_fee
+        self.orders: dict[int, Order] = {}
+        self.fills: list[Fill] = []
+        self.on_fill: list[Callable[[Fill], None]] = []
+        self.last_price: float | None = None
+        self._next_order_id = 1
+        self._seq = 0
+        self._pending: list[Order] = []
+        self._bids = _BookSide(-1)
+        self._asks = _BookSide(1)
+        self._buy_stops: list[tuple[float, int, Order]] = []
+        self._sell_stops: list[tuple[float, int, Order]] = []
+
+    def submit(self, order: Order) -> Order:
+        if order.quantity <= 0:
+            raise ValueError(f"Order quantity must be positive, got {order.quantity}")
+        if order.type == OrderType.ORDER_TYPE_LIMIT and order.price is None:
+            raise ValueError("Limit orders need a price")
+        if order.type == OrderType.ORDER_TYPE_STOP_MARKET and order.stop_price is None:
+            raise ValueError("Stop market orders need a stop price")
+        if order.type not in (OrderType.ORDER_TYPE_LIMIT, OrderType.ORDER_TYPE_MARKET,
+                              OrderType.ORDER_TYPE_STOP_MARKET):
+            raise ValueError(f"Unsupported order type {order.type}")
+        if order.id == 0:
+            order.id = self._next_order_id
+        if order.id in self.orders:
+            raise ValueError(f"Order {order.id} is already open")
+        self._next_order_id = max(self._next_order_id, order.id) + 1
+        self.orders[order.id] = order
+        if order.type == OrderType.ORDER_TYPE_STOP_MARKET:
+            self._seq += 1
+            if order.side == Side.SIDE_BUY:
+                heapq.heappush(self._buy_stops, (order.stop_price, self._seq, order))
+            else:
+                heapq.heappush(self._sell_stops, (-order.stop_price, self._seq, order))
+        else:
+            self._pending.append(order)
+        return order
+
+    def cancel(self, order_id: int) -> bool:
+        """Cancel an open order, dropped lazily from the book; returns False if it was not open"""
+        order = self.orders.pop(order_id, None)
+        if order is None:
+            return False
+        order.status = OrderStatus.CANCELED
+        return True
+
+    def _fill(self, order: Order, price: float, quantity: float, trade: Trade, is_maker: bool,
+              fills: list[Fill]):
+        order.filled += quantity
+        if order.remaining <= 1e-12:
+            order.status = OrderStatus.FILLED
+            del self.orders[order.id]
+        else:
+            order.status = OrderStatus.PARTIALLY_FILLED
+        fee = price * quantity * (self.maker_fee if is_maker else self.taker_fee)
+        fill = Fill(order_id=order.id, trade_id=trade.id, side=order.side, price=price,
+                    quantity=quantity, fee=fee, is_maker=is_maker, timestamp=trade.timestamp)
+        fills.append(fill)
+        self.fills.append(fill)
+        for callback in self.on_fill:
+            callback(fill)
+
+    def _match_resting(self, book: _BookSide, trade: Trade, aggressor: Side, fills: list[Fill]):
+        price = trade.price
+        sign = book.sign
+        while len(book.heap) > 0:
+            level_price = sign * book.heap[0]
+            # Bids (sign -1) are hit by prints below them, asks (sign 1) by prints above them
+            through = sign * (price - level_price) > 0
+            if not through and not (level_price == price and trade.side == aggressor):
+                return
+            level = book.levels[level_price]
+            available = trade.quantity
+            while len(level) > 0:
+                order = level[0]
+                if not order.is_open:
+                    level.popleft()
+                    continue
+                if through:
+                    self._fill(order, level_price, order.remaining, trade, True, fills)
+                    level.popleft()
+                    continue
+                used = min(order.queue_ahead, available)
+                order.queue_ahead -= used
+                available -= used
+                if available <= 0:
+                    return
+                quantity = min(order.remaining, available)
+                available -= quantity
+                self._fill(order, level_price, quantity, trade, True, fills)
+                if order.is_open:
+                    return
+                level.popleft()
+            book.pop_best()
+
+    def _trigger_stops(self, trade: Trade, fills: list[Fill]):
+        price = trade.price
+        while len(self._buy_stops) > 0 and self._buy_stops[0][0] <= price:
+            order = heapq.heappop(self._buy_stops)[2]
+            if order.is_open:
+                self._fill(order, price, order.remaining, trade, False, fills)
+        while len(self._sell_stops) > 0 and -self._sell_stops[0][0] >= price:
+            order = heapq.heappop(self._sell_stops)[2]
+            if order.is_open:
+                self._fill(order, price, order.remaining, trade, False, fills)
+
+    def _expire(self, order: Order):
+        order.status = OrderStatus.EXPIRED
+        del self.orders[order.id]
+
+    def _activate(self, order: Order, trade: Trade, fills: list[Fill]):
+        if not order.is_open:
+            return
+        price = trade.price
+        time_in_force = order.time_in_force
+        if order.type == OrderType.ORDER_TYPE_MARKET:
+            marketable = True
+        elif order.side == Side.SIDE_BUY:
+            marketable = price <= order.price
+        else:
+            marketable = price >= order.price
+        if not marketable:
+            if time_in_force in (TimeInForce.TIME_IN_FORCE_IOC, TimeInForce.TIME_IN_FORCE_FOK):
+                self._expire(order)
+            else:
+                (self._bids if order.side == Side.SIDE_BUY else self._asks).add(order)
+        elif (time_in_force == TimeInForce.TIME_IN_FORCE_FOK
+              and trade.quantity < order.remaining - 1e-12):
+            self._expire(order)
+        elif time_in_force == TimeInForce.TIME_IN_FORCE_IOC:
+            self._fill(order, price, min(order.remaining, trade.quantity), trade, False, fills)
+            if order.is_open:
+                self._expire(order)
+        else:
+            self._fill(order, price, order.remaining, trade, False, fills)
+
+    def on_trade(self, trade: Trade) -> list[Fill]:
+        """Match the book, stops and newly submitted orders against one trade; returns the fills"""
+        fills: list[Fill] = []
+        self._match_resting(self._bids, trade, Side.SIDE_SELL, fills)
+        self._match_resting(self._asks, trade, Side.SIDE_BUY, fills)
+        if len(self._buy_stops) > 0 or len(self._sell_stops) > 0:
+            self._trigger_stops(trade, fills)
+        if len(self._pending) > 0:
+            pending, self._pending = self._pending, []
+            for order in pending:
+                self._activate(order, trade, fills)
+        self.last_price = trade.price
+        return fills
+
+    def best_bid(self) -> float | None:
+        return self._best(self._bids)
+
+    def best_ask(self) -> float | None:
+        return self._best(self._asks)
+
+    @staticmethod
+    def _best(book: _BookSide) -> float | None:
+        # Drop levels left with canceled orders only
+        while len(book.heap) > 0 and not any(order.is_open for order in book.levels[book.best()]):
+            book.pop_best()
+        return book.best()
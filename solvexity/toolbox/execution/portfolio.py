@@ -0,0 +1,116 @@
+import logging
+import numpy as np
+from solvexity.model.bar import Bar
+from solvexity.model.shared import Side
+from .matching import Fill
+
+logger = logging.getLogger(__name__)
+
+
+class Portfolio:
+    """
+    Positions, cash and fees of many markets in NumPy arrays indexed by market id.
+
+    Fills update one market in O(1), keeping the average entry price and realized PnL of
+    the market and the market value of the whole book. `mark` revalues every position at
+    once on a bar close, `mark_one` revalues a single market in O(1). Each mark appends a
+    point to the equity curve and updates the peak and the drawdown, a positive fraction
+    of the peak as in `Drawdown`.
+    """
+
+    def __init__(self, n_markets: int, cash: float = 0.0, capacity: int = 1024):
+        self.n_markets = n_markets
+        self.cash = cash
+        self.positions = np.zeros(n_markets)
+        self.avg_prices = np.zeros(n_markets)
+        self.realized = np.zeros(n_markets)
+        self.fees = np.zeros(n_markets)
+        self.turnover = np.zeros(n_markets)
+        self.marks = np.full(n_markets, np.nan)
+        self.market_value = 0.0
+        self.peak = float("nan")
+        self.drawdown = 0.0
+        self.max_drawdown = 0.0
+        self._equity = np.empty(capacity)
+        self._times = np.empty(capacity, dtype=np.int64)
+        self._n = 0
+
+    @property
+    def equity(self) -> float:
+        return self.cash + self.market_value
+
+    @property
+    def unrealized(self) -> np.ndarray:
+        return np.nan_to_num(self.positions * (self.marks - self.avg_prices))
+
+    def apply(self, market_id: int, side: Side, price: float, quantity: float, fee: float = 0.0):
+        """Book one fill; the fill price becomes the mark of the market"""
+        signed = quantity if side == Side.SIDE_BUY else -quantity
+        position = float(self.positions[market_id])
+        avg_price = float(self.avg_prices[market_id])
+        new_position = position + signed
+        if position == 0.0 or (position > 0) == (signed > 0):
+            avg_price = (avg_price * abs(position) + price * quantity) / abs(new_position)
+        else:
+            closed = min(quantity, abs(position))
+            direction = 1.0 if position > 0 else -1.0
+            self.realized[market_id] += closed * (price - avg_price) * direction
+            if abs(new_position) <= 1e-12:
+                new_position, avg_price = 0.0, 0.0
+            elif (new_position > 0) != (position > 0):
+                # Flipped through flat: the remainder opens at the fill price
+                avg_price = price
+        mark = float(self.marks[market_id])
+        self.market_value += new_position * price - (position * mark if position != 0.0 else 0.0)
+        self.positions[market_id] = new_position
+        self.avg_prices[market_id] = avg_price
+        self.marks[market_id] = price
+        self.fees[market_id] += fee
+        self.turnover[market_id] += price * quantity
+        self.cash -= signed * price + fee
+
+    def apply_fill(self, market_id: int, fill: Fill):
+        self.apply(market_id, fill.side, fill.price, fill.quantity, fill.fee)
+
+    def fill_callback(self, market_id: int):
+        """A `MatchingEngine.on_fill` callback booking the engine's fills under `market_id`"""
+        return lambda fill: self.apply_fill(market_id, fill)
+
+    def mark(self, prices: np.ndarray, time_ms: int = 0) -> float:
+        """Revalue every market at `prices`, NaN keeping the last mark; returns the equity"""
+        np.copyto(self.marks, prices, where=~np.isnan(prices))
+        self.market_value = float(np.dot(self.positions, np.nan_to_num(self.marks)))
+        return self._record(time_ms)
+
+    def mark_one(self, market_id: int, price: float, time_ms: int = 0) -> float:
+        """Revalue one market at `price`; returns the equity"""
+        position = float(self.positions[market_id])
+        if position != 0.0:
+            self.market_value += position * (price - float(self.marks[market_id]))
+        self.marks[market_id] = price
+        return self._record(time_ms)
+
+    def on_bar(self, market_id: int, bar: Bar) -> float:
+        return self.mark_one(market_id, bar.close, bar.close_time)
+
+    def _record(self, time_ms: int) -> float:
+        equity = self.equity
+        if not equity <= self.peak:
+            self.peak = equity
+        self.drawdown = (self.peak - equity) / self.peak if self.peak > 0 else 0.0
+        if self.drawdown > self.max_drawdown:
+            self.max_drawdown = self.drawdown
+        if self._n == len(self._equity):
+            self._equity = np.resize(self._equity, max(2 * self._n, 1))
+            self._times = np.resize(self._times, max(2 * self._n, 1))
+        self._equity[self._n] = equity
+        self._times[self._n] = time_ms
+        self._n += 1
+        return equity
+
+    def equity_curve(self) -> np.ndarray:
+        """Equity at every mark, a view valid until the next mark"""
+        return self._equity[:self._n]
+
+    def mark_times(self) -> np.ndarray:
+        return self._times[:self._n]
@@ -0,0 +1,3 @@
+from .store import FeatureStore, FeatureWriter, FeatureReader, feature_version, definition_of
+
+__all__ = ["FeatureStore", "FeatureWriter", "FeatureReader", "feature_version", "definition_of"]
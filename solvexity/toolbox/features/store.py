@@ -0,0 +1,254 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Mapping, Sequence
+import numpy as np
+from solvexity.model.shared import Exchange, Instrument
+from solvexity.toolbox.aggregator import BarKey
+from solvexity.toolbox.aggregator.manager import BarSpec, MarketKey
+from solvexity.toolbox.aggregator.checkpoint import write_atomic
+
+logger = logging.getLogger(__name__)
+
+# Directory layout: <root>/<market>/<bar spec>/<version>/
+#   meta.json            market, spec, feature names and the definition they were computed with
+#   next_id.i8           bar next_ids, non-decreasing, raw little-endian int64
+#   seq.i8               position among the bars sharing a next_id, raw little-endian int64
+#   <feature>.f8         one raw little-endian float64 column per feature
+# Rows are keyed by (next_id, seq), strictly increasing. A row is complete once every
+# column holds it; writers truncate torn rows on open.
+_ID_FILE = "next_id.i8"
+_SEQ_FILE = "seq.i8"
+_KEY_FILES = (_ID_FILE, _SEQ_FILE)
+_ID_DTYPE = np.dtype("<i8")
+_FEATURE_DTYPE = np.dtype("<f8")
+
+
+def _digest(obj) -> str:
+    return hashlib.sha256(json.dumps(obj, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def feature_version(features: Sequence[str], definition: Mapping) -> str:
+    """Hash of the feature names and the JSON-serializable definition that computes them"""
+    return _digest({"features": list(features), "definition": definition})
+
+
+def definition_of(*analytics) -> dict:
+    """Definition of analytics objects from their type and scalar attributes"""
+    definition = {}
+    for item in analytics:
+        params = {
+            key: value for key, value in vars(item).items()
+            if not key.startswith("_")
+            and (value is None or isinstance(value, (bool, int, float, str)))
+        }
+        definition[type(item).__name__] = params
+    return definition
+
+
+def bar_seqs(next_ids: np.ndarray) -> np.ndarray:
+    """`seq` of every bar of a sorted next_id column, counting from the first row of each run"""
+    next_ids = np.asarray(next_ids)
+    index = np.arange(len(next_ids))
+    starts = np.ones(len(next_ids), dtype=bool)
+    starts[1:] = next_ids[1:] != next_ids[:-1]
+    return index - np.maximum.accumulate(np.where(starts, index, 0))
+
+
+def market_path(market: MarketKey) -> str:
+    exchange, instrument, symbol = market
+    return ".".join([
+        Exchange(exchange).name.removeprefix("EXCHANGE_").lower(),
+        Instrument(instrument).name.removeprefix("INSTRUMENT_").lower(),
+        f"{symbol.base}{symbol.quote}".lower(),
+    ])
+
+
+def spec_path(spec: BarSpec) -> str:
+    return f"{spec.type.value}-{spec.reference_cutoff}-{_digest(spec.model_dump(mode='json'))[:8]}"
+
+
+class FeatureWriter:
+    """
+    Appends one feature vector per closed bar under its (next_id, seq) key. Bars at or
+    below the last stored key are skipped, so replaying a stream after a restart is
+    idempotent.
+    """
+
+    def __init__(self, path: str, features: Sequence[str]):
+        self.path = path
+        self.features = list(features)
+        self._files = {}
+        n_rows = _complete_rows(path, self.features)
+        for name in list(_KEY_FILES) + [f"{feature}.f8" for feature in self.features]:
+            f = open(os.path.join(path, name),
+                     "r+b" if os.path.exists(os.path.join(path, name)) else "w+b")
+            f.truncate(n_rows * 8)
+            f.seek(0, os.SEEK_END)
+            self._files[name] = f
+        self.n_rows = n_rows
+        self.last_key: BarKey | None = None
+        if n_rows > 0:
+            last = []
+            for name in _KEY_FILES:
+                self._files[name].seek((n_rows - 1) * 8)
+                last.append(int(np.frombuffer(self._files[name].read(8), dtype=_ID_DTYPE)[0]))
+            self.last_key = (last[0], last[1])
+
+    def __enter__(self) -> 'FeatureWriter':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(self, key: BarKey, values: Mapping[str, float]) -> bool:
+        """Append the features of the bar keyed (next_id, seq); returns False if already stored"""
+        if self.last_key is not None and key <= self.last_key:
+            return False
+        for feature in self.features:
+            self._files[f"{feature}.f8"].write(_FEATURE_DTYPE.type(values[feature]).tobytes())
+        self._files[_SEQ_FILE].write(_ID_DTYPE.type(key[1]).tobytes())
+        self._files[_ID_FILE].write(_ID_DTYPE.type(key[0]).tobytes())
+        self.last_key = (key[0], key[1])
+        self.n_rows += 1
+        return True
+
+    def extend(self, next_ids: np.ndarray, columns: Mapping[str, np.ndarray],
+               seqs: np.ndarray | None = None) -> int:
+        """
+        Append many bars at once; returns how many were new. Without `seqs` every run of
+        equal next_ids is taken to start in this batch and is numbered from 0.
+        """
+        next_ids = np.asarray(next_ids, dtype=_ID_DTYPE)
+        seqs = bar_seqs(next_ids) if seqs is None else np.asarray(seqs, dtype=_ID_DTYPE)
+        steps = np.diff(next_ids)
+        if np.any((steps < 0) | ((steps == 0) & (np.diff(seqs) <= 0))):
+            raise ValueError("Bar keys must be strictly increasing")
+        start = 0
+        if self.last_key is not None:
+            last_id, last_seq = self.last_key
+            newer = (next_ids > last_id) | ((next_ids == last_id) & (seqs > last_seq))
+            start = len(next_ids) - int(np.count_nonzero(newer))
+        if start == len(next_ids):
+            return 0
+        for feature in self.features:
+            column = np.asarray(columns[feature], dtype=_FEATURE_DTYPE)
+            self._files[f"{feature}.f8"].write(column[start:].tobytes())
+        self._files[_SEQ_FILE].write(seqs[start:].tobytes())
+        self._files[_ID_FILE].write(next_ids[start:].tobytes())
+        self.last_key = (int(next_ids[-1]), int(seqs[-1]))
+        self.n_rows += len(next_ids) - start
+        return len(next_ids) - start
+
+    def flush(self):
+        # Bar ids last, so a reader never sees an id whose features are not written
+        for name, f in self._files.items():
+            if name != _ID_FILE:
+                f.flush()
+        self._files[_ID_FILE].flush()
+
+    def close(self):
+        self.flush()
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+
+
+class FeatureReader:
+    """Memory-mapped view of the stored features; `refresh` picks up rows appended since"""
+
+    def __init__(self, path: str, features: Sequence[str]):
+        self.path = path
+        self.features = list(features)
+        self.refresh()
+
+    def refresh(self):
+        self.n_rows = _complete_rows(self.path, self.features)
+        self.next_ids = self._map(_ID_FILE, _ID_DTYPE)
+        self.seqs = self._map(_SEQ_FILE, _ID_DTYPE)
+        self.columns = {feature: self._map(f"{feature}.f8", _FEATURE_DTYPE)
+                        for feature in self.features}
+
+    def _map(self, name: str, dtype: np.dtype) -> np.ndarray:
+        if self.n_rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(os.path.join(self.path, name), dtype=dtype, mode="r", shape=(self.n_rows,))
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    def read(self, start_id: int | None = None,
+             end_id: int | None = None) -> tuple[np.ndarray, np.ndarray, dict[str, np.ndarray]]:
+        """Bar next_ids, seqs and features with `start_id <= next_id < end_id` as zero-copy views"""
+        lo, hi = 0, self.n_rows
+        if start_id is not None:
+            lo = int(np.searchsorted(self.next_ids, start_id, side="left"))
+        if end_id is not None:
+            hi = int(np.searchsorted(self.next_ids, end_id, side="left"))
+        columns = {feature: column[lo:hi] for feature, column in self.columns.items()}
+        return self.next_ids[lo:hi], self.seqs[lo:hi], columns
+
+
+def _complete_rows(path: str, features: Sequence[str]) -> int:
+    sizes = []
+    for name in list(_KEY_FILES) + [f"{feature}.f8" for feature in features]:
+        file_path = os.path.join(path, name)
+        sizes.append(os.path.getsize(file_path) // 8 if os.path.exists(file_path) else 0)
+    return min(sizes)
+
+
+class FeatureStore:
+    """
+    Persists per-bar feature vectors keyed by (market, bar spec, bar (next_id, seq)).
+
+    Each feature set lives under a version hash of its names and definition, so changing
+    a window or a formula starts a new column set instead of mixing values. Columns are
+    append-only raw files: writers append incrementally and readers memory-map a bar range.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path(self, market: MarketKey, spec: BarSpec, features: Sequence[str],
+             definition: Mapping) -> str:
+        return os.path.join(self.root, market_path(market), spec_path(spec),
+                            feature_version(features, definition))
+
+    def writer(self, market: MarketKey, spec: BarSpec, features: Sequence[str],
+               definition: Mapping) -> FeatureWriter:
+        path = self.path(market, spec, features, definition)
+        meta_path = os.path.join(path, "meta.json")
+        if not os.path.exists(meta_path):
+            os.makedirs(path, exist_ok=True)
+            exchange, instrument, symbol = market
+            write_atomic(meta_path, json.dumps({
+                "market": {"exchange": Exchange(exchange).name,
+                           "instrument": Instrument(instrument).name,
+                           "symbol": symbol.model_dump()},
+                "spec": spec.model_dump(mode="json"),
+                "features": list(features),
+                "definition": definition,
+            }, indent=2, default=str).encode())
+            logger.info(f"Created feature set {path}")
+        return FeatureWriter(path, features)
+
+    def reader(self, market: MarketKey, spec: BarSpec, features: Sequence[str],
+               definition: Mapping) -> FeatureReader:
+        path = self.path(market, spec, features, definition)
+        if not os.path.exists(os.path.join(path, "meta.json")):
+            raise FileNotFoundError(f"No features stored at {path}")
+        return FeatureReader(path, features)
+
+    def versions(self, market: MarketKey, spec: BarSpec) -> dict[str, dict]:
+        """Metadata of every feature set stored for a market and bar spec, by version"""
+        directory = os.path.join(self.root, market_path(market), spec_path(spec))
+        if not os.path.isdir(directory):
+            return {}
+        versions = {}
+        for version in sorted(os.listdir(directory)):
+            meta_path = os.path.join(directory, version, "meta.json")
+            if os.path.exists(meta_path):
+                with open(meta_path) as f:
+                    versions[version] = json.load(f)
+        return versions
@@ -2,13 +2,82 @@ import pytest
 import os
 import sys
 from pathlib import Path
+import numpy as np
 
 # Add the project root directory to Python path
 project_root = str(Path(__file__).parent.parent)
 sys.path.insert(0, project_root)
 
+from solvexity.model.trade import Trade
+from solvexity.model.shared import Symbol, Exchange, Instrument, Side
+
 # Configure pytest
 def pytest_configure(config):
     config.addinivalue_line(
         "markers", "integration: mark test as an integration test"
-    ) 
\ No newline at end of file
+    ) 
+
+BTCUSDT = Symbol(base="BTC", quote="USDT")
+
+
+@pytest.fixture
+def make_trade():
+    """Factory of single BTCUSDT trades on Binance spot, timestamped `trade_id * 100` by default"""
+    def make(trade_id: int, timestamp: int | None = None, *, price: float = 50000.0,
+             quantity: float = 0.1, side: Side = Side.SIDE_BUY, symbol: Symbol = BTCUSDT,
+             exchange: Exchange = Exchange.EXCHANGE_BINANCE) -> Trade:
+        return Trade(
+            id=trade_id,
+            exchange=exchange,
+            instrument=Instrument.INSTRUMENT_SPOT,
+            symbol=symbol,
+            side=side,
+            price=price,
+            quantity=quantity,
+            timestamp=timestamp if timestamp is not None else trade_id * 100,
+        )
+    return make
+
+
+@pytest.fixture
+def make_trades():
+    """
+    Factory of seeded synthetic BTCUSDT tapes: a random walk of prices, exponential gaps
+    of `interval_ms` on average between trades and ids counting up from `start_id`.
+    `gaps` skips ids, `disorder` adds duplicates and backward timestamps, `whales`
+    multiplies some quantities by 200 and `zeros` zeroes some.
+    """
+    def make(n: int, seed: int = 0, start_id: int = 1, interval_ms: float = 300, gaps: bool = False,
+             disorder: bool = False, whales: bool = False, zeros: bool = False) -> list[Trade]:
+        rng = np.random.default_rng(seed)
+        trades = []
+        trade_id = start_id - 1
+        timestamp = 1_700_000_000_000
+        price = 50000.0
+        for _ in range(n):
+            trade_id += 1
+            if gaps and rng.random() < 0.01:
+                trade_id += int(rng.integers(1, 20))
+            timestamp += int(rng.exponential(interval_ms))
+            price = round(price * (1 + rng.normal(0, 1e-4)), 2)
+            quantity = float(round(rng.exponential(0.05), 5))
+            if whales and rng.random() < 0.02:
+                quantity *= 200
+            if zeros and rng.random() < 0.01:
+                quantity = 0.0
+            trades.append(Trade(
+                id=trade_id,
+                exchange=Exchange.EXCHANGE_BINANCE,
+                instrument=Instrument.INSTRUMENT_SPOT,
+                symbol=BTCUSDT,
+                side=Side.SIDE_BUY if rng.random() < 0.5 else Side.SIDE_SELL,
+                price=price,
+                quantity=quantity,
+                timestamp=timestamp,
+            ))
+            if disorder and rng.random() < 0.01:
+                trades.append(trades[-int(rng.integers(1, min(5, len(trades)) + 1))].model_copy())
+            if disorder and rng.random() < 0.005:
+                trades[-1].timestamp -= 5_000
+        return trades
+    return make
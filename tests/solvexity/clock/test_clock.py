@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+from solvexity.clock import WallClock, EventClock, get_clock, set_clock, use_clock
+from solvexity.eventbus.event import Event
+from solvexity.strategy.catchup import CatchUpGate
+from solvexity.toolbox.aggregator import TimeBarAggregator, TimeBarClock, TimingWheel
+
+
+class TestEventClock:
+    def test_advance_never_goes_backwards(self):
+        clock = EventClock(start_ms=1_000)
+        assert clock.time_ms() == 1_000
+        clock.advance(5_000)
+        clock.advance(4_000)
+        assert clock.time_ms() == 5_000
+        assert clock.time() == 5.0
+
+    async def test_sleep_wakes_on_advance_without_waiting(self):
+        clock = EventClock()
+        woke = []
+
+        async def sleeper(name: str, seconds: float):
+            await clock.sleep(seconds)
+            woke.append((name, clock.time_ms()))
+
+        tasks = [asyncio.create_task(sleeper("long", 3600)),
+                 asyncio.create_task(sleeper("short", 60))]
+        await asyncio.sleep(0)
+        assert clock.n_sleeping == 2
+        started = time.perf_counter()
+        assert clock.advance(60_000) == 1
+        await asyncio.sleep(0)
+        assert woke == [("short", 60_000)]
+        clock.advance(10_000_000)
+        await asyncio.gather(*tasks)
+        assert woke[1] == ("long", 10_000_000)
+        assert time.perf_counter() - started < 1
+
+    async def test_elapsed_sleep_returns(self):
+        clock = EventClock()
+        await asyncio.wait_for(clock.sleep(0), 1)
+        assert clock.n_sleeping == 0
+
+
+class TestProcessClock:
+    def test_default_is_wall(self):
+        assert isinstance(get_clock(), WallClock)
+        assert abs(get_clock().time() - time.time()) < 1
+
+    def test_use_clock_restores(self):
+        clock = EventClock(start_ms=42)
+        with use_clock(clock):
+            assert get_clock() is clock
+            assert Event(data=None).time_ms == 42
+        assert isinstance(get_clock(), WallClock)
+        previous = set_clock(clock)
+        try:
+            assert get_clock() is clock
+        finally:
+            set_clock(previous)
+
+    def test_catchup_gate_reads_the_clock(self):
+        clock = EventClock(start_ms=100_000)
+        with use_clock(clock):
+            gate = CatchUpGate(max_lag_ms=5000)
+            assert not gate.observe(90_000)
+            clock.advance(200_000)
+            assert not gate.observe(100_000)
+            assert gate.observe(199_000)
+
+
+class TestTimeBarClockReplay:
+    async def test_run_follows_event_time(self, make_trade):
+        clock = EventClock(start_ms=0)
+        aggregator = TimeBarAggregator(buf_size=10, reference_cutoff=1000)
+        closed = []
+        bar_clock = TimeBarClock(TimingWheel(tick_ms=100), on_close=lambda agg,
+                                 bar: closed.append(bar), clock=clock)
+        aggregator.on_trade(make_trade(1, 100))
+        bar_clock.register(aggregator, now_ms=100)
+        task = asyncio.create_task(bar_clock.run())
+        await asyncio.sleep(0)
+        assert closed == []
+        clock.advance(1_100)
+        for _ in range(3):
+            await asyncio.sleep(0)
+        assert len(closed) == 1 and closed[0].close_time < 1_000
+        task.cancel()
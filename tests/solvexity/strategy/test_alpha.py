@@ -0,0 +1,227 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import pytest
+
+from solvexity.strategy.pipeline import Alpha, Flow
+from solvexity.toolbox.analytics import Analytics, Drawdown, DrawdownMomentum
+from solvexity.toolbox.analytics.lambda_analytics import LambdaAnalytics
+from solvexity.eventbus.event import Event
+
+
+def make_frame(n: int, first_id: int = 1) -> pd.DataFrame:
+    closes = 100.0 + np.cumsum(np.random.default_rng(first_id).normal(0, 1, n))
+    start_ids = np.arange(first_id, first_id + n * 10, 10)
+    return pd.DataFrame({"start_id": start_ids, "next_id": start_ids + 10, "close": closes})
+
+
+class Counting:
+    def __init__(self):
+        self.calls = {}
+
+    def lambda_analytics(self, name: str, inputs: tuple[str, ...], result_to: str,
+                         func) -> LambdaAnalytics:
+        def counted(df: pd.DataFrame) -> pd.DataFrame:
+            self.calls[name] = self.calls.get(name, 0) + 1
+            df[result_to] = func(df)
+            return df
+        return LambdaAnalytics(name, counted, result_to, inputs=inputs, outputs=(result_to,))
+
+
+class TestAlpha:
+    """Test suite for the Alpha dependency graph"""
+
+    def test_topological_order(self):
+        counting = Counting()
+        # Declared consumers first, the shared returns feature last
+        upside = counting.lambda_analytics("upside", ("returns",), "upside",
+                                           lambda df: df["returns"].clip(lower=0))
+        downside = counting.lambda_analytics("downside", ("returns",), "downside",
+                                             lambda df: df["returns"].clip(upper=0))
+        returns = counting.lambda_analytics("returns", ("close",), "returns",
+                                            lambda df: df["close"].pct_change())
+        alpha = Alpha([upside, downside, returns])
+        assert [node.name for node in alpha.nodes] == ["returns", "upside", "downside"]
+
+        df = alpha.on_dataframe(make_frame(50))
+        assert counting.calls == {"returns": 1, "upside": 1, "downside": 1}
+        np.testing.assert_allclose(df["upside"] + df["downside"], df["returns"])
+
+    def test_memoizes_per_bar(self):
+        counting = Counting()
+        returns = counting.lambda_analytics("returns", ("close",), "returns",
+                                            lambda df: df["close"].pct_change())
+        upside = counting.lambda_analytics("upside", ("returns",), "upside",
+                                           lambda df: df["returns"].clip(lower=0))
+        alpha = Alpha([returns, upside, Flow("drawdown", Drawdown("close"), "on_drawdown")])
+
+        first = alpha.on_dataframe(make_frame(50))
+        again = alpha.on_dataframe(make_frame(50)[["start_id", "next_id", "close"]])
+        assert counting.calls == {"returns": 1, "upside": 1}
+        pd.testing.assert_frame_equal(first, again)
+
+        alpha.on_dataframe(make_frame(50, first_id=11))
+        assert counting.calls == {"returns": 2, "upside": 2}
+
+    def test_sliding_window_computes_only_new_rows(self):
+        rows = []
+
+        def returns(df: pd.DataFrame) -> pd.DataFrame:
+            rows.append(len(df))
+            df["returns"] = df["close"].pct_change()
+            return df
+
+        def composers() -> list:
+            return [
+                LambdaAnalytics("returns", returns, "returns", inputs=("close",),
+                                outputs=("returns",), lookback=2),
+                LambdaAnalytics("upside", lambda df: df.assign(upside=df["returns"].clip(lower=0)),
+                                "upside", inputs=("returns",), outputs=("upside",)),
+                Flow("drawdown", Drawdown("close", window=10), "on_drawdown"),
+            ]
+
+        bars = make_frame(200)
+        frames = [bars.iloc[start:start + 100].reset_index(drop=True)
+                  for start in [0, 1, 2, 7, 7, 40]]
+        expected = [Alpha(composers()).on_dataframe(frame.copy()) for frame in frames]
+        rows.clear()
+        alpha = Alpha(composers())
+        for frame, full in zip(frames, expected):
+            pd.testing.assert_frame_equal(alpha.on_dataframe(frame.copy()), full, check_exact=False)
+        # After the first frame: the first row again for the history the slide cut off,
+        # then the new rows with one row of lookback, and nothing for the same bars
+        assert rows == [100, 1, 2, 1, 2, 1, 6, 1, 34]
+
+    def test_frames_without_bar_ids_are_not_cached(self):
+        counting = Counting()
+        returns = counting.lambda_analytics("returns", ("close",), "returns",
+                                            lambda df: df["close"].pct_change())
+        alpha = Alpha([returns])
+        alpha.on_dataframe(make_frame(10)[["close"]])
+        alpha.on_dataframe(make_frame(10)[["close"]])
+        assert counting.calls == {"returns": 2}
+
+    def test_rejects_cycles_and_duplicate_outputs(self):
+        a = LambdaAnalytics("a", lambda df: df, "a", inputs=("b",), outputs=("a",))
+        b = LambdaAnalytics("b", lambda df: df, "b", inputs=("a",), outputs=("b",))
+        with pytest.raises(ValueError, match="cycle"):
+            Alpha([a, b])
+        with pytest.raises(ValueError, match="produced by both"):
+            Alpha([Drawdown("close"), Drawdown("close")])
+
+    def test_on_bar_applies_each_bar_once(self):
+        momentum = DrawdownMomentum("close", window=10)
+        alpha = Alpha([Flow("drawdown", Drawdown("close", window=10), "on_drawdown"), momentum])
+        frame = make_frame(30)
+        for row in frame.itertuples():
+            values = alpha.on_bar(row)
+            assert alpha.on_bar(row) is values
+        assert momentum.drawdown.peak.n == 30
+        assert values["close.cummax"] == frame["close"].iloc[-10:].max()
+        assert "close.momentum_ratio" in values
+
+    async def test_on_event_publishes_results(self):
+        alpha = Alpha([Flow("drawdown", Drawdown("close"), "on_drawdown")])
+        received = []
+        alpha.eventbus.subscribe("on_drawdown", lambda e: received.append(e.data))
+        await alpha.on_event(Event(data=make_frame(5)))
+        assert len(received) == 1
+        assert "close.drawdown_pct" in received[0].columns
+
+
+class SquaredReturns(Analytics):
+    """Pure-Python analytics for the process pool"""
+    inputs = ("close",)
+    outputs = ("squared_returns",)
+    executor = "process"
+
+    def on_dataframe(self, dataframe: pd.DataFrame) -> pd.DataFrame:
+        closes = dataframe["close"].tolist()
+        squared = [(b / a - 1) ** 2 for a, b in zip(closes, closes[1:])]
+        dataframe["squared_returns"] = [float("nan")] + squared
+        return dataframe
+
+
+class TestAlphaEvaluate:
+    """Test suite for concurrent evaluation of the Alpha graph"""
+
+    async def test_matches_on_dataframe(self):
+        def composers():
+            return [
+                LambdaAnalytics("returns", lambda df: df.assign(returns=df["close"].pct_change()),
+                                "returns", inputs=("close",), outputs=("returns",)),
+                LambdaAnalytics("upside", lambda df: df.assign(upside=df["returns"].clip(lower=0)),
+                                "upside", inputs=("returns",), outputs=("upside",)),
+                Flow("drawdown", Drawdown("close", window=10), "on_drawdown"),
+                SquaredReturns(),
+            ]
+        alpha = Alpha(composers())
+        try:
+            evaluated = await alpha.evaluate(make_frame(100))
+        finally:
+            alpha.close()
+        expected = Alpha(composers()).on_dataframe(make_frame(100))
+        pd.testing.assert_frame_equal(evaluated[expected.columns], expected)
+        assert set(alpha.timings) == {"returns", "upside", "drawdown", "SquaredReturns_3"}
+
+    async def test_sliding_frames_match_on_dataframe(self):
+        def composers():
+            returns = LambdaAnalytics("returns",
+                                      lambda df: df.assign(returns=df["close"].pct_change()),
+                                      "returns",
+                                      inputs=("close",), outputs=("returns",), lookback=2)
+            squared = SquaredReturns()
+            squared.lookback = 2
+            return [returns, Flow("drawdown", Drawdown("close", window=10), "on_drawdown"), squared]
+        alpha = Alpha(composers())
+        bars = make_frame(150)
+        try:
+            for start in [0, 3, 3, 20]:
+                frame = bars.iloc[start:start + 100].reset_index(drop=True)
+                evaluated = await alpha.evaluate(frame.copy())
+                expected = Alpha(composers()).on_dataframe(frame.copy())
+                pd.testing.assert_frame_equal(evaluated[expected.columns], expected,
+                                              check_exact=False)
+        finally:
+            alpha.close()
+
+    async def test_independent_branches_run_concurrently(self):
+        def slow(column: str):
+            def func(df: pd.DataFrame) -> pd.DataFrame:
+                time.sleep(0.2)
+                df[column] = df["close"] * 2
+                return df
+            return LambdaAnalytics(column, func, column, inputs=("close",), outputs=(column,))
+
+        alpha = Alpha([slow("a"), slow("b"), slow("c")], thread_pool=ThreadPoolExecutor(3))
+        start = time.perf_counter()
+        df = await alpha.evaluate(make_frame(10))
+        assert time.perf_counter() - start < 0.5
+        assert all(alpha.timings[name] >= 0.2 for name in "abc")
+        np.testing.assert_array_equal(df["a"], df["close"] * 2)
+
+        # Cached on the same bars
+        start = time.perf_counter()
+        await alpha.evaluate(make_frame(10))
+        assert time.perf_counter() - start < 0.1
+        alpha.thread_pool.shutdown()
+
+    async def test_sinks_run_after_producers(self):
+        class Sink(Analytics):
+            def __init__(self):
+                self.seen = []
+
+            def on_dataframe(self, dataframe: pd.DataFrame) -> pd.DataFrame:
+                self.seen.append(list(dataframe.columns))
+                return dataframe
+
+        sink = Sink()
+        alpha = Alpha([
+            sink,
+            LambdaAnalytics("returns", lambda df: df.assign(returns=df["close"].pct_change()),
+                            "returns", inputs=("close",), outputs=("returns",)),
+        ])
+        await alpha.evaluate(make_frame(5))
+        alpha.close()
+        assert "returns" in sink.seen[0]
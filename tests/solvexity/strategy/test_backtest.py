@@ -0,0 +1,91 @@
+from solvexity.model.shared import Exchange, Instrument
+from solvexity.strategy.backtest import Backtest, trades_of
+from solvexity.strategy.engine import OsirisEngine
+from solvexity.toolbox.aggregator import AggregatorFactory, BarType, ReorderBuffer, TradeArrays
+from solvexity.toolbox.analytics import DrawdownMomentum
+
+
+def make_engine(buf_size: int = 20, recv_window: int = 5000) -> OsirisEngine:
+    aggregator = AggregatorFactory.create(BarType.QUOTE_VOLUME, buf_size, 50_000)
+    return OsirisEngine(aggregator, recv_window=recv_window)
+
+
+class TestBacktest:
+    def test_matches_live_path(self, make_trades):
+        trades = make_trades(5000)
+        result = Backtest(make_engine()).run(trades)
+
+        # The live path: every trade through the aggregator, momentum on each bar once closed
+        aggregator = AggregatorFactory.create(BarType.QUOTE_VOLUME, 20, 50_000)
+        momentum = DrawdownMomentum("close", window=20)
+        closed = {}
+        for trade in trades:
+            aggregator.on_trade(trade)
+            for bar in aggregator.bars:
+                if bar.is_closed and bar.next_id not in closed:
+                    closed[bar.next_id] = bar.model_copy()
+        assert [bar.next_id for bar in result.bars] == list(closed)
+        assert [bar.close for bar in result.bars] == [bar.close for bar in closed.values()]
+        assert len(result.bars) > 40
+
+        values = {}
+        for bar in closed.values():
+            values[bar.next_id] = momentum.on_bar(bar)
+        # The buffer of 20 holds the open bar, so signals start at the 19th closed bar
+        assert result.signals[0].next_id == result.bars[18].next_id
+        assert len(result.signals) > 200
+        for signal in result.signals:
+            assert signal.values == values[signal.next_id]
+        assert result.n_trades == 5000
+
+    def test_columnar_tape_matches_trades(self, make_trades):
+        trades = make_trades(3000, seed=1)
+        expected = Backtest(make_engine()).run(trades)
+        result = Backtest(make_engine()).run_arrays(TradeArrays.from_trades(trades),
+                                                    Exchange.EXCHANGE_BINANCE,
+                                                    Instrument.INSTRUMENT_SPOT)
+        assert ([bar.model_dump() for bar in result.bars]
+                == [bar.model_dump() for bar in expected.bars])
+        assert result.signals == expected.signals
+        assert list(trades_of(TradeArrays.from_trades(trades[:3]), Exchange.EXCHANGE_BINANCE,
+                              Instrument.INSTRUMENT_SPOT)) == trades[:3]
+
+    def test_recv_window_uses_simulated_time(self, make_trades):
+        trades = make_trades(3000, seed=2)
+        assert len(Backtest(make_engine(recv_window=5000), latency_ms=1000).run(trades).signals) > 0
+        backtest = Backtest(make_engine(recv_window=5000), latency_ms=6000)
+        assert len(backtest.run(trades).signals) == 0
+
+    def test_reordered_input(self, make_trades):
+        trades = make_trades(3000, seed=3)
+        shuffled = trades.copy()
+        for i in range(0, len(shuffled) - 1, 7):
+            shuffled[i], shuffled[i + 1] = shuffled[i + 1], shuffled[i]
+        engine = make_engine()
+        engine.reorder = ReorderBuffer(max_id_distance=4, next_id=trades[0].id)
+        result = Backtest(engine).run(shuffled)
+        expected = Backtest(make_engine()).run(trades)
+        # Released trades close the same bars, only the trade that released them differs
+        assert ([(s.next_id, s.values) for s in result.signals]
+                == [(s.next_id, s.values) for s in expected.signals])
+
+    def test_trades_held_at_the_end_are_dropped(self, make_trades):
+        trades = make_trades(3000, seed=5)
+        engine = make_engine()
+        engine.reorder = ReorderBuffer(max_id_distance=1000, next_id=trades[0].id)
+        # Everything after the missing trade waits for it until the recording ends
+        result = Backtest(engine).run(trades[:2500] + trades[2501:])
+        expected = Backtest(make_engine()).run(trades[:2500])
+        assert len(engine.reorder) == 0
+        assert [bar.next_id for bar in result.bars] == [bar.next_id for bar in expected.bars]
+        assert ([(s.next_id, s.values) for s in result.signals]
+                == [(s.next_id, s.values) for s in expected.signals])
+
+    def test_on_signal_and_frames(self, make_trades):
+        backtest = Backtest(make_engine())
+        received = []
+        backtest.on_signal.append(lambda bar, signal: received.append(bar.next_id))
+        result = backtest.run(make_trades(3000, seed=4))
+        assert received == [signal.next_id for signal in result.signals]
+        assert len(result.bars_frame()) == len(result.bars)
+        assert "close.momentum_ratio" in result.signals_frame().columns
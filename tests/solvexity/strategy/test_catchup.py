@@ -0,0 +1,59 @@
+import logging
+
+from solvexity.strategy.catchup import CatchUpGate
+from solvexity.strategy.config.osiris_config import OsirisConfig, CatchUpConfig
+
+
+class FakeClock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestCatchUpGate:
+    """Test suite for CatchUpGate"""
+
+    def test_goes_live_once_lag_is_small(self):
+        clock = FakeClock(1_000.0)
+        gate = CatchUpGate(max_lag_ms=5000, clock=clock)
+        gate.begin()
+        assert not gate.observe(900_000)
+        assert not gate.observe(994_000)
+        assert gate.observe(996_000)
+        assert gate.live
+        assert gate.n_replayed == 3
+        # Latched: a lagging message later does not re-enter catch-up
+        assert not gate.observe(0)
+        assert gate.live
+
+    def test_waits_for_pending_messages(self):
+        clock = FakeClock(1_000.0)
+        gate = CatchUpGate(max_lag_ms=5000, max_pending=10, clock=clock)
+        assert not gate.observe(999_000, pending=500)
+        assert not gate.observe(999_000, pending=11)
+        assert gate.observe(999_000, pending=10)
+
+    def test_quiets_loggers_until_live(self):
+        name = "solvexity.test.catchup.quiet"
+        log = logging.getLogger(name)
+        log.setLevel(logging.INFO)
+        clock = FakeClock(1_000.0)
+        gate = CatchUpGate(quiet=(name,), clock=clock)
+        gate.begin()
+        assert not log.isEnabledFor(logging.INFO)
+        assert log.isEnabledFor(logging.WARNING)
+        gate.observe(1_000_000)
+        assert log.level == logging.INFO
+
+
+class TestCatchUpConfig:
+    def test_catchup_section_is_optional(self):
+        config = OsirisConfig(aggregator={}, consumer={}, alpha={})
+        assert config.catchup == CatchUpConfig()
+        assert config.catchup.enabled
+        config = OsirisConfig(aggregator={}, consumer={}, alpha={},
+                              catchup={"enabled": False, "max_lag_ms": 100})
+        assert not config.catchup.enabled
+        assert config.catchup.max_lag_ms == 100
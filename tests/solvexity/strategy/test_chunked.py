@@ -0,0 +1,125 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import pytest
+
+from solvexity.strategy.pipeline import Alpha, Flow
+from solvexity.strategy.pipeline.chunked import engineer_features, overlapping
+from solvexity.toolbox.analytics import Drawdown, Runup, DrawdownMomentum, stats
+from solvexity.toolbox.analytics.lambda_analytics import LambdaAnalytics
+
+
+def calc_returns(df: pd.DataFrame) -> pd.DataFrame:
+    df["returns"] = df["close"].pct_change()
+    return df
+
+
+def calc_abs_returns(df: pd.DataFrame) -> pd.DataFrame:
+    df["abs_returns"] = df["returns"].abs()
+    return df
+
+
+def pipeline(window: int) -> list:
+    return [
+        LambdaAnalytics("abs_returns", calc_abs_returns, "abs_returns", inputs=("returns",),
+                        outputs=("abs_returns",)),
+        LambdaAnalytics("returns", calc_returns, "returns", inputs=("close",), outputs=("returns",),
+                        lookback=2),
+        Flow("drawdown", Drawdown("close", window), "drawdown"),
+        Runup("close", window),
+        DrawdownMomentum("close", window),
+    ]
+
+
+def calc_parkinson(df: pd.DataFrame) -> pd.DataFrame:
+    df["parkinson"] = stats.parkinson(df["high"], df["low"], 20)
+    return df
+
+
+def calc_garman_klass(df: pd.DataFrame) -> pd.DataFrame:
+    df["garman_klass"] = stats.garman_klass(df["open"], df["high"], df["low"], df["close"], 20)
+    return df
+
+
+def volatility_pipeline() -> list:
+    return [
+        LambdaAnalytics("parkinson", calc_parkinson, "parkinson", inputs=("high", "low"),
+                        outputs=("parkinson",), lookback=20),
+        LambdaAnalytics("garman_klass", calc_garman_klass, "garman_klass",
+                        inputs=("open", "high", "low", "close"), outputs=("garman_klass",),
+                        lookback=20),
+        DrawdownMomentum("close", 20),
+    ]
+
+
+def make_bars(n: int) -> pd.DataFrame:
+    close = 100.0 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, 1e-2, n)))
+    return pd.DataFrame({"close": close})
+
+
+def make_ohlc(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0, 1e-3, n)))
+    # A monotone run, where the runup momentum is exactly 0
+    close[n // 2:n // 2 + 60] = np.linspace(close[n // 2], close[n // 2] * 0.95, 60)
+    open = np.concatenate([[100.0], close[:-1]])
+    high = np.maximum(open, close) * np.exp(np.abs(rng.normal(0, 1e-3, n)))
+    low = np.minimum(open, close) * np.exp(-np.abs(rng.normal(0, 1e-3, n)))
+    return pd.DataFrame({"open": open, "high": high, "low": low, "close": close})
+
+
+def chunks(df: pd.DataFrame, size: int):
+    for start in range(0, len(df), size):
+        yield df.iloc[start:start + size]
+
+
+class TestChunked:
+    """Test suite for chunked feature engineering"""
+
+    def test_overlapping(self):
+        df = pd.DataFrame({"x": range(10)})
+        frames = list(overlapping(chunks(df, 3), 4))
+        assert [n for _, n in frames] == [0, 3, 4, 4]
+        assert frames[2][0]["x"].tolist() == [2, 3, 4, 5, 6, 7, 8]
+
+    @pytest.mark.parametrize("chunk_size", [7, 64, 1000])
+    def test_matches_whole_frame(self, chunk_size):
+        window = 20
+        assert Alpha(pipeline(window)).lookback == 2 * window - 1
+        bars = make_bars(500)
+        expected = Alpha(pipeline(window)).on_dataframe(bars.copy())
+
+        written = []
+        with ThreadPoolExecutor(2) as pool:
+            n_rows = engineer_features(chunks(bars, chunk_size), pipeline(window), written.append,
+                                       pool=pool)
+        assert n_rows == 500
+        result = pd.concat(written, ignore_index=True)
+        pd.testing.assert_frame_equal(result[expected.columns], expected, check_exact=False,
+                                      rtol=1e-12)
+        # Extremes are exact regardless of the chunking
+        np.testing.assert_array_equal(result["close.cummax"], expected["close.cummax"])
+
+    @pytest.mark.parametrize("chunk_size", [33, 250, 1024])
+    def test_window_sums_within_rounding(self, chunk_size):
+        bars = make_ohlc(3000)
+        expected = Alpha(volatility_pipeline()).on_dataframe(bars.copy())
+        written = []
+        with ThreadPoolExecutor(2) as pool:
+            engineer_features(chunks(bars, chunk_size), volatility_pipeline(), written.append,
+                              pool=pool, max_workers=2)
+        result = pd.concat(written, ignore_index=True)[expected.columns]
+        assert expected["close.momentum_ratio"].isna().sum() > 0
+        pd.testing.assert_frame_equal(result, expected, check_exact=False, rtol=1e-13)
+
+    def test_process_pool(self):
+        bars = make_bars(300)
+        expected = Alpha(pipeline(10)).on_dataframe(bars.copy())
+        written = []
+        engineer_features(chunks(bars, 50), pipeline(10), written.append, max_workers=2)
+        pd.testing.assert_frame_equal(pd.concat(written, ignore_index=True)[expected.columns],
+                                      expected)
+
+    def test_rejects_unbounded_lookback(self):
+        with pytest.raises(ValueError):
+            engineer_features(chunks(make_bars(10), 5), [Drawdown("close")], lambda df: None)
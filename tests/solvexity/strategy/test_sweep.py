@@ -0,0 +1,91 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import pytest
+
+from solvexity.model.trade import Trade
+from solvexity.model.shared import Symbol, Exchange, Instrument, Side
+from solvexity.strategy.pipeline import Alpha
+from solvexity.strategy.sweep import (
+    SharedTrades, attach, grid, momentum_alpha, momentum_score, sweep
+)
+from solvexity.toolbox.aggregator import AggregatorFactory, BarType, FixedPoint, TradeArrays
+
+
+def make_arrays(n: int, seed: int = 0) -> TradeArrays:
+    rng = np.random.default_rng(seed)
+    timestamps = 1_700_000_000_000 + np.cumsum(rng.exponential(300, n)).astype(np.int64)
+    prices = np.round(50000.0 * np.exp(np.cumsum(rng.normal(0, 1e-4, n))), 2)
+    return TradeArrays(
+        Symbol(base="BTC", quote="USDT"), np.arange(1000, 1000 + n), prices,
+        np.round(rng.exponential(0.05, n), 5) + 1e-5, timestamps,
+        np.where(rng.random(n) < 0.5, int(Side.SIDE_BUY), int(Side.SIDE_SELL)).astype(np.int8),
+    )
+
+
+def streaming_score(arrays: TradeArrays, bar_type: BarType, cutoff, buf_size: int,
+                    window: int) -> dict:
+    aggregator = AggregatorFactory.create(bar_type, 100_000, cutoff)
+    for i in range(len(arrays)):
+        aggregator.on_trade(Trade(
+            id=int(arrays.ids[i]), exchange=Exchange.EXCHANGE_BINANCE,
+            instrument=Instrument.INSTRUMENT_SPOT, symbol=arrays.symbol,
+            side=Side(int(arrays.sides[i])), price=float(arrays.prices[i]),
+            quantity=float(arrays.quantities[i]), timestamp=int(arrays.timestamps[i]),
+        ))
+    bars = aggregator.to_dataframe()
+    bars = bars[bars["is_closed"]].reset_index(drop=True)
+    spec = grid([bar_type], [cutoff], [buf_size])[0].spec
+    return momentum_score(Alpha(momentum_alpha(spec, window)).on_dataframe(bars))
+
+
+class TestSweep:
+    def test_grid(self):
+        configs = grid([BarType.QUOTE_VOLUME, BarType.TICK], [100, 200], [10, 20, 30],
+                       window=[5, 10])
+        assert len(configs) == 2 * 2 * 3 * 2
+        assert len({config.spec for config in configs}) == 12
+        assert configs[0].params == {"window": 5}
+
+    def test_shared_trades_roundtrip(self):
+        arrays = make_arrays(1000)
+        with SharedTrades(arrays) as shared:
+            shm, attached = attach(shared.handle)
+            try:
+                for name in ("ids", "prices", "quantities", "timestamps", "sides"):
+                    np.testing.assert_array_equal(getattr(attached, name), getattr(arrays, name))
+                assert attached.symbol == arrays.symbol
+                del attached
+            finally:
+                shm.close()
+
+    def test_matches_streaming(self):
+        arrays = make_arrays(4000, seed=1)
+        configs = (grid([BarType.QUOTE_VOLUME], [20_000], [10], window=[5, 10])
+                   + grid([BarType.TICK], [50], [10], window=[5, 10]))
+        with ThreadPoolExecutor(2) as pool:
+            table = sweep(arrays, configs, pool=pool)
+        assert list(table.columns[:4]) == ["type", "reference_cutoff", "buf_size", "window"]
+        assert len(table) == 4
+        expected = streaming_score(arrays, BarType.QUOTE_VOLUME, 20_000, 10, 10)
+        row = table[(table["type"] == BarType.QUOTE_VOLUME.value) & (table["window"] == 10)].iloc[0]
+        assert row["n_bars"] == expected["n_bars"] > 20
+        assert row["ic"] == pytest.approx(expected["ic"])
+        # The 80th tick bar is still open after the last trade
+        assert (table[table["type"] == BarType.TICK.value]["n_bars"] == 4000 // 50 - 1).all()
+
+    def test_process_pool_matches_threads(self):
+        arrays = make_arrays(3000, seed=2)
+        configs = grid([BarType.TICK], [20, 50], [10, 30])
+        with ThreadPoolExecutor(2) as pool:
+            expected = sweep(arrays, configs, pool=pool)
+        pd.testing.assert_frame_equal(sweep(arrays, configs, max_workers=2), expected)
+
+    def test_rejects_fixed_point_specs(self):
+        config = grid([BarType.BASE_VOLUME], [1.0], [10])[0]
+        fixed_point = FixedPoint(price_scale=100, quantity_scale=10**5)
+        config = config.model_copy(update={
+            "spec": config.spec.model_copy(update={"fixed_point": fixed_point}),
+        })
+        with pytest.raises(ValueError):
+            sweep(make_arrays(100), [config])
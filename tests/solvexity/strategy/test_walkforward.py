@@ -0,0 +1,115 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import pytest
+
+from solvexity.model.shared import Symbol, Side
+from solvexity.strategy.walkforward import BarCache, WalkForward, build_bars, recording_md5
+from solvexity.toolbox.aggregator import BarSpec, BarType, BarColumns, FixedPoint, TradeArrays
+
+
+def make_arrays(n: int, seed: int = 0) -> TradeArrays:
+    rng = np.random.default_rng(seed)
+    timestamps = 1_700_000_000_000 + np.cumsum(rng.exponential(300, n)).astype(np.int64)
+    prices = np.round(50000.0 * np.exp(np.cumsum(rng.normal(0, 1e-4, n))), 2)
+    return TradeArrays(
+        Symbol(base="BTC", quote="USDT"), np.arange(1000, 1000 + n), prices,
+        np.round(rng.exponential(0.05, n), 5) + 1e-5, timestamps,
+        np.where(rng.random(n) < 0.5, int(Side.SIDE_BUY), int(Side.SIDE_SELL)).astype(np.int8),
+    )
+
+
+def fit_mean_return(train: BarColumns) -> float:
+    close = train["close"]
+    return float(np.mean(np.log(close[1:] / close[:-1])))
+
+
+def score_sign(model: float, test: BarColumns) -> dict:
+    close = test["close"]
+    returns = np.log(close[1:] / close[:-1])
+    return {"mean_return": model, "pnl": float(np.sign(model) * returns.sum()), "n_bars": len(test)}
+
+
+SPEC = BarSpec(type=BarType.TICK, reference_cutoff=20, buf_size=100)
+
+
+class TestBarCache:
+    def test_builds_once_per_key(self, tmp_path):
+        arrays = make_arrays(5000)
+        loads = []
+
+        def load():
+            loads.append(1)
+            return arrays
+
+        cache = BarCache(str(tmp_path))
+        first = cache.bars("abc", SPEC, load)
+        assert cache.bars("abc", SPEC, load) is first
+        assert len(loads) == 1 and cache.n_built == 1
+        assert first["is_closed"].all() and len(first) == 5000 // 20 - 1
+
+        # Another process finds them on disk
+        loaded = BarCache(str(tmp_path)).bars("abc", SPEC, lambda: None)
+        assert loaded.symbol == first.symbol
+        for name, column in first.columns.items():
+            np.testing.assert_array_equal(loaded[name], column)
+
+        other = cache.bars("abc", BarSpec(type=BarType.TICK, reference_cutoff=50, buf_size=100),
+                           load)
+        assert len(loads) == 2 and len(other) < len(first)
+
+    def test_rejects_fixed_point_specs(self, tmp_path):
+        spec = BarSpec(type=BarType.BASE_VOLUME, reference_cutoff=1.0, buf_size=100,
+                       fixed_point=FixedPoint(price_scale=100, quantity_scale=10**5))
+        with pytest.raises(ValueError):
+            build_bars(make_arrays(100), spec)
+        with pytest.raises(ValueError):
+            BarCache(str(tmp_path)).bars("abc", spec, lambda: make_arrays(100))
+
+    def test_recording_md5(self, tmp_path):
+        a, b = tmp_path / "a.bin", tmp_path / "b.bin"
+        a.write_bytes(b"first")
+        b.write_bytes(b"second")
+        assert recording_md5([str(a), str(b)]) != recording_md5([str(b), str(a)])
+        assert recording_md5([str(a)]) == recording_md5([str(a)])
+
+
+class TestWalkForward:
+    def test_splits(self):
+        assert WalkForward(10, 5).splits(27) == [(0, 10, 10, 15), (5, 15, 15, 20), (10, 20, 20, 25)]
+        splits = WalkForward(10, 5, step=10, expanding=True).splits(30)
+        assert splits == [(0, 10, 10, 15), (0, 20, 20, 25)]
+        assert WalkForward(10, 5).splits(14) == []
+
+    @pytest.mark.parametrize("train_size, test_size, step",
+                             [(0, 5, None), (10, -1, None), (10, 5, 0),
+                                                            (10, 5, -5), (10.0, 5, None),
+                              (10, 5, 2.5)])
+    def test_rejects_sizes_that_are_not_positive_ints(self, train_size, test_size, step):
+        with pytest.raises(ValueError, match="must be a positive int"):
+            WalkForward(train_size, test_size, step=step)
+
+    def test_folds_are_views(self):
+        bars = build_bars(make_arrays(5000), SPEC)
+        seen = []
+
+        def fit(train: BarColumns):
+            seen.append(np.shares_memory(train["close"], bars["close"]))
+            return 0.0
+
+        with ThreadPoolExecutor(1) as pool:
+            WalkForward(50, 20).run(bars, fit, lambda model, test: {}, pool=pool)
+        assert len(seen) > 0 and all(seen)
+
+    def test_process_pool_matches_sequential(self):
+        bars = build_bars(make_arrays(10_000, seed=3), SPEC)
+        walk = WalkForward(100, 50, expanding=True)
+        table = walk.run(bars, fit_mean_return, score_sign, max_workers=2)
+        expected = []
+        for train_start, train_stop, test_start, test_stop in walk.splits(len(bars)):
+            model = fit_mean_return(bars.slice(train_start, train_stop))
+            expected.append(score_sign(model, bars.slice(test_start, test_stop)))
+        pd.testing.assert_frame_equal(table[["mean_return", "pnl", "n_bars"]],
+                                      pd.DataFrame(expected))
+        assert list(table["fold"]) == list(range(len(expected)))
+        assert (table["test_start_id"] == table["train_next_id"]).all()
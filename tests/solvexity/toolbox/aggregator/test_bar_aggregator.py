@@ -6,7 +6,9 @@ from solvexity.toolbox.aggregator.bar_aggregator import (
     TimeBarAggregator, 
     TickBarAggregator, 
     BaseVolumeBarAggregator, 
-    QuoteVolumeBarAggregator
+    QuoteVolumeBarAggregator,
+    BarBuffer,
+    next_bar_key
 )
 from solvexity.model.trade import Trade
 from solvexity.model.bar import Bar
@@ -575,6 +577,20 @@ class TestBaseVolumeBarAggregator:
         assert second_bar.is_closed is False
         assert abs(second_bar.volume - 0.5) < 1e-10  # Remaining volume
 
+    def test_whale_trade_is_not_mutated(self, aggregator, sample_trade):
+        """Test a trade spanning many bars is split without touching the input trade"""
+        trade = sample_trade.model_copy()
+        trade.quantity = 7.25
+        before = trade.model_dump()
+        aggregator.on_trade(trade)
+
+        assert trade.model_dump() == before
+        assert len(aggregator.bars) == 8
+        assert all(bar.is_closed for bar in list(aggregator.bars)[:7])
+        assert all(abs(bar.volume - 1.0) < 1e-10 for bar in list(aggregator.bars)[:7])
+        assert abs(aggregator.bars[-1].volume - 0.25) < 1e-10
+        assert all(bar.taker_buy_base_asset_volume == bar.volume for bar in aggregator.bars)
+
     def test_multiple_trades_across_bars(self, aggregator, sample_trade):
         """Test multiple trades that span multiple volume bars"""
         # First trade - partial
@@ -725,6 +741,19 @@ class TestQuoteVolumeBarAggregator:
         bar = aggregator.bars[-1]  # Get the last bar
         assert bar.quote_volume > 0  # Should have some quote volume
 
+    def test_whale_trade_is_not_mutated(self, sample_trade):
+        """Test a trade spanning many quote volume bars is split without touching the input trade"""
+        aggregator = QuoteVolumeBarAggregator(buf_size=20, reference_cutoff=5000.0)
+        trade = sample_trade.model_copy()
+        trade.quantity = 1.05  # 52500 quote volume, 10 full bars and a partial one
+        before = trade.model_dump()
+        aggregator.on_trade(trade)
+
+        assert trade.model_dump() == before
+        assert len(aggregator.bars) == 11
+        assert all(bar.is_closed for bar in list(aggregator.bars)[:10])
+        assert abs(sum(bar.volume for bar in aggregator.bars) - 1.05) < 1e-10
+
     def test_multiple_trades_across_bars(self, aggregator, sample_trade):
         """Test multiple trades that span multiple quote volume bars"""
         # First trade - partial
@@ -788,3 +817,33 @@ class TestQuoteVolumeBarAggregator:
 
         # Should only keep last 2 bars due to maxlen
         assert len(agg.bars) == 2
+
+
+class TestBarBuffer:
+    """Test suite for bar indices and (next_id, seq) keys"""
+
+    def test_indices_survive_eviction_rewind_and_reset(self):
+        bars = BarBuffer(maxlen=3)
+        for i in range(5):
+            bars.append(i)
+        assert (bars.start, bars.end) == (2, 5)
+        bars.pop()
+        bars.append(4)
+        assert (bars.start, bars.end) == (2, 5)
+        bars.clear()
+        assert (bars.start, bars.end) == (5, 5)
+        bars.append(5)
+        assert bars.start == 5
+
+    def test_keys_number_bars_sharing_a_next_id(self):
+        def bar(next_id: int) -> Bar:
+            return Bar(symbol=Symbol(base="BTC", quote="USDT"), start_id=1, current_id=next_id - 1,
+                       next_id=next_id,
+                       open_time=0, close_time=0, open=1.0, high=1.0, low=1.0, close=1.0,
+                       volume=1.0, quote_volume=1.0, is_closed=True, number_of_trades=1,
+                       taker_buy_base_asset_volume=0.0, taker_buy_quote_asset_volume=0.0)
+
+        keys = []
+        for next_id in [3, 5, 5, 5, 6]:
+            keys.append(next_bar_key(keys[-1] if keys else None, bar(next_id)))
+        assert keys == [(3, 0), (5, 0), (5, 1), (5, 2), (6, 0)]
@@ -0,0 +1,156 @@
+import pytest
+import numpy as np
+from collections import deque
+
+from solvexity.toolbox.aggregator import BarType, AggregatorFactory
+from solvexity.toolbox.aggregator.batch import (
+    BatchBarAggregator, TradeArrays, BarColumns, segment_sum
+)
+from solvexity.model.trade import Trade
+
+
+class RecordingDeque(deque):
+    """Bars deque that remembers every bar ever appended, even after reset() or eviction"""
+
+    def __init__(self, maxlen: int):
+        super().__init__(maxlen=maxlen)
+        self.history = []
+
+    def append(self, bar):
+        self.history.append(bar)
+        super().append(bar)
+
+
+def run_streaming(bar_type: BarType, buf_size: int, cutoff, trades: list[Trade],
+                  threshold: float = 1.0):
+    aggregator = AggregatorFactory.from_dict(bar_type, {
+        "buf_size": buf_size, "reference_cutoff": cutoff, "bars": [],
+        "completeness_threshold": threshold, "missing_trades": 0, "missing_intervals": [],
+        "accumulator": 0,
+    })
+    aggregator.bars = RecordingDeque(buf_size)
+    for trade in trades:
+        aggregator.on_trade(trade.model_copy())
+    return aggregator
+
+
+def run_batch(bar_type: BarType, buf_size: int, cutoff, trades: list[Trade], n_chunks: int = 1,
+              threshold: float = 1.0):
+    batch = BatchBarAggregator(bar_type, buf_size, cutoff, threshold)
+    arrays = TradeArrays.from_trades(trades)
+    bounds = np.linspace(0, len(arrays), n_chunks + 1).astype(int)
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        batch.on_trades(arrays.slice(start, stop))
+    return batch
+
+
+CASES = [
+    (BarType.TIME, 1000),
+    (BarType.TICK, 50),
+    (BarType.BASE_VOLUME, 0.5),
+    (BarType.QUOTE_VOLUME, 20000.0),
+]
+
+
+class TestBatchMatchesStreaming:
+    """Differential tests: the batch path must reproduce the streaming aggregators bit for bit"""
+
+    @pytest.mark.parametrize("bar_type,cutoff", CASES)
+    @pytest.mark.parametrize("n_chunks", [1, 7])
+    def test_clean_tape(self, bar_type, cutoff, n_chunks, make_trades):
+        trades = make_trades(3000, seed=1, zeros=True)
+        streaming = run_streaming(bar_type, 10_000, cutoff, trades)
+        batch = run_batch(bar_type, 10_000, cutoff, trades, n_chunks=n_chunks)
+
+        expected = [bar.model_dump() for bar in streaming.bars.history]
+        assert batch.bars().to_dicts() == expected
+        assert batch.to_dict() == streaming.to_dict()
+
+    @pytest.mark.parametrize("bar_type,cutoff", CASES)
+    @pytest.mark.parametrize("threshold", [1.0, 0.99, 0.0])
+    def test_gaps_and_disorder(self, bar_type, cutoff, threshold, make_trades):
+        trades = make_trades(3000, seed=2, gaps=True, disorder=True, zeros=True)
+        streaming = run_streaming(bar_type, 20, cutoff, trades, threshold)
+        batch = run_batch(bar_type, 20, cutoff, trades, n_chunks=5, threshold=threshold)
+
+        expected = [bar.model_dump() for bar in streaming.bars.history]
+        assert batch.bars().to_dicts() == expected
+        assert batch.to_dict() == streaming.to_dict()
+
+    @pytest.mark.parametrize("bar_type,cutoff", CASES[2:])
+    def test_whale_trades_span_many_bars(self, bar_type, cutoff, make_trades):
+        trades = make_trades(2000, seed=3, whales=True, zeros=True)
+        streaming = run_streaming(bar_type, 10_000, cutoff, trades)
+        batch = run_batch(bar_type, 10_000, cutoff, trades)
+
+        expected = [bar.model_dump() for bar in streaming.bars.history]
+        assert batch.bars().to_dicts() == expected
+        assert batch.to_dict() == streaming.to_dict()
+
+    @pytest.mark.parametrize("bar_type,cutoff",
+                             [(BarType.BASE_VOLUME, 10.0), (BarType.QUOTE_VOLUME, 500_000.0)])
+    @pytest.mark.parametrize("n_chunks", [1, 7])
+    def test_large_cutoffs_take_the_vectorized_path(self, bar_type, cutoff, n_chunks, make_trades,
+                                                    monkeypatch):
+        """Bars of hundreds of trades are searched in bulk instead of replayed trade by trade"""
+        merged = []
+        merge_into_last = BatchBarAggregator._merge_into_last
+
+        def spy(self, trades, pq, is_buy, start, end):
+            merged.append(end - start)
+            merge_into_last(self, trades, pq, is_buy, start, end)
+        monkeypatch.setattr(BatchBarAggregator, "_merge_into_last", spy)
+
+        trades = make_trades(6000, seed=7, gaps=True, zeros=True)
+        streaming = run_streaming(bar_type, 10_000, cutoff, trades, threshold=0.0)
+        batch = run_batch(bar_type, 10_000, cutoff, trades, n_chunks=n_chunks, threshold=0.0)
+
+        # Volume bars only merge trades in bulk on the vectorized path
+        assert sum(merged) > len(trades) // 2
+        expected = [bar.model_dump() for bar in streaming.bars.history]
+        assert batch.bars().to_dicts() == expected
+        assert batch.to_dict() == streaming.to_dict()
+
+    @pytest.mark.parametrize("bar_type,cutoff", CASES)
+    def test_handoff_continues_streaming(self, bar_type, cutoff, make_trades):
+        """Backfill half the tape in batch, finish it live; the result equals a streaming run"""
+        trades = make_trades(2000, seed=4, gaps=True, zeros=True)
+        streaming = run_streaming(bar_type, 50, cutoff, trades)
+
+        batch = run_batch(bar_type, 50, cutoff, trades[:1000])
+        handed_off = batch.to_aggregator()
+        for trade in trades[1000:]:
+            handed_off.on_trade(trade.model_copy())
+
+        assert handed_off.to_dict() == streaming.to_dict()
+
+
+class TestBarColumns:
+    def test_to_dataframe_matches_aggregator_layout(self, make_trades):
+        trades = make_trades(500, seed=5, zeros=True)
+        streaming = run_streaming(BarType.TICK, 100, 20, trades)
+        batch = run_batch(BarType.TICK, 100, 20, trades)
+
+        expected = streaming.to_dataframe(is_closed=False)
+        actual = batch.retained_bars().to_dataframe()
+        assert list(actual.columns) == list(expected.columns)
+        assert actual.equals(expected)
+
+    def test_round_trip_bars(self, make_trades):
+        trades = make_trades(300, seed=6, zeros=True)
+        bars = run_batch(BarType.TICK, 100, 20, trades).bars().to_bars()
+        assert BarColumns.from_bars(bars).to_bars() == bars
+
+
+class TestSegmentSum:
+    def test_left_to_right_rounding(self):
+        rng = np.random.default_rng(0)
+        values = rng.random(10_000) * 1e-3 + rng.random(10_000)
+        starts = np.array([0, 17, 18, 5000])
+        lengths = np.diff(np.append(starts, len(values)))
+        sums = segment_sum(values, starts, lengths)
+        for start, length, total in zip(starts, lengths, sums):
+            expected = 0.0
+            for value in values[start:start + length]:
+                expected += value
+            assert total == expected
@@ -0,0 +1,37 @@
+import json
+import copy
+
+from solvexity.toolbox.aggregator import BarType
+from solvexity.toolbox.aggregator.benchmark import make_trades, run_suite, compare
+
+
+class TestBenchmark:
+    """Smoke tests for the aggregator benchmark suite"""
+
+    def test_synthetic_stream_has_gaps(self):
+        trades = make_trades(20_000, gap_rate=0.01)
+        ids = [trade.id for trade in trades]
+        assert ids == sorted(ids)
+        assert ids[-1] - ids[0] + 1 > len(trades)
+        assert make_trades(100)[50] == make_trades(100)[50]
+
+    def test_suite_emits_json(self):
+        results = run_suite(n_trades=2_000, buf_sizes=(10, 100),
+                            bar_types=(BarType.TIME, BarType.QUOTE_VOLUME), repeat=1)
+        results = json.loads(json.dumps(results))
+        assert len(results["results"]) == 4
+        for result in results["results"]:
+            assert result["trades_per_sec"] > 0
+            assert result["n_bars"] <= result["buf_size"]
+            assert result["retained_bytes_per_bar"] > 0
+            assert result["to_dataframe_ms"] > 0
+
+    def test_compare_flags_regressions(self):
+        baseline = run_suite(n_trades=1_000, buf_sizes=(10,), bar_types=(BarType.TICK,), repeat=1)
+        assert compare(baseline, baseline) == []
+
+        slower = copy.deepcopy(baseline)
+        slower["results"][0]["trades_per_sec"] /= 2
+        regressions = compare(baseline, slower)
+        assert len(regressions) == 1
+        assert "trades_per_sec" in regressions[0]
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import os
+import time
+import pytest
+import numpy as np
+
+from solvexity.toolbox.aggregator import BarType, AggregatorFactory, MultiTimeBarAggregator
+from solvexity.toolbox.aggregator.bar_aggregator import Interval
+from solvexity.toolbox.aggregator.checkpoint import (
+    CheckpointWriter, dump_checkpoint, load_checkpoint, load_checkpoint_file, save_checkpoint,
+    is_checkpoint
+)
+from solvexity.model.trade import Trade
+from solvexity.model.shared import Symbol, Exchange, Instrument, Side
+
+CASES = [
+    (BarType.TIME, 1000),
+    (BarType.TICK, 50),
+    (BarType.BASE_VOLUME, 0.5),
+    (BarType.QUOTE_VOLUME, 20000.0),
+]
+
+
+def make_aggregator(bar_type: BarType, cutoff, n: int = 2000, buf_size: int = 100):
+    rng = np.random.default_rng(0)
+    aggregator = AggregatorFactory.create(bar_type, buf_size, cutoff)
+    for i in range(n):
+        aggregator.on_trade(Trade(
+            id=i + 1,
+            exchange=Exchange.EXCHANGE_BINANCE,
+            instrument=Instrument.INSTRUMENT_SPOT,
+            symbol=Symbol(base="BTC", quote="USDT"),
+            side=Side.SIDE_BUY if i % 3 else Side.SIDE_SELL,
+            price=50000.0 + float(rng.normal(0, 10)),
+            quantity=float(rng.exponential(0.05)),
+            timestamp=1_700_000_000_000 + i * 300,
+        ))
+    aggregator.missing_intervals.append(Interval(start_id=n - 40, end_id=n - 37))
+    aggregator.missing_trades = 3
+    return aggregator
+
+
+class TestCheckpoint:
+    """Test suite for the binary aggregator checkpoint format"""
+
+    @pytest.mark.parametrize("bar_type,cutoff", CASES)
+    def test_round_trip(self, bar_type, cutoff):
+        aggregator = make_aggregator(bar_type, cutoff)
+        assert len(aggregator.missing_intervals) > 0
+
+        data = dump_checkpoint(aggregator)
+        assert is_checkpoint(data)
+        restored = load_checkpoint(data)
+        assert type(restored) is type(aggregator)
+        assert restored.to_dict() == aggregator.to_dict()
+
+    def test_smaller_than_json(self):
+        aggregator = make_aggregator(BarType.TIME, 1000, n=200_000 // 3, buf_size=500)
+        assert len(dump_checkpoint(aggregator)) < len(json.dumps(aggregator.to_dict())) / 2
+
+    def test_empty_aggregator(self):
+        aggregator = AggregatorFactory.create(BarType.TICK, 10, 100)
+        assert load_checkpoint(dump_checkpoint(aggregator)).to_dict() == aggregator.to_dict()
+
+    def test_rejects_unknown_version(self):
+        data = bytearray(dump_checkpoint(make_aggregator(BarType.TICK, 50)))
+        data[8] = 99
+        with pytest.raises(ValueError):
+            load_checkpoint(bytes(data))
+
+    def test_rejects_unsupported_aggregator(self):
+        with pytest.raises(ValueError):
+            dump_checkpoint(MultiTimeBarAggregator(10, [1000, 60000]))
+
+    def test_file_round_trip_is_atomic(self, tmp_path):
+        aggregator = make_aggregator(BarType.QUOTE_VOLUME, 20000.0)
+        path = str(tmp_path / "aggregator.ckpt")
+        save_checkpoint(aggregator, path)
+        assert os.listdir(tmp_path) == ["aggregator.ckpt"]
+        assert load_checkpoint_file(path, BarType.QUOTE_VOLUME).to_dict() == aggregator.to_dict()
+
+    def test_json_fallback(self, tmp_path):
+        aggregator = make_aggregator(BarType.TIME, 1000)
+        path = tmp_path / "aggregator.json"
+        path.write_text(json.dumps(aggregator.to_dict(), indent=4))
+        assert load_checkpoint_file(str(path), BarType.TIME).to_dict() == aggregator.to_dict()
+
+    def test_missing_checkpoint_falls_back_to_sibling_json(self, tmp_path):
+        aggregator = make_aggregator(BarType.TIME, 1000)
+        (tmp_path / "aggregator.json").write_text(json.dumps(aggregator.to_dict()))
+        restored = load_checkpoint_file(str(tmp_path / "aggregator.ckpt"), BarType.TIME)
+        assert restored.to_dict() == aggregator.to_dict()
+
+        # Once written, the checkpoint wins over the older snapshot
+        newer = make_aggregator(BarType.TIME, 2000)
+        save_checkpoint(newer, str(tmp_path / "aggregator.ckpt"))
+        restored = load_checkpoint_file(str(tmp_path / "aggregator.ckpt"), BarType.TIME)
+        assert restored.to_dict() == newer.to_dict()
+
+    def test_missing_checkpoint_without_json_raises(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            load_checkpoint_file(str(tmp_path / "aggregator.ckpt"), BarType.TIME)
+
+
+class TestCheckpointWriter:
+    """Test suite for background periodic snapshots"""
+
+    async def test_snapshot_every_n_bars(self, tmp_path):
+        aggregator = make_aggregator(BarType.TICK, 50)
+        path = str(tmp_path / "aggregator.ckpt")
+        writer = CheckpointWriter(path, aggregator, every_bars=3)
+        task = asyncio.create_task(writer.run())
+        try:
+            writer.on_bar()
+            writer.on_bar()
+            await asyncio.sleep(0.05)
+            assert writer.n_snapshots == 0
+            writer.on_bar()
+            for _ in range(100):
+                await asyncio.sleep(0.01)
+                if writer.n_snapshots == 1:
+                    break
+            assert writer.n_snapshots == 1
+            assert load_checkpoint_file(path, BarType.TICK).to_dict() == aggregator.to_dict()
+        finally:
+            task.cancel()
+
+    async def test_snapshot_every_n_seconds(self, tmp_path):
+        aggregator = make_aggregator(BarType.TIME, 1000)
+        writer = CheckpointWriter(str(tmp_path / "aggregator.ckpt"), aggregator, every_seconds=0.01)
+        task = asyncio.create_task(writer.run())
+        try:
+            await asyncio.sleep(0.2)
+            assert writer.n_snapshots >= 2
+        finally:
+            task.cancel()
+
+    async def test_cancel_waits_for_the_write_in_progress(self, tmp_path, monkeypatch):
+        aggregator = make_aggregator(BarType.TICK, 50)
+        path = str(tmp_path / "aggregator.ckpt")
+        written = []
+
+        def slow_write(path: str, data: bytes):
+            time.sleep(0.1)
+            written.append(len(data))
+
+        monkeypatch.setattr("solvexity.toolbox.aggregator.checkpoint.write_atomic", slow_write)
+        writer = CheckpointWriter(path, aggregator, every_bars=1)
+        task = asyncio.create_task(writer.run())
+        writer.on_bar()
+        await asyncio.sleep(0.02)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert written == [len(dump_checkpoint(aggregator))]
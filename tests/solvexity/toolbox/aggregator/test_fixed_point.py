@@ -0,0 +1,103 @@
+import pytest
+
+from solvexity.toolbox.aggregator import BarType, AggregatorFactory, FixedPoint
+from solvexity.toolbox.aggregator.checkpoint import dump_checkpoint, load_checkpoint
+from solvexity.model.trade import Trade
+
+BTCUSDT = FixedPoint(price_scale=100, quantity_scale=10**8)
+CASES = [
+    (BarType.BASE_VOLUME, 0.5),
+    (BarType.QUOTE_VOLUME, 20000.0),
+]
+
+
+def run(aggregator, trades: list[Trade]):
+    for trade in trades:
+        aggregator.on_trade(trade)
+    return aggregator
+
+
+class TestFixedPointVolumeBars:
+    """Test suite for exact integer accumulation in the volume bar aggregators"""
+
+    @pytest.fixture
+    def trades(self, make_trades):
+        return make_trades(5000, whales=True)
+
+    def test_base_volume_bars_are_exact(self, trades):
+        aggregator = AggregatorFactory.create(BarType.BASE_VOLUME, 100_000, 0.5,
+                                              fixed_point=BTCUSDT)
+        run(aggregator, trades)
+        closed = [bar for bar in aggregator.bars if bar.is_closed]
+        assert len(closed) > 100
+        assert all(bar.volume == 0.5 for bar in closed)
+        units = sum(BTCUSDT.quantity_units(trade.quantity) for trade in trades)
+        assert aggregator.accumulator == units
+        assert aggregator.accumulator % aggregator.cutoff_units == aggregator.open_units[0]
+
+    def test_quote_volume_bars_close_within_one_unit(self, trades):
+        aggregator = AggregatorFactory.create(BarType.QUOTE_VOLUME, 100_000, 20000.0,
+                                              fixed_point=BTCUSDT)
+        run(aggregator, trades)
+        closed = [bar for bar in aggregator.bars if bar.is_closed]
+        assert len(closed) > 100
+        # Fills are rounded up to whole quantity units, so a bar overshoots by less than one
+        # unit's notional
+        for bar in closed:
+            assert 20000.0 <= bar.quote_volume < 20000.0 + bar.high / BTCUSDT.quantity_scale + 1e-9
+        assert aggregator.accumulator % aggregator.cutoff_units == aggregator.open_units[1]
+
+    @pytest.mark.parametrize("bar_type,cutoff", CASES)
+    def test_trades_are_not_split_across_ids(self, trades, bar_type, cutoff):
+        aggregator = run(AggregatorFactory.create(bar_type, 100_000, cutoff, fixed_point=BTCUSDT),
+                         trades)
+        bars = list(aggregator.bars)
+        for previous, bar in zip(bars[:-1], bars[1:]):
+            assert bar.start_id in (previous.next_id, previous.current_id)
+        volume = sum(trade.quantity for trade in trades)
+        assert sum(bar.volume for bar in bars) == pytest.approx(volume)
+
+    @pytest.mark.parametrize("bar_type,cutoff", CASES)
+    def test_replays_are_bit_identical(self, trades, bar_type, cutoff):
+        first = run(AggregatorFactory.create(bar_type, 1000, cutoff, fixed_point=BTCUSDT), trades)
+        second = run(AggregatorFactory.create(bar_type, 1000, cutoff, fixed_point=BTCUSDT), trades)
+        assert first.to_dict() == second.to_dict()
+
+    @pytest.mark.parametrize("bar_type,cutoff", CASES)
+    def test_resume_from_snapshot(self, trades, bar_type, cutoff):
+        expected = run(AggregatorFactory.create(bar_type, 1000, cutoff, fixed_point=BTCUSDT),
+                       trades)
+        head = run(AggregatorFactory.create(bar_type, 1000, cutoff, fixed_point=BTCUSDT),
+                   trades[:2500])
+
+        from_dict = run(AggregatorFactory.from_dict(bar_type, head.to_dict()), trades[2500:])
+        from_checkpoint = run(load_checkpoint(dump_checkpoint(head)), trades[2500:])
+        assert from_dict.to_dict() == expected.to_dict()
+        assert from_checkpoint.to_dict() == expected.to_dict()
+
+    @pytest.mark.parametrize("bar_type,cutoff", CASES)
+    def test_repair_restores_open_units(self, trades, bar_type, cutoff):
+        expected = run(AggregatorFactory.create(bar_type, 100_000, cutoff, fixed_point=BTCUSDT),
+                       trades)
+        aggregator = AggregatorFactory.create(bar_type, 100_000, cutoff, 0.9, repair_window=5000,
+                                              fixed_point=BTCUSDT)
+        run(aggregator, trades[:3000] + trades[3010:])
+        assert aggregator.repair(trades[3000:3010]) == 10
+        assert aggregator.to_dict()["bars"] == expected.to_dict()["bars"]
+        assert aggregator.open_units == expected.open_units
+
+    def test_input_trades_are_not_mutated(self, trades):
+        before = [trade.model_dump() for trade in trades]
+        run(AggregatorFactory.create(BarType.QUOTE_VOLUME, 1000, 20000.0, fixed_point=BTCUSDT),
+            trades)
+        assert [trade.model_dump() for trade in trades] == before
+
+    def test_float_mode_layout_is_unchanged(self):
+        data = AggregatorFactory.create(BarType.BASE_VOLUME, 10, 0.5).to_dict()
+        assert "fixed_point" not in data
+
+    def test_only_volume_bars_support_fixed_point(self):
+        with pytest.raises(ValueError):
+            AggregatorFactory.create(BarType.TIME, 10, 1000, fixed_point=BTCUSDT)
+        with pytest.raises(ValueError):
+            AggregatorFactory.create(BarType.BASE_VOLUME, 10, 1e-9, fixed_point=BTCUSDT)
@@ -0,0 +1,95 @@
+import pytest
+
+from solvexity.toolbox.aggregator import (
+    AggregatorManager, BarSpec, BarType, FixedPoint, TimeBarAggregator, QuoteVolumeBarAggregator
+)
+from solvexity.model.shared import Symbol, Exchange, Instrument
+
+BTC = Symbol(base="BTC", quote="USDT")
+ETH = Symbol(base="ETH", quote="USDT")
+TIME_SPEC = BarSpec(type=BarType.TIME, reference_cutoff=1000, buf_size=10)
+QUOTE_SPEC = BarSpec(type=BarType.QUOTE_VOLUME, reference_cutoff=10_000.0, buf_size=10)
+
+
+def market(symbol: Symbol, exchange: Exchange = Exchange.EXCHANGE_BINANCE):
+    return (exchange, Instrument.INSTRUMENT_SPOT, symbol)
+
+
+class TestAggregatorManager:
+    """Test suite for AggregatorManager"""
+
+    def test_requires_specs(self):
+        with pytest.raises(ValueError):
+            AggregatorManager([])
+
+    def test_lazy_creation_per_market_and_spec(self, make_trade):
+        manager = AggregatorManager([TIME_SPEC, QUOTE_SPEC])
+        assert len(manager) == 0
+
+        aggregators = manager.on_trade(make_trade(1))
+        assert len(manager) == 1
+        assert isinstance(aggregators[TIME_SPEC], TimeBarAggregator)
+        assert isinstance(aggregators[QUOTE_SPEC], QuoteVolumeBarAggregator)
+
+        manager.on_trade(make_trade(1, symbol=ETH, price=3000.0))
+        manager.on_trade(make_trade(1, exchange=Exchange.EXCHANGE_BYBIT))
+        assert len(manager) == 3
+        assert len(list(manager.items())) == 6
+
+    def test_routes_trades_to_their_market(self, make_trade):
+        manager = AggregatorManager([TIME_SPEC])
+        for i in range(1, 6):
+            manager.on_trade(make_trade(i, symbol=BTC, timestamp=1000 + i))
+            manager.on_trade(make_trade(100 + i, symbol=ETH, timestamp=1000 + i, price=3000.0))
+
+        btc = manager.get(market(BTC), TIME_SPEC)
+        eth = manager.get(market(ETH), TIME_SPEC)
+        assert btc.bars[-1].number_of_trades == 5
+        assert btc.bars[-1].close == 50000.0
+        assert eth.bars[-1].start_id == 101
+        assert eth.bars[-1].close == 3000.0
+        assert manager.get(market(BTC), QUOTE_SPEC) is None
+
+    def test_shared_trade_is_not_consumed_by_volume_aggregator(self, make_trade):
+        manager = AggregatorManager([QUOTE_SPEC, TIME_SPEC])
+        trade = make_trade(1, quantity=1.0)
+        manager.on_trade(trade)
+        assert manager.get(market(BTC), TIME_SPEC).bars[-1].volume == 1.0
+        assert manager.get(market(BTC), QUOTE_SPEC).size() == 5
+
+    def test_idle_markets_are_evicted(self, make_trade):
+        evicted = []
+        manager = AggregatorManager([TIME_SPEC], idle_timeout_ms=60_000,
+                                    on_evict=lambda key, aggregators: evicted.append(key))
+        manager.on_trade(make_trade(1, symbol=ETH, timestamp=0))
+        manager.on_trade(make_trade(1, symbol=BTC, timestamp=30_000))
+        manager.on_trade(make_trade(2, symbol=BTC, timestamp=60_000))
+        assert market(ETH) in manager
+
+        manager.on_trade(make_trade(3, symbol=BTC, timestamp=60_001))
+        assert market(ETH) not in manager
+        assert market(BTC) in manager
+        assert evicted == [market(ETH)]
+
+    def test_snapshot_round_trip(self, make_trade):
+        manager = AggregatorManager([TIME_SPEC, QUOTE_SPEC], idle_timeout_ms=60_000)
+        for i in range(1, 50):
+            manager.on_trade(make_trade(i, symbol=BTC, timestamp=i * 300))
+            manager.on_trade(make_trade(i, symbol=ETH, timestamp=i * 300, price=3000.0))
+
+        restored = AggregatorManager.from_dict(manager.to_dict())
+        assert restored.to_dict() == manager.to_dict()
+        expected = manager.get(market(ETH), QUOTE_SPEC).to_dict()
+        assert restored.get(market(ETH), QUOTE_SPEC).to_dict() == expected
+
+        manager.on_trade(make_trade(50, symbol=BTC, timestamp=15_000))
+        restored.on_trade(make_trade(50, symbol=BTC, timestamp=15_000))
+        assert restored.to_dict() == manager.to_dict()
+
+    def test_spec_of_an_aggregator(self):
+        spec = BarSpec(type=BarType.BASE_VOLUME, reference_cutoff=0.5, buf_size=20,
+                       completeness_threshold=0.9,
+                       repair_window=100,
+                       fixed_point=FixedPoint(price_scale=100, quantity_scale=10**8))
+        assert BarSpec.of(spec.create(), BarType.BASE_VOLUME) == spec
+        assert BarSpec.of(TIME_SPEC.create(), BarType.TIME) == TIME_SPEC
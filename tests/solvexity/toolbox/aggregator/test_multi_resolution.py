@@ -0,0 +1,103 @@
+import pytest
+
+from solvexity.toolbox.aggregator import (
+    TimeBarAggregator, MultiTimeBarAggregator, RollupBarAggregator
+)
+from solvexity.toolbox.aggregator.checkpoint import dump_checkpoint
+
+CUTOFFS = [1_000, 60_000, 300_000]
+
+
+class TestMultiTimeBarAggregator:
+    """Test suite for MultiTimeBarAggregator and its rollup levels"""
+
+    @pytest.fixture
+    def trades(self, make_trades):
+        return make_trades(5000, interval_ms=400)
+
+    def test_initialization(self):
+        agg = MultiTimeBarAggregator(buf_size=10, reference_cutoffs=[60_000, 1_000, 300_000])
+        assert agg.reference_cutoffs == CUTOFFS
+        assert agg.reference_cutoff == 1_000
+        assert [level.reference_cutoff for level in agg.levels] == CUTOFFS[1:]
+        assert agg.level(1_000) is agg
+        assert isinstance(agg.level(60_000), RollupBarAggregator)
+        with pytest.raises(KeyError):
+            agg.level(5_000)
+
+    def test_cutoffs_must_nest(self):
+        with pytest.raises(ValueError):
+            MultiTimeBarAggregator(buf_size=10, reference_cutoffs=[1_000, 1_500])
+
+    def test_levels_match_standalone_aggregators(self, trades):
+        """Closed bars of each level equal a dedicated TimeBarAggregator at that cutoff"""
+        multi = MultiTimeBarAggregator(buf_size=10_000, reference_cutoffs=CUTOFFS)
+        standalone = {cutoff: TimeBarAggregator(buf_size=10_000, reference_cutoff=cutoff)
+                      for cutoff in CUTOFFS}
+        for trade in trades:
+            multi.on_trade(trade)
+            for agg in standalone.values():
+                agg.on_trade(trade)
+
+        for cutoff, agg in standalone.items():
+            expected = [bar for bar in agg.bars if bar.is_closed]
+            actual = [bar for bar in multi.level(cutoff).bars if bar.is_closed]
+            assert len(actual) == len(expected) > 0
+            for a, e in zip(actual, expected):
+                for field in ("start_id", "current_id", "next_id", "open_time", "close_time",
+                              "open", "high", "low", "close", "number_of_trades"):
+                    assert getattr(a, field) == getattr(e, field)
+                assert a.volume == pytest.approx(e.volume)
+                assert a.quote_volume == pytest.approx(e.quote_volume)
+                assert a.taker_buy_base_asset_volume == pytest.approx(e.taker_buy_base_asset_volume)
+
+    def test_read_api_per_level(self, trades):
+        multi = MultiTimeBarAggregator(buf_size=5, reference_cutoffs=CUTOFFS)
+        for trade in trades:
+            multi.on_trade(trade)
+        level = multi.level(60_000)
+        assert level.size() == 5
+        assert level.last(is_closed=True).is_closed
+        df = level.to_dataframe(is_closed=True)
+        assert (df["open_time"] % 60_000 == 0).all()
+        assert level.is_valid() == multi.is_valid()
+
+    def test_gap_resets_every_level(self, trades):
+        multi = MultiTimeBarAggregator(buf_size=100, reference_cutoffs=CUTOFFS)
+        for trade in trades[:3000]:
+            multi.on_trade(trade)
+        assert multi.level(60_000).size() > 0
+
+        gap_trade = trades[3500]
+        multi.on_trade(gap_trade)
+        assert multi.size() == 1
+        assert all(level.size() == 0 for level in multi.levels)
+        assert multi.level(60_000).missing_trades == multi.missing_trades
+
+    def test_rollup_level_routes_trades_to_the_finest_level(self, trades):
+        multi = MultiTimeBarAggregator(buf_size=50, reference_cutoffs=CUTOFFS)
+        via_level = MultiTimeBarAggregator(buf_size=50, reference_cutoffs=CUTOFFS)
+        level = via_level.level(60_000)
+        for trade in trades:
+            multi.on_trade(trade)
+            level.on_trade(trade)
+        assert via_level.to_dict() == multi.to_dict()
+
+    def test_binary_checkpoints_reject_rollups(self, trades):
+        multi = MultiTimeBarAggregator(buf_size=10, reference_cutoffs=CUTOFFS)
+        multi.on_trade(trades[0])
+        for aggregator in (multi, multi.level(60_000)):
+            with pytest.raises(ValueError, match="Checkpoints are not supported"):
+                dump_checkpoint(aggregator)
+
+    def test_round_trip(self, trades):
+        multi = MultiTimeBarAggregator(buf_size=50, reference_cutoffs=CUTOFFS)
+        for trade in trades[:2500]:
+            multi.on_trade(trade)
+        restored = MultiTimeBarAggregator.from_dict(multi.to_dict())
+        assert restored.to_dict() == multi.to_dict()
+
+        for trade in trades[2500:]:
+            multi.on_trade(trade)
+            restored.on_trade(trade)
+        assert restored.to_dict() == multi.to_dict()
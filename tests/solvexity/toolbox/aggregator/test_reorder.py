@@ -0,0 +1,101 @@
+import numpy as np
+
+from solvexity.toolbox.aggregator import ReorderBuffer, TimeBarAggregator
+from solvexity.model.trade import Trade
+
+
+def ids(trades: list[Trade]) -> list[int]:
+    return [trade.id for trade in trades]
+
+
+class TestReorderBuffer:
+    """Test suite for ReorderBuffer"""
+
+    def test_in_order_trades_pass_through(self, make_trade):
+        buffer = ReorderBuffer(max_id_distance=10, next_id=1)
+        for i in range(1, 6):
+            assert ids(buffer.push(make_trade(i))) == [i]
+        assert len(buffer) == 0
+
+    def test_swapped_trades_are_released_in_order(self, make_trade):
+        buffer = ReorderBuffer(max_id_distance=10, next_id=1)
+        assert ids(buffer.push(make_trade(1))) == [1]
+        assert ids(buffer.push(make_trade(3))) == []
+        assert ids(buffer.push(make_trade(4))) == []
+        assert ids(buffer.push(make_trade(2))) == [2, 3, 4]
+        assert buffer.next_id == 5
+
+    def test_gap_is_declared_when_id_window_expires(self, make_trade):
+        buffer = ReorderBuffer(max_id_distance=5, next_id=1)
+        buffer.push(make_trade(1))
+        for i in range(3, 8):
+            assert buffer.push(make_trade(i)) == []
+        assert len(buffer) == 5
+        assert ids(buffer.push(make_trade(8))) == [3, 4, 5, 6, 7, 8]
+        assert buffer.push(make_trade(2)) == []
+        assert buffer.n_dropped == 1
+
+    def test_gap_is_declared_when_time_window_expires(self, make_trade):
+        buffer = ReorderBuffer(max_delay_ms=1000, next_id=1)
+        buffer.push(make_trade(1, timestamp=0))
+        assert buffer.push(make_trade(3, timestamp=100)) == []
+        assert buffer.push(make_trade(5, timestamp=900)) == []
+        assert ids(buffer.push(make_trade(6, timestamp=1100))) == [3]
+        assert ids(buffer.expire(now_ms=5000)) == [5, 6]
+
+    def test_late_and_duplicate_trades_are_dropped(self, make_trade):
+        buffer = ReorderBuffer(max_id_distance=10, next_id=1)
+        buffer.push(make_trade(1))
+        buffer.push(make_trade(3))
+        assert buffer.push(make_trade(3)) == []
+        assert buffer.push(make_trade(1)) == []
+        assert buffer.n_dropped == 2
+
+    def test_cold_start_begins_at_first_trade(self, make_trade):
+        buffer = ReorderBuffer(max_id_distance=3)
+        assert ids(buffer.push(make_trade(11))) == [11]
+        assert buffer.push(make_trade(10)) == []
+        assert ids(buffer.push(make_trade(12))) == [12]
+        assert buffer.push(make_trade(14)) == []
+        assert ids(buffer.flush()) == [14]
+        assert buffer.n_dropped == 1
+
+    def test_discard_drops_held_trades(self, make_trade):
+        buffer = ReorderBuffer(max_id_distance=10, next_id=1)
+        buffer.push(make_trade(1))
+        buffer.push(make_trade(3))
+        buffer.push(make_trade(4))
+        assert buffer.discard() == 2
+        assert len(buffer) == 0
+        assert buffer.next_id == 2
+        assert ids(buffer.push(make_trade(2))) == [2]
+
+    def test_no_window_passes_everything_through(self, make_trade):
+        buffer = ReorderBuffer()
+        assert ids(buffer.push(make_trade(5))) == [5]
+        assert ids(buffer.push(make_trade(7))) == [7]
+        assert buffer.push(make_trade(6)) == []
+
+    def test_aggregator_sees_no_gap_for_shuffled_stream(self, make_trade):
+        rng = np.random.default_rng(0)
+        trades = [make_trade(i) for i in range(1, 2001)]
+        shuffled = list(trades)
+        for i in range(0, len(shuffled) - 4, 4):
+            window = shuffled[i:i + 4]
+            rng.shuffle(window)
+            shuffled[i:i + 4] = window
+
+        expected = TimeBarAggregator(buf_size=1000, reference_cutoff=1000)
+        for trade in trades:
+            expected.on_trade(trade)
+
+        buffer = ReorderBuffer(max_id_distance=8, max_delay_ms=10_000, next_id=1)
+        aggregator = TimeBarAggregator(buf_size=1000, reference_cutoff=1000)
+        for trade in shuffled:
+            for released in buffer.push(trade):
+                aggregator.on_trade(released)
+        for released in buffer.flush():
+            aggregator.on_trade(released)
+
+        assert aggregator.missing_trades == 0
+        assert aggregator.to_dict() == expected.to_dict()
@@ -0,0 +1,135 @@
+import pytest
+
+from solvexity.toolbox.aggregator import BarType, AggregatorFactory
+from solvexity.model.trade import Trade
+
+CASES = [
+    (BarType.TIME, 1000),
+    (BarType.TICK, 50),
+    (BarType.BASE_VOLUME, 0.5),
+    (BarType.QUOTE_VOLUME, 20000.0),
+]
+
+
+def run(aggregator, trades: list[Trade]):
+    for trade in trades:
+        aggregator.on_trade(trade.model_copy())
+    return aggregator
+
+
+def bars_of(aggregator) -> list[dict]:
+    return [bar.model_dump() for bar in aggregator.bars]
+
+
+class TestGapRepair:
+    """Test suite for splicing backfilled trades into bars with recorded gaps"""
+
+    @pytest.fixture
+    def trades(self, make_trades):
+        return make_trades(3000)
+
+    @pytest.mark.parametrize("bar_type,cutoff", CASES)
+    def test_repair_matches_gap_free_run(self, trades, bar_type, cutoff):
+        expected = run(AggregatorFactory.create(bar_type, 10_000, cutoff), trades)
+
+        dropped = trades[1200:1230] + trades[2000:2005]
+        live = trades[:1200] + trades[1230:2000] + trades[2005:]
+        aggregator = AggregatorFactory.create(bar_type, 10_000, cutoff, 0.9, repair_window=5000)
+        run(aggregator, live)
+        assert aggregator.missing_trades == 35
+        assert len(aggregator.pending_repairs) == 2
+
+        assert aggregator.repair(dropped) == 35
+        assert bars_of(aggregator) == bars_of(expected)
+        assert aggregator.accumulator == expected.accumulator
+        assert aggregator.missing_trades == 0
+        assert len(aggregator.missing_intervals) == 0
+        assert aggregator.pending_repairs == []
+
+    @pytest.mark.parametrize("bar_type,cutoff", CASES)
+    def test_repair_later_gap_keeps_earlier_one(self, trades, bar_type, cutoff):
+        expected = run(AggregatorFactory.create(bar_type, 10_000, cutoff, 0.9),
+                       trades[:1200] + trades[1230:])
+
+        live = trades[:1200] + trades[1230:2000] + trades[2005:]
+        aggregator = AggregatorFactory.create(bar_type, 10_000, cutoff, 0.9, repair_window=5000)
+        run(aggregator, live)
+        assert aggregator.repair(trades[2000:2005]) == 5
+        assert bars_of(aggregator) == bars_of(expected)
+        assert [(i.start_id, i.end_id) for i in aggregator.missing_intervals] == [(1201, 1231)]
+        assert [(i.start_id, i.end_id) for i in aggregator.pending_repairs] == [(1201, 1231)]
+
+        assert aggregator.repair(trades[1200:1230]) == 30
+        assert aggregator.missing_trades == 0
+
+    @pytest.mark.parametrize("bar_type,cutoff", [
+        (BarType.TIME, 600_000),
+        (BarType.TICK, 500),
+        (BarType.BASE_VOLUME, 20.0),
+        (BarType.QUOTE_VOLUME, 1_000_000.0),
+    ])
+    def test_two_gaps_in_one_bar_at_default_threshold(self, trades, bar_type, cutoff):
+        expected = run(AggregatorFactory.create(bar_type, 10_000, cutoff), trades)
+        assert any(bar.start_id < 1200 and bar.next_id > 1212 for bar in expected.bars)
+
+        live = trades[:1200] + trades[1203:1206] + trades[1209:]
+        aggregator = run(AggregatorFactory.create(bar_type, 10_000, cutoff, repair_window=5000),
+                         live)
+        assert aggregator.missing_trades == 6
+        assert aggregator.bars[0].start_id == 1
+        # The later gap first: rewinding to it must leave the earlier gap's bar repairable
+        assert aggregator.repair(trades[1206:1209]) == 3
+        assert aggregator.repair(trades[1200:1203]) == 3
+        assert bars_of(aggregator) == bars_of(expected)
+        assert aggregator.missing_trades == 0
+
+    def test_given_up_repair_resets_at_default_threshold(self, trades):
+        strict = run(AggregatorFactory.create(BarType.TIME, 10_000, 1000),
+                     trades[:1200] + trades[1230:])
+        aggregator = run(AggregatorFactory.create(BarType.TIME, 10_000, 1000, repair_window=100),
+                         trades[:1200] + trades[1230:])
+        assert aggregator.pending_repairs == []
+        assert aggregator.bars[0].start_id > 1230
+        assert bars_of(aggregator)[-10:] == bars_of(strict)[-10:]
+
+    def test_partial_repair_records_the_rest(self, trades):
+        aggregator = run(AggregatorFactory.create(BarType.TIME, 10_000, 1000, 0.9,
+                                                  repair_window=5000),
+                         trades[:1200] + trades[1230:])
+        assert aggregator.repair(trades[1200:1210]) == 10
+        assert [(i.start_id, i.end_id) for i in aggregator.missing_intervals] == [(1211, 1231)]
+        assert aggregator.missing_trades == 20
+        assert aggregator.repair(trades[1210:1230]) == 20
+        assert aggregator.missing_trades == 0
+
+    def test_unrelated_trades_are_ignored(self, trades):
+        aggregator = run(AggregatorFactory.create(BarType.TICK, 10_000, 50, 0.9,
+                                                  repair_window=5000),
+                         trades[:1200] + trades[1230:])
+        before = aggregator.to_dict()
+        assert aggregator.repair(trades[100:200]) == 0
+        assert aggregator.to_dict() == before
+
+    def test_repair_window_expires(self, trades):
+        aggregator = run(AggregatorFactory.create(BarType.TIME, 10_000, 1000, 0.9,
+                                                  repair_window=100),
+                         trades[:1200] + trades[1230:])
+        assert aggregator.pending_repairs == []
+        assert aggregator.missing_trades == 30
+        assert aggregator.repair(trades[1200:1230]) == 0
+
+    def test_completeness_threshold_tolerates_small_gaps(self, trades):
+        strict = run(AggregatorFactory.create(BarType.TIME, 10_000, 1000),
+                     trades[:1200] + trades[1230:])
+        assert strict.missing_trades == 0
+        assert strict.bars[0].start_id == 1231
+
+        tolerant = run(AggregatorFactory.create(BarType.TIME, 10_000, 1000, 0.95),
+                       trades[:1200] + trades[1230:])
+        assert tolerant.missing_trades == 30
+        assert tolerant.bars[0].start_id == 1
+
+    def test_repair_window_round_trips(self):
+        aggregator = AggregatorFactory.create(BarType.TICK, 10, 50, 0.9, repair_window=500)
+        restored = AggregatorFactory.from_dict(BarType.TICK, aggregator.to_dict())
+        assert restored.repair_window == 500
@@ -0,0 +1,181 @@
+import pytest
+import numpy as np
+
+from solvexity.toolbox.aggregator import (
+    TimingWheel, TimeBarClock, TimeBarAggregator, TickBarAggregator, MultiTimeBarAggregator,
+    AggregatorManager, BarSpec, BarType
+)
+from solvexity.model.shared import Symbol, Exchange, Instrument
+
+BTC = Symbol(base="BTC", quote="USDT")
+
+
+class TestTimingWheel:
+    """Test suite for TimingWheel"""
+
+    def test_timers_fire_once_and_never_early(self):
+        rng = np.random.default_rng(0)
+        wheel = TimingWheel(tick_ms=10, wheel_size=16, levels=4)
+        deadlines = [int(d) for d in rng.integers(1, 50_000, 2000)]
+        fired = {}
+        for i, deadline in enumerate(deadlines):
+            wheel.schedule(deadline, lambda now_ms, i=i: fired.setdefault(i, []).append(now_ms))
+        assert len(wheel) == 2000
+
+        now = 0
+        while now < 60_000:
+            now += int(rng.integers(1, 700))
+            wheel.advance(now)
+            for i, calls in fired.items():
+                assert calls[0] >= deadlines[i]
+        assert len(wheel) == 0
+        assert sorted(fired) == list(range(2000))
+        assert all(len(calls) == 1 for calls in fired.values())
+
+    def test_fires_within_one_tick_when_advanced_every_tick(self):
+        wheel = TimingWheel(tick_ms=10, wheel_size=8, levels=3)
+        fired = []
+        wheel.schedule(1234, fired.append)
+        for now in range(0, 2000, 10):
+            wheel.advance(now)
+        assert fired == [1240]
+
+    def test_cancel(self):
+        wheel = TimingWheel(tick_ms=10)
+        fired = []
+        timer = wheel.schedule(100, fired.append)
+        wheel.schedule(200, fired.append)
+        wheel.cancel(timer)
+        wheel.cancel(timer)
+        assert len(wheel) == 1
+        wheel.advance(1000)
+        assert fired == [1000]
+
+    def test_past_deadlines_fire_on_next_advance(self):
+        wheel = TimingWheel(tick_ms=10, start_ms=5000)
+        fired = []
+        wheel.schedule(100, fired.append)
+        wheel.advance(5000)
+        assert fired == [5000]
+
+    def test_rejects_deadlines_beyond_span(self):
+        wheel = TimingWheel(tick_ms=1, wheel_size=4, levels=2)
+        with pytest.raises(ValueError):
+            wheel.schedule(1000, lambda now_ms: None)
+
+
+class TestTimeBarClock:
+    """Test suite for clock-driven time bar closing"""
+
+    def test_closes_bar_after_grace_without_trades(self, make_trade):
+        closed = []
+        clock = TimeBarClock(TimingWheel(tick_ms=10), on_close=lambda agg, bar: closed.append(bar))
+        aggregator = TimeBarAggregator(buf_size=10, reference_cutoff=1000)
+        aggregator.on_trade(make_trade(1, 100_100))
+        clock.register(aggregator, now_ms=100_150, grace_ms=200)
+
+        clock.advance(101_100)
+        assert closed == []
+        clock.advance(101_200)
+        assert len(closed) == 1
+        assert closed[0].is_closed
+        assert closed[0].close_time == 100_999
+
+        # The next trade opens a new bar without touching the closed one
+        aggregator.on_trade(make_trade(2, 104_500, price=51000.0))
+        assert aggregator.size() == 2
+        assert aggregator.bars[0].close_time == 100_999
+        assert aggregator.bars[1].open_time == 104_000
+
+    def test_emits_empty_bars(self, make_trade):
+        closed = []
+        clock = TimeBarClock(TimingWheel(tick_ms=10), on_close=lambda agg, bar: closed.append(bar))
+        aggregator = TimeBarAggregator(buf_size=100, reference_cutoff=1000)
+        aggregator.on_trade(make_trade(1, 100_100, price=50123.0))
+        clock.register(aggregator, now_ms=100_100, emit_empty=True)
+        for now in range(100_100, 104_100, 50):
+            clock.advance(now)
+
+        assert [bar.open_time for bar in closed] == [100_000, 101_000, 102_000, 103_000]
+        for bar in closed[1:]:
+            assert bar.number_of_trades == 0
+            assert bar.volume == 0.0
+            assert bar.close == 50123.0
+            assert bar.next_id == 2
+        aggregator.on_trade(make_trade(2, 104_200))
+        assert aggregator.missing_trades == 0
+        assert aggregator.bars[-1].open_time == 104_000
+
+    def test_late_trade_is_folded_into_closed_bar(self, make_trade):
+        clock = TimeBarClock(TimingWheel(tick_ms=10))
+        aggregator = TimeBarAggregator(buf_size=10, reference_cutoff=1000)
+        aggregator.on_trade(make_trade(1, 100_100))
+        clock.register(aggregator, now_ms=100_100)
+        clock.advance(101_050)
+        aggregator.on_trade(make_trade(2, 100_900))
+        assert aggregator.size() == 1
+        assert aggregator.bars[0].number_of_trades == 2
+
+    @pytest.mark.parametrize("late_ms,traded", [(100_900, 0), (102_500, 2)])
+    def test_late_trade_after_empty_bars(self, make_trade, late_ms, traded):
+        aggregator = TimeBarAggregator(buf_size=10, reference_cutoff=1000,
+                                       completeness_threshold=1.0)
+        aggregator.on_trade(make_trade(1, 100_100, price=50000.0))
+        aggregator.close_until(104_000, emit_empty=True)
+        assert [bar.number_of_trades for bar in aggregator.bars] == [1, 0, 0, 0]
+
+        aggregator.on_trade(make_trade(2, late_ms, price=50100.0))
+        bars = list(aggregator.bars)
+        assert [bar.open_time for bar in bars] == [100_000, 101_000, 102_000, 103_000]
+        assert bars[traded].number_of_trades == (2 if traded == 0 else 1)
+        assert bars[traded].current_id == 2
+        assert sum(bar.number_of_trades for bar in bars) == 2
+        if traded > 0:
+            assert bars[traded].start_id == 2
+            assert bars[traded].open == bars[traded].low == 50100.0
+        for bar in bars[traded + 1:]:
+            assert bar.number_of_trades == 0
+            assert (bar.start_id, bar.next_id, bar.close) == (3, 3, 50100.0)
+
+        # The next trade follows on without a gap
+        aggregator.on_trade(make_trade(3, 104_200))
+        assert aggregator.missing_trades == 0
+        assert aggregator.size() == 5
+        assert aggregator.bars[-1].start_id == 3
+
+    def test_rejects_other_aggregators(self):
+        clock = TimeBarClock()
+        with pytest.raises(TypeError):
+            clock.register(TickBarAggregator(10, 100), now_ms=0)
+        with pytest.raises(TypeError):
+            clock.register(MultiTimeBarAggregator(10, [1000, 60_000]), now_ms=0)
+
+    def test_one_timer_per_aggregator(self, make_trade):
+        clock = TimeBarClock(TimingWheel(tick_ms=10))
+        aggregators = [TimeBarAggregator(buf_size=10, reference_cutoff=1000) for _ in range(2000)]
+        for i, aggregator in enumerate(aggregators):
+            aggregator.on_trade(make_trade(1, 100_000 + i % 1000))
+            clock.register(aggregator, now_ms=100_000)
+        assert len(clock.wheel) == 2000
+        clock.advance(101_000)
+        assert all(aggregator.bars[-1].is_closed for aggregator in aggregators)
+        assert len(clock.wheel) == 2000
+        clock.unregister(aggregators[0])
+        assert len(clock.wheel) == 1999
+
+
+class TestManagerClock:
+    def test_manager_registers_time_specs(self, make_trade):
+        clock = TimeBarClock(TimingWheel(tick_ms=10))
+        spec = BarSpec(type=BarType.TIME, reference_cutoff=1000, buf_size=10, close_grace_ms=100)
+        plain = BarSpec(type=BarType.TICK, reference_cutoff=10, buf_size=10)
+        manager = AggregatorManager([spec, plain], idle_timeout_ms=60_000, clock=clock)
+        manager.on_trade(make_trade(1, 100_100))
+        assert len(clock) == 1
+
+        clock.advance(101_100)
+        market = (Exchange.EXCHANGE_BINANCE, Instrument.INSTRUMENT_SPOT, BTC)
+        assert manager.get(market, spec).bars[-1].is_closed
+
+        manager.evict(market)
+        assert len(clock) == 0
@@ -0,0 +1,156 @@
+import math
+import numpy as np
+import pandas as pd
+import pytest
+
+from solvexity.toolbox.analytics import (
+    Drawdown, Runup, DrawdownMomentum, RollingMax, RollingMin, RollingSum
+)
+from solvexity.model.bar import Bar
+from solvexity.model.shared import Symbol
+
+
+def make_closes(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return np.round(50000.0 * np.exp(np.cumsum(rng.normal(0, 1e-3, n))), 2)
+
+
+def make_bar(close: float, i: int) -> Bar:
+    return Bar(
+        symbol=Symbol(base="BTC", quote="USDT"),
+        start_id=i, current_id=i, next_id=i + 1,
+        open_time=i * 1000, close_time=i * 1000 + 999,
+        open=close, high=close, low=close, close=close,
+        volume=1.0, quote_volume=close, is_closed=True, number_of_trades=1,
+        taker_buy_base_asset_volume=0.0, taker_buy_quote_asset_volume=0.0,
+    )
+
+
+class TestRolling:
+    """Test suite for the monotonic deque and running sum windows"""
+
+    @pytest.mark.parametrize("window", [None, 1, 7, 100])
+    def test_matches_pandas(self, window):
+        closes = pd.Series(make_closes(1000))
+        if window is None:
+            expected_max, expected_min = closes.cummax(), closes.cummin()
+            expected_sum = closes.cumsum()
+        else:
+            rolling = closes.rolling(window, min_periods=1)
+            expected_max, expected_min, expected_sum = rolling.max(), rolling.min(), rolling.sum()
+        rolling_max, rolling_min = RollingMax(window), RollingMin(window)
+        rolling_sum = RollingSum(window)
+        for i, x in enumerate(closes):
+            assert rolling_max.update(x) == expected_max[i]
+            assert rolling_min.update(x) == expected_min[i]
+            assert rolling_sum.update(x) == pytest.approx(expected_sum[i], rel=1e-12)
+
+    def test_empty(self):
+        assert math.isnan(RollingMax(3).value())
+        assert RollingSum(3).value() == 0.0
+
+    def test_sum_recovers(self):
+        values = [0.1, 0.7, float("nan"), 1e20, 0.3, 0.0, 0.0, 0.0, 0.2]
+        rolling_sum = RollingSum(3)
+        sums = [rolling_sum.update(x) for x in values]
+        assert all(math.isnan(x) for x in sums[2:5])
+        assert sums[5] == 1e20 + 0.3
+        # Once the large value has left the window the zeros sum to exactly 0
+        assert sums[7] == 0.0
+        assert sums[8] == 0.2
+
+    def test_sum_does_not_drift(self):
+        values = np.random.default_rng(0).normal(1e4, 1e3, 200_000)
+        rolling_sum = RollingSum(20)
+        for x in values:
+            rolling_sum.update(float(x))
+        assert rolling_sum.value() == pytest.approx(math.fsum(values[-20:]), rel=1e-14)
+
+
+class TestDrawdown:
+    """Test suite for incremental drawdown and runup"""
+
+    @pytest.mark.parametrize("window", [None, 20])
+    def test_on_bar_matches_on_dataframe(self, window):
+        closes = make_closes(200)
+        drawdown = Drawdown("close", window)
+        rows = [drawdown.on_bar(make_bar(close, i)) for i, close in enumerate(closes)]
+        df = drawdown.on_dataframe(pd.DataFrame({"close": closes}))
+        for key in rows[0]:
+            np.testing.assert_allclose(df[key], [row[key] for row in rows], rtol=1e-15)
+
+    def test_expanding_matches_cummax(self):
+        closes = pd.Series(make_closes(200))
+        value = {}
+        drawdown = Drawdown("close")
+        for close in closes:
+            drawdown.update(close)
+            value = drawdown.value()
+        assert value["close.cummax"] == closes.max()
+        expected = (closes.max() - closes.iloc[-1]) / closes.max()
+        assert value["close.drawdown_pct"] == pytest.approx(expected)
+
+    def test_runup(self):
+        runup = Runup("close", window=3)
+        for close in [10.0, 8.0, 9.0, 12.0]:
+            runup.update(close)
+        assert runup.value() == {"close.cummin": 8.0, "close.runup": 4.0, "close.runup_pct": 0.5}
+
+
+class TestDrawdownMomentum:
+    """Test suite for the incremental drawdown and runup momentum"""
+
+    def test_matches_brute_force(self):
+        closes = make_closes(500, seed=1)
+        window = 50
+        momentum = DrawdownMomentum("close", window)
+        for i, close in enumerate(closes):
+            value = momentum.on_bar(make_bar(close, i))
+
+        drawdowns, runups = [], []
+        for i in range(len(closes)):
+            history = closes[max(0, i - window + 1):i + 1]
+            drawdowns.append(((history.max() - closes[i]) / history.max()) ** 2)
+            runups.append(((closes[i] - history.min()) / history.min()) ** 2)
+        drawdown_momentum = math.fsum(drawdowns[-window:])
+        runup_momentum = math.fsum(runups[-window:])
+        assert value["close.drawdown_momentum"] == pytest.approx(drawdown_momentum, rel=1e-9)
+        assert value["close.runup_momentum"] == pytest.approx(runup_momentum, rel=1e-9)
+        assert value["close.momentum_ratio"] == pytest.approx(drawdown_momentum / runup_momentum,
+                                                              rel=1e-9)
+
+    def test_first_window_matches_dataframe_momentum(self):
+        # Until the window is full every bar's peak is the cummax of the frame
+        closes = make_closes(50, seed=2)
+        momentum = DrawdownMomentum("close", window=50)
+        for close in closes:
+            momentum.update(close)
+        df = pd.DataFrame({"close": closes})
+        cummax, cummin = df["close"].cummax(), df["close"].cummin()
+        value = momentum.value()
+        drawdowns, runups = (cummax - df["close"]) / cummax, (df["close"] - cummin) / cummin
+        assert value["close.drawdown_momentum"] == pytest.approx(np.sum(drawdowns ** 2))
+        assert value["close.runup_momentum"] == pytest.approx(np.sum(runups ** 2))
+
+    def test_monotone_run_has_no_runup(self):
+        # A falling run longer than the window has runups of exactly 0, so the ratio is undefined
+        rng = np.random.default_rng(0)
+        rally = np.round(50000.0 * np.exp(np.cumsum(rng.normal(0, 1e-2, 103))), 2)
+        closes = np.concatenate([rally, np.linspace(30000.0, 25000.0, 30)])
+        momentum = DrawdownMomentum("close", window=20)
+        for close in closes:
+            momentum.update(close)
+        value = momentum.value()
+        assert value["close.runup_momentum"] == 0.0
+        assert value["close.drawdown_momentum"] > 0.0
+        assert math.isnan(value["close.momentum_ratio"])
+
+    def test_dataframe_adapter_keeps_state(self):
+        momentum = DrawdownMomentum("close", window=10)
+        for close in [10.0, 9.0, 11.0]:
+            momentum.update(close)
+        before = momentum.value()
+        df = momentum.on_dataframe(pd.DataFrame({"close": make_closes(30)}))
+        assert "close.momentum_ratio" in df.columns
+        assert len(df) == 30
+        assert momentum.value() == before
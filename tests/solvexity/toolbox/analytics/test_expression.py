@@ -0,0 +1,112 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import pytest
+
+from solvexity.strategy.pipeline import Alpha
+from solvexity.strategy.pipeline.chunked import engineer_features
+from solvexity.toolbox.analytics import ExpressionAnalytics, ExpressionGraph
+from solvexity.toolbox.analytics import stats
+
+
+def make_bars(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 50000.0 * np.exp(np.cumsum(rng.normal(0, 2e-3, n)))
+    start_ids = np.arange(1, 1 + n * 10, 10)
+    return pd.DataFrame({
+        "start_id": start_ids,
+        "next_id": start_ids + 10,
+        "high": close * 1.001,
+        "low": close * 0.999,
+        "close": close,
+        "volume": rng.exponential(2.0, n),
+    })
+
+
+class TestExpressionGraph:
+    def test_common_subexpressions_share_nodes(self):
+        graph = ExpressionGraph()
+        graph.add("a", "ema(ret(close, 1), 20) / rstd(ret(close, 1), 60)")
+        n_nodes = len(graph)
+        graph.add("b", "sma(close / lag(close, 1) - 1, 5)")
+        # ret(close, 1) expands to the same nodes, only the const 5 and the sma are new
+        assert len(graph) == n_nodes + 1
+        graph.add("c", "ema(ret(close, 1), 20)")
+        assert len(graph) == n_nodes + 1
+
+    def test_matches_stats(self):
+        df = make_bars(500)
+        close = df["close"].to_numpy()
+        graph = ExpressionGraph()
+        graph.add("vol", "ema(ret(close, 1), 20) / rstd(ret(close, 1), 60)")
+        graph.add("z", "zscore(close, 30)")
+        graph.add("neg", "-diff(close, 2) * 2")
+        values = graph.evaluate({column: df[column].to_numpy() for column in graph.columns()})
+
+        returns = close[1:] / close[:-1] - 1
+        expected = np.full(len(close), np.nan)
+        expected[1:] = stats.ema(returns, span=20) / stats.rolling_std(returns, 60)
+        np.testing.assert_array_equal(values["vol"], expected)
+        np.testing.assert_array_equal(values["z"],
+                                      (close - stats.sma(close, 30)) / stats.rolling_std(close, 30))
+        np.testing.assert_array_equal(values["neg"][2:], -(close[2:] - close[:-2]) * 2)
+        assert np.isnan(values["neg"][:2]).all()
+
+    def test_bad_values_stay_in_their_windows(self):
+        close = make_bars(300)["close"].to_numpy().copy()
+        close[100] = 0.0
+        close[150] = np.nan
+        close[200:210] = close[199]
+        graph = ExpressionGraph()
+        graph.add("rsum", "rsum(ret(close, 1), 2)")
+        graph.add("ema", "ema(ret(close, 1), 5)")
+        graph.add("z", "zscore(close, 5)")
+        graph.add("rstd", "rstd(zscore(close, 5), 10)")
+        values = graph.evaluate({"close": close})
+        assert np.isinf(values["rsum"][101])
+        assert np.isfinite(values["rsum"][103:150]).all()
+        assert np.isfinite(values["rsum"][153:]).all()
+        assert np.isfinite(values["ema"][1:]).all()
+        # A flat stretch has no deviation, the z-score is undefined only while it lasts
+        assert not np.isfinite(values["z"][204:210]).any()
+        assert np.isfinite(values["z"][214:]).all()
+        assert np.isfinite(values["rstd"][225:]).all()
+
+    def test_lookback(self):
+        assert ExpressionAnalytics({"a": "sma(ret(close, 1), 20)"}).lookback == 21
+        expressions = {"a": "close", "b": "rmax(high, 5) - rmin(low, 3)"}
+        assert ExpressionAnalytics(expressions).lookback == 5
+        assert ExpressionAnalytics({"a": "ema(close, 20)"}).lookback is None
+
+    @pytest.mark.parametrize("expression", [
+        "close +", "foo(close)", "sma(close)", "sma(close, 0)", "sma(close, high)", "close[1]",
+        "close > 1",
+    ])
+    def test_invalid(self, expression):
+        with pytest.raises(ValueError):
+            ExpressionGraph().add("bad", expression)
+
+
+class TestExpressionAnalytics:
+    def test_in_alpha(self):
+        analytics = ExpressionAnalytics({
+            "momentum": "ema(ret(close, 1), 20) / rstd(ret(close, 1), 60)",
+            "vwap_gap": "close / vwap(close, volume, 10) - 1",
+        })
+        assert set(analytics.inputs) == {"close", "volume"}
+        assert analytics.outputs == ("momentum", "vwap_gap")
+        df = Alpha([analytics]).on_dataframe(make_bars(200))
+        assert np.isnan(df["momentum"].iloc[:60]).all()
+        assert np.isfinite(df["momentum"].iloc[60:]).all()
+        assert np.isfinite(df["vwap_gap"].iloc[9:]).all()
+
+    def test_chunked_matches_whole(self):
+        features = {f"ret_{n}": f"ret(close, {n})" for n in (1, 5, 10)}
+        features |= {f"max_{n}": f"rmax(high, {n}) / close - 1" for n in (5, 20)}
+        df = make_bars(1000)
+        whole = Alpha([ExpressionAnalytics(features)]).on_dataframe(df.copy())
+        chunks = [df.iloc[i:i + 150] for i in range(0, len(df), 150)]
+        parts = []
+        with ThreadPoolExecutor(2) as pool:
+            engineer_features(chunks, [ExpressionAnalytics(features)], parts.append, pool=pool)
+        pd.testing.assert_frame_equal(pd.concat(parts, ignore_index=True), whole)
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from solvexity.toolbox.analytics import metrics, stats
+
+
+def make_equity(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 100.0 * np.cumprod(1 + rng.normal(2e-4, 1e-2, n))
+
+
+def reference_duration(equity: np.ndarray) -> np.ndarray:
+    # Monotonic stack of the points above everything after them; its bottom is the running peak
+    stack = []
+    durations = []
+    for i, x in enumerate(equity):
+        while stack and equity[stack[-1]] <= x:
+            stack.pop()
+        durations.append(i - stack[0] if stack else 0)
+        stack.append(i)
+    return np.array(durations)
+
+
+class TestMetrics:
+    def test_drawdown(self):
+        equity = np.array([100.0, 120.0, 90.0, 110.0, 130.0, 117.0])
+        np.testing.assert_allclose(metrics.drawdown(equity), [0, 0, 0.25, 1 / 12, 0, 0.1])
+        assert metrics.max_drawdown(equity) == pytest.approx(0.25)
+        np.testing.assert_array_equal(metrics.drawdown_duration(equity), [0, 0, 1, 2, 0, 1])
+        assert metrics.max_drawdown_duration(equity) == 2
+
+    def test_duration_matches_monotonic_stack(self):
+        equity = make_equity(5000)
+        np.testing.assert_array_equal(metrics.drawdown_duration(equity), reference_duration(equity))
+
+    def test_ratios_match_pandas(self):
+        equity = make_equity(2000)
+        r = pd.Series(equity).pct_change().dropna()
+        np.testing.assert_allclose(metrics.returns(equity), r.to_numpy())
+        assert metrics.sharpe(r.to_numpy(), 365) == pytest.approx(r.mean() / r.std() * np.sqrt(365))
+        downside = np.sqrt((np.minimum(r, 0) ** 2).mean())
+        expected = r.mean() / downside * np.sqrt(365)
+        assert metrics.sortino(r.to_numpy(), 365) == pytest.approx(expected)
+        years = (len(equity) - 1) / 365
+        cagr = (equity[-1] / equity[0]) ** (1 / years) - 1
+        assert metrics.calmar(equity, 365) == pytest.approx(cagr / metrics.max_drawdown(equity))
+
+    def test_turnover_and_hit_rate(self):
+        assert metrics.turnover(np.array([0.0, 1.0, -1.0, -1.0, 0.0])) == pytest.approx(1.0)
+        assert metrics.hit_rate(np.array([0.1, -0.2, 0.0, 0.3])) == pytest.approx(2 / 3)
+        assert np.isnan(metrics.hit_rate(np.zeros(3)))
+
+    def test_rolling_match_pandas(self):
+        equity = make_equity(3000)
+        r = pd.Series(metrics.returns(equity))
+        window = 50
+        expected = r.rolling(window).mean() / r.rolling(window).std()
+        np.testing.assert_allclose(metrics.rolling_sharpe(r.to_numpy(), window),
+                                   expected.to_numpy(), rtol=1e-8)
+        downside = np.sqrt((np.minimum(r, 0) ** 2).rolling(window).mean())
+        expected = r.rolling(window).mean() / downside
+        np.testing.assert_allclose(metrics.rolling_sortino(r.to_numpy(), window),
+                                   expected.to_numpy(), rtol=1e-6)
+        expected = (r > 0).rolling(window).sum() / (r != 0).rolling(window).sum()
+        np.testing.assert_allclose(metrics.rolling_hit_rate(r.to_numpy(), window),
+                                   expected.to_numpy())
+
+    def test_rolling_long_series(self):
+        r = np.random.default_rng(1).normal(1e-3, 1e-2, 2_000_000)
+        window = 100
+        tail = np.lib.stride_tricks.sliding_window_view(r[-2000:], window)
+        expected = tail.mean(axis=1) / tail.std(axis=1, ddof=1)
+        np.testing.assert_allclose(metrics.rolling_sharpe(r, window)[-len(tail):], expected,
+                                   rtol=1e-11)
+
+    def test_rolling_recovers_from_nan(self):
+        r = pd.Series(np.random.default_rng(2).normal(0, 1e-2, 500))
+        r[[0, 100, 250]] = np.nan
+        window = 20
+        expected = r.rolling(window).mean() / r.rolling(window).std()
+        np.testing.assert_allclose(metrics.rolling_sharpe(r.to_numpy(), window),
+                                   expected.to_numpy(), rtol=1e-8)
+        assert np.isfinite(metrics.rolling_sortino(r.to_numpy(), window)[270:]).all()
+
+    @pytest.mark.parametrize("window", [1, 7, 64, 3000, 5000])
+    def test_rolling_drawdown_matches_stats(self, window):
+        equity = make_equity(3000)
+        np.testing.assert_allclose(metrics.rolling_drawdown(equity, window),
+                                   stats.rolling_drawdown(equity, window))
+
+    def test_batches_match_rows(self):
+        batch = np.stack([make_equity(1000, seed) for seed in range(4)])
+        summary = metrics.summary(batch, 365)
+        for i, row in enumerate(batch):
+            for name, value in metrics.summary(row, 365).items():
+                assert summary[name][i] == pytest.approx(value)
+        np.testing.assert_allclose(metrics.rolling_drawdown(batch, 20)[2],
+                                   stats.rolling_drawdown(batch[2], 20))
+        np.testing.assert_array_equal(metrics.drawdown_duration(batch)[1],
+                                      reference_duration(batch[1]))
+        rolling = metrics.rolling_sharpe(metrics.returns(batch), 30)
+        np.testing.assert_allclose(rolling[3],
+                                   metrics.rolling_sharpe(metrics.returns(batch[3]), 30))
@@ -0,0 +1,173 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from solvexity.toolbox.analytics import stats
+from solvexity.toolbox.analytics.rolling import RollingMax, RollingMin
+
+
+def make_ohlcv(n: int, seed: int = 0) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    close = 50000.0 * np.exp(np.cumsum(rng.normal(0, 2e-3, n)))
+    open = np.concatenate([[50000.0], close[:-1]]) * np.exp(rng.normal(0, 2e-4, n))
+    high = np.maximum(open, close) * np.exp(np.abs(rng.normal(0, 1e-3, n)))
+    low = np.minimum(open, close) * np.exp(-np.abs(rng.normal(0, 1e-3, n)))
+    volume = rng.exponential(2.0, n)
+    return {"open": open, "high": high, "low": low, "close": close, "volume": volume}
+
+
+def incremental(update, *columns) -> np.ndarray:
+    return np.array([update(*values) for values in zip(*(column.tolist() for column in columns))])
+
+
+@pytest.fixture
+def bars():
+    return make_ohlcv(2000)
+
+
+class TestBatchMatchesIncremental:
+    """Batch and incremental forms must be bit-identical"""
+
+    @pytest.mark.parametrize("window", [1, 2, 20, 500])
+    def test_moments(self, bars, window):
+        close, volume = bars["close"], bars["volume"]
+        np.testing.assert_array_equal(stats.sma(close, window),
+                                      incremental(stats.SMA(window).update, close))
+        np.testing.assert_array_equal(stats.ema(close, span=window),
+                                      incremental(stats.EMA(span=window).update, close))
+        if window > 1:
+            np.testing.assert_array_equal(stats.rolling_std(close, window),
+                                          incremental(stats.RollingStd(window).update, close))
+        np.testing.assert_array_equal(stats.vwap(close, volume, window),
+                                      incremental(stats.VWAP(window).update, close, volume))
+
+    @pytest.mark.parametrize("window", [1, 20, 500])
+    def test_extremes(self, bars, window):
+        close = bars["close"]
+        np.testing.assert_array_equal(stats.rolling_max(close, window),
+                                      incremental(RollingMax(window).update, close))
+        np.testing.assert_array_equal(stats.rolling_min(close, window),
+                                      incremental(RollingMin(window).update, close))
+        np.testing.assert_array_equal(stats.rolling_drawdown(close, window),
+                                      incremental(stats.RollingDrawdown(window).update, close))
+
+    @pytest.mark.parametrize("window", [1, 3, 20])
+    def test_extremes_skip_nan(self, bars, window):
+        close = bars["close"][:200].copy()
+        close[[0, 5, 6, 7, 50]] = np.nan
+        close[100:130] = np.nan
+        np.testing.assert_array_equal(stats.rolling_max(close, window),
+                                      incremental(RollingMax(window).update, close))
+        np.testing.assert_array_equal(stats.rolling_min(close, window),
+                                      incremental(RollingMin(window).update, close))
+        np.testing.assert_array_equal(stats.rolling_max(close, window),
+                                      pd.Series(close).rolling(window, min_periods=1).max())
+
+    @pytest.mark.parametrize("window", [2, 20, 500])
+    def test_volatility(self, bars, window):
+        o, h, l, c = bars["open"], bars["high"], bars["low"], bars["close"]
+        np.testing.assert_array_equal(stats.parkinson(h, l, window),
+                                      incremental(stats.Parkinson(window).update, h, l))
+        np.testing.assert_array_equal(stats.garman_klass(o, h, l, c, window),
+                                      incremental(stats.GarmanKlass(window).update, o, h, l, c))
+        np.testing.assert_array_equal(stats.yang_zhang(o, h, l, c, window),
+                                      incremental(stats.YangZhang(window).update, o, h, l, c))
+
+
+class TestAgainstPandas:
+    """Batch forms agree with pandas up to rounding"""
+
+    def test_rolling(self, bars):
+        close = pd.Series(bars["close"])
+        volume = pd.Series(bars["volume"])
+        window = 30
+        np.testing.assert_allclose(stats.sma(close, window), close.rolling(window).mean(),
+                                   rtol=1e-12)
+        np.testing.assert_allclose(stats.rolling_std(close, window), close.rolling(window).std(),
+                                   rtol=1e-7)
+        np.testing.assert_allclose(stats.ema(close, span=window),
+                                   close.ewm(span=window, adjust=False).mean(), rtol=1e-12)
+        np.testing.assert_allclose(stats.vwap(close, volume, window),
+                                   (close * volume).rolling(window).sum()
+                                   / volume.rolling(window).sum(), rtol=1e-12)
+        np.testing.assert_array_equal(stats.rolling_max(close, window),
+                                      close.rolling(window, min_periods=1).max())
+        np.testing.assert_array_equal(stats.rolling_min(close, window),
+                                      close.rolling(window, min_periods=1).min())
+
+    def test_volatility_definitions(self, bars):
+        df = pd.DataFrame(bars)
+        window = 30
+        log_hl = np.log(df["high"] / df["low"])
+        log_co = np.log(df["close"] / df["open"])
+        expected_parkinson = np.sqrt((log_hl ** 2).rolling(window).mean() / (4 * np.log(2)))
+        expected_gk = np.sqrt((0.5 * log_hl ** 2 - (2 * np.log(2) - 1) * log_co ** 2)
+                              .rolling(window).mean())
+        np.testing.assert_allclose(stats.parkinson(df["high"], df["low"], window),
+                                   expected_parkinson, rtol=1e-9)
+        np.testing.assert_allclose(stats.garman_klass(df["open"], df["high"], df["low"],
+                                                      df["close"], window),
+                                   expected_gk, rtol=1e-9)
+
+        overnight = np.log(df["open"] / df["close"].shift(1))
+        rs = (np.log(df["high"] / df["close"]) * np.log(df["high"] / df["open"])
+              + np.log(df["low"] / df["close"]) * np.log(df["low"] / df["open"]))
+        k = 0.34 / (1.34 + (window + 1) / (window - 1))
+        expected_yz = np.sqrt(overnight.rolling(window).var() + k * log_co.rolling(window).var()
+                              + (1 - k) * rs.where(overnight.notna()).rolling(window).mean())
+        np.testing.assert_allclose(stats.yang_zhang(df["open"], df["high"], df["low"], df["close"],
+                                                    window),
+                                   expected_yz, rtol=1e-6)
+
+    def test_long_trend_does_not_drift(self):
+        rng = np.random.default_rng(0)
+        n, window = 2_000_000, 20
+        close = np.linspace(20000.0, 60000.0, n) + np.cumsum(rng.normal(0, 1, n))
+        tail = np.lib.stride_tricks.sliding_window_view(close[-5000:], window)
+        np.testing.assert_allclose(stats.rolling_std(close, window)[-len(tail):],
+                                   tail.std(axis=1, ddof=1), rtol=1e-12)
+        np.testing.assert_allclose(stats.sma(close, window)[-len(tail):], tail.mean(axis=1),
+                                   rtol=1e-14)
+
+    def test_recovers_from_nan(self):
+        close = pd.Series(make_ohlcv(300)["close"])
+        close[[0, 50, 51, 180]] = np.nan
+        window = 20
+        np.testing.assert_allclose(stats.sma(close, window), close.rolling(window).mean(),
+                                   rtol=1e-12)
+        np.testing.assert_allclose(stats.rolling_std(close, window), close.rolling(window).std(),
+                                   rtol=1e-7)
+        volume = pd.Series(np.ones(len(close)))
+        np.testing.assert_allclose(stats.vwap(close, volume, window), close.rolling(window).mean(),
+                                   rtol=1e-12)
+
+    @pytest.mark.parametrize("window", [2, 20])
+    def test_non_finite_values_stay_in_their_windows(self, window):
+        close = make_ohlcv(300)["close"]
+        close[[0, 50, 120]] = [np.nan, np.inf, np.nan]
+        with np.errstate(invalid="ignore"):
+            batch = stats.rolling_std(close, window)
+            np.testing.assert_array_equal(batch,
+                                          incremental(stats.RollingStd(window).update, close))
+        np.testing.assert_array_equal(stats.sma(close, window),
+                                      incremental(stats.SMA(window).update, close))
+        assert not np.isnan(batch[120 + window:]).any()
+        np.testing.assert_allclose(batch[120 + window:],
+                                   stats.rolling_std(close[121:], window)[window - 1:], rtol=1e-9)
+
+    def test_ema_needs_one_parameter(self):
+        with pytest.raises(ValueError):
+            stats.EMA()
+        with pytest.raises(ValueError):
+            stats.ema(np.ones(3), span=2, alpha=0.5)
+
+
+class TestBenchmark:
+    def test_suite_emits_json(self):
+        import json
+        from solvexity.toolbox.analytics.benchmark import run_suite
+        results = json.loads(json.dumps(run_suite(n_bars=500, windows=(10,), repeat=1)))
+        assert len(results["results"]) == 9
+        for result in results["results"]:
+            assert result["batch_ms"] > 0
+            assert result["incremental_us_per_bar"] > 0
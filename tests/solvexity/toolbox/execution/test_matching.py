@@ -0,0 +1,177 @@
+import time
+import numpy as np
+import pytest
+
+from solvexity.model.trade import Trade
+from solvexity.model.shared import Symbol, Exchange, Instrument, Side, OrderType, TimeInForce
+from solvexity.toolbox.execution import MatchingEngine, Order, OrderStatus
+
+SYMBOL = Symbol(base="BTC", quote="USDT")
+
+
+def limit(side: Side, price: float, quantity: float = 1.0,
+          tif: TimeInForce = TimeInForce.TIME_IN_FORCE_GTC, queue_ahead: float = 0.0) -> Order:
+    return Order(side=side, type=OrderType.ORDER_TYPE_LIMIT, price=price, quantity=quantity,
+                 time_in_force=tif, queue_ahead=queue_ahead)
+
+
+class TestMatchingEngine:
+    def test_market_order_fills_on_next_trade(self, make_trade):
+        engine = MatchingEngine(taker_fee=0.001)
+        order = engine.submit(Order(side=Side.SIDE_BUY, type=OrderType.ORDER_TYPE_MARKET,
+                                    quantity=2.0))
+        assert engine.fills == []
+        fills = engine.on_trade(make_trade(1, price=100.0))
+        assert len(fills) == 1
+        assert fills[0].price == 100.0 and fills[0].quantity == 2.0 and not fills[0].is_maker
+        assert fills[0].fee == pytest.approx(0.2)
+        assert order.status == OrderStatus.FILLED
+        assert engine.orders == {}
+
+    def test_marketable_limit_takes_at_trade_price(self, make_trade):
+        engine = MatchingEngine()
+        engine.submit(limit(Side.SIDE_SELL, 99.0))
+        fills = engine.on_trade(make_trade(1, price=100.0))
+        assert fills[0].price == 100.0 and not fills[0].is_maker
+
+    def test_ioc_and_fok_expire_when_not_marketable(self, make_trade):
+        engine = MatchingEngine()
+        ioc = engine.submit(limit(Side.SIDE_BUY, 99.0, tif=TimeInForce.TIME_IN_FORCE_IOC))
+        fok = engine.submit(limit(Side.SIDE_SELL, 101.0, tif=TimeInForce.TIME_IN_FORCE_FOK))
+        assert engine.on_trade(make_trade(1, price=100.0)) == []
+        assert ioc.status == OrderStatus.EXPIRED and fok.status == OrderStatus.EXPIRED
+        assert engine.orders == {}
+        assert engine.best_bid() is None and engine.best_ask() is None
+
+    def test_ioc_fills_up_to_the_trade_quantity(self, make_trade):
+        engine = MatchingEngine()
+        ioc = engine.submit(limit(Side.SIDE_BUY, 101.0, quantity=3.0,
+                                  tif=TimeInForce.TIME_IN_FORCE_IOC))
+        fills = engine.on_trade(make_trade(1, price=100.0, quantity=1.25))
+        assert [fill.quantity for fill in fills] == [1.25]
+        assert ioc.filled == 1.25 and ioc.status == OrderStatus.EXPIRED
+        assert engine.orders == {}
+        assert engine.on_trade(make_trade(2, price=100.0, quantity=5.0)) == []
+
+        ioc = engine.submit(limit(Side.SIDE_BUY, 101.0, quantity=3.0,
+                                  tif=TimeInForce.TIME_IN_FORCE_IOC))
+        engine.on_trade(make_trade(3, price=100.0, quantity=5.0))
+        assert ioc.status == OrderStatus.FILLED
+
+    def test_fok_fills_only_when_the_trade_covers_it(self, make_trade):
+        engine = MatchingEngine()
+        fok = engine.submit(limit(Side.SIDE_SELL, 99.0, quantity=3.0,
+                                  tif=TimeInForce.TIME_IN_FORCE_FOK))
+        assert engine.on_trade(make_trade(1, price=100.0, quantity=2.0)) == []
+        assert fok.filled == 0.0 and fok.status == OrderStatus.EXPIRED
+        assert engine.orders == {}
+
+        fok = engine.submit(limit(Side.SIDE_SELL, 99.0, quantity=3.0,
+                                  tif=TimeInForce.TIME_IN_FORCE_FOK))
+        fills = engine.on_trade(make_trade(2, price=100.0, quantity=3.0))
+        assert [fill.quantity for fill in fills] == [3.0]
+        assert fok.status == OrderStatus.FILLED
+
+    def test_resting_bid_fills_through(self, make_trade):
+        engine = MatchingEngine(maker_fee=0.0002)
+        order = engine.submit(limit(Side.SIDE_BUY, 99.0, queue_ahead=100.0))
+        engine.on_trade(make_trade(1, price=100.0))
+        assert engine.best_bid() == 99.0
+        fills = engine.on_trade(make_trade(2, price=98.5, quantity=0.01, side=Side.SIDE_SELL))
+        # A print through the level fills the whole order at its price, regardless of the queue
+        assert fills[0].price == 99.0 and fills[0].quantity == 1.0 and fills[0].is_maker
+        assert fills[0].fee == pytest.approx(99.0 * 0.0002)
+        assert order.status == OrderStatus.FILLED
+        assert engine.best_bid() is None
+
+    def test_queue_position_at_price(self, make_trade):
+        engine = MatchingEngine()
+        order = engine.submit(limit(Side.SIDE_SELL, 101.0, quantity=2.0, queue_ahead=3.0))
+        engine.on_trade(make_trade(1, price=100.0))
+        # Sellers at the price do not consume the ask queue
+        assert engine.on_trade(make_trade(2, price=101.0, quantity=5.0, side=Side.SIDE_SELL)) == []
+        assert engine.on_trade(make_trade(3, price=101.0, quantity=2.0, side=Side.SIDE_BUY)) == []
+        assert order.queue_ahead == pytest.approx(1.0)
+        fills = engine.on_trade(make_trade(4, price=101.0, quantity=2.0, side=Side.SIDE_BUY))
+        assert fills[0].quantity == pytest.approx(1.0)
+        assert order.status == OrderStatus.PARTIALLY_FILLED
+        fills = engine.on_trade(make_trade(5, price=101.0, quantity=4.0, side=Side.SIDE_BUY))
+        assert fills[0].quantity == pytest.approx(1.0)
+        assert order.status == OrderStatus.FILLED
+
+    def test_fifo_within_level(self, make_trade):
+        engine = MatchingEngine()
+        first = engine.submit(limit(Side.SIDE_BUY, 99.0))
+        second = engine.submit(limit(Side.SIDE_BUY, 99.0))
+        engine.on_trade(make_trade(1, price=100.0))
+        fills = engine.on_trade(make_trade(2, price=99.0, quantity=1.5, side=Side.SIDE_SELL))
+        assert [(f.order_id, f.quantity) for f in fills] == [(first.id, 1.0), (second.id, 0.5)]
+
+    def test_levels_fill_best_first(self, make_trade):
+        engine = MatchingEngine()
+        low = engine.submit(limit(Side.SIDE_BUY, 97.0))
+        high = engine.submit(limit(Side.SIDE_BUY, 99.0))
+        engine.on_trade(make_trade(1, price=100.0))
+        fills = engine.on_trade(make_trade(2, price=98.0, side=Side.SIDE_SELL))
+        assert [f.order_id for f in fills] == [high.id]
+        assert engine.best_bid() == 97.0
+        fills = engine.on_trade(make_trade(3, price=96.0, side=Side.SIDE_SELL))
+        assert [f.order_id for f in fills] == [low.id]
+
+    def test_stop_market(self, make_trade):
+        engine = MatchingEngine()
+        buy = engine.submit(Order(side=Side.SIDE_BUY, type=OrderType.ORDER_TYPE_STOP_MARKET,
+                                  stop_price=105.0, quantity=1.0))
+        sell = engine.submit(Order(side=Side.SIDE_SELL, type=OrderType.ORDER_TYPE_STOP_MARKET,
+                                   stop_price=95.0, quantity=1.0))
+        assert engine.on_trade(make_trade(1, price=100.0)) == []
+        fills = engine.on_trade(make_trade(2, price=105.5))
+        assert [(f.order_id, f.price) for f in fills] == [(buy.id, 105.5)]
+        fills = engine.on_trade(make_trade(3, price=94.0))
+        assert [(f.order_id, f.price) for f in fills] == [(sell.id, 94.0)]
+
+    def test_cancel(self, make_trade):
+        engine = MatchingEngine()
+        order = engine.submit(limit(Side.SIDE_BUY, 99.0))
+        engine.on_trade(make_trade(1, price=100.0))
+        assert engine.cancel(order.id)
+        assert not engine.cancel(order.id)
+        assert order.status == OrderStatus.CANCELED
+        assert engine.on_trade(make_trade(2, price=90.0)) == []
+        assert engine.best_bid() is None
+
+    def test_invalid_orders(self):
+        engine = MatchingEngine()
+        with pytest.raises(ValueError):
+            engine.submit(Order(side=Side.SIDE_BUY, type=OrderType.ORDER_TYPE_LIMIT, quantity=1.0))
+        with pytest.raises(ValueError):
+            engine.submit(Order(side=Side.SIDE_BUY, type=OrderType.ORDER_TYPE_STOP_MARKET,
+                                quantity=1.0))
+        with pytest.raises(ValueError):
+            engine.submit(Order(side=Side.SIDE_BUY, type=OrderType.ORDER_TYPE_MARKET, quantity=0.0))
+
+    def test_on_fill_callbacks(self, make_trade):
+        engine = MatchingEngine()
+        seen = []
+        engine.on_fill.append(seen.append)
+        engine.submit(Order(side=Side.SIDE_SELL, type=OrderType.ORDER_TYPE_MARKET, quantity=1.0))
+        engine.on_trade(make_trade(1, price=100.0))
+        assert seen == engine.fills
+
+    def test_tape_throughput_with_resting_orders(self):
+        rng = np.random.default_rng(0)
+        prices = 100.0 + np.cumsum(rng.normal(0, 0.05, 100_000)).round(2)
+        trades = [Trade.model_construct(id=i, exchange=Exchange.EXCHANGE_BINANCE,
+                                        instrument=Instrument.INSTRUMENT_SPOT,
+                                        symbol=SYMBOL,
+                                        side=Side.SIDE_BUY if i % 2 else Side.SIDE_SELL,
+                                        price=float(p), quantity=0.01, timestamp=i)
+                  for i, p in enumerate(prices)]
+        engine = MatchingEngine()
+        for i in range(1000):
+            engine.submit(limit(Side.SIDE_BUY, round(90.0 - i * 0.01, 2)))
+            engine.submit(limit(Side.SIDE_SELL, round(110.0 + i * 0.01, 2)))
+        start = time.perf_counter()
+        for trade in trades:
+            engine.on_trade(trade)
+        assert time.perf_counter() - start < 5.0
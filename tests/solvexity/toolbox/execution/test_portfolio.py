@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from solvexity.model.shared import Symbol, Exchange, Instrument, Side, OrderType
+from solvexity.model.trade import Trade
+from solvexity.toolbox.execution import MatchingEngine, Order, Portfolio
+
+
+class TestPortfolio:
+    def test_round_trip_realizes_pnl(self):
+        portfolio = Portfolio(2, cash=1000.0)
+        portfolio.apply(0, Side.SIDE_BUY, 100.0, 2.0, fee=0.2)
+        portfolio.apply(0, Side.SIDE_BUY, 110.0, 2.0, fee=0.2)
+        assert portfolio.avg_prices[0] == pytest.approx(105.0)
+        portfolio.apply(0, Side.SIDE_SELL, 120.0, 4.0, fee=0.4)
+        assert portfolio.positions[0] == 0.0
+        assert portfolio.realized[0] == pytest.approx(60.0)
+        assert portfolio.fees[0] == pytest.approx(0.8)
+        assert portfolio.turnover[0] == pytest.approx(900.0)
+        assert portfolio.cash == pytest.approx(1000.0 + 60.0 - 0.8)
+        assert portfolio.equity == pytest.approx(portfolio.cash)
+
+    def test_short_and_flip(self):
+        portfolio = Portfolio(1)
+        portfolio.apply(0, Side.SIDE_SELL, 100.0, 1.0)
+        portfolio.apply(0, Side.SIDE_BUY, 90.0, 3.0)
+        assert portfolio.realized[0] == pytest.approx(10.0)
+        assert portfolio.positions[0] == pytest.approx(2.0)
+        assert portfolio.avg_prices[0] == pytest.approx(90.0)
+        portfolio.mark_one(0, 95.0)
+        assert portfolio.unrealized[0] == pytest.approx(10.0)
+        assert portfolio.equity == pytest.approx(20.0)
+
+    def test_vectorized_mark_matches_incremental(self):
+        rng = np.random.default_rng(0)
+        n = 50
+        vector = Portfolio(n, cash=1e6)
+        single = Portfolio(n, cash=1e6)
+        for _ in range(500):
+            i = int(rng.integers(n))
+            side = Side.SIDE_BUY if rng.random() < 0.5 else Side.SIDE_SELL
+            price, quantity = float(rng.uniform(50, 150)), float(rng.uniform(0.1, 2))
+            vector.apply(i, side, price, quantity, fee=0.01)
+            single.apply(i, side, price, quantity, fee=0.01)
+        prices = rng.uniform(50, 150, n)
+        prices[::7] = np.nan
+        equity = vector.mark(prices)
+        for i in range(n):
+            if not np.isnan(prices[i]):
+                single.mark_one(i, float(prices[i]))
+        assert equity == pytest.approx(single.equity)
+        expected = vector.cash + np.dot(vector.positions, vector.marks)
+        assert equity == pytest.approx(expected)
+
+    def test_drawdown(self):
+        portfolio = Portfolio(1, cash=0.0, capacity=1)
+        portfolio.apply(0, Side.SIDE_BUY, 100.0, 1.0)
+        portfolio.cash += 100.0
+        for price, time_ms in [(100.0, 1), (120.0, 2), (90.0, 3), (110.0, 4)]:
+            portfolio.mark_one(0, price, time_ms)
+        np.testing.assert_allclose(portfolio.equity_curve(), [100.0, 120.0, 90.0, 110.0])
+        np.testing.assert_array_equal(portfolio.mark_times(), [1, 2, 3, 4])
+        assert portfolio.peak == 120.0
+        assert portfolio.drawdown == pytest.approx(10.0 / 120.0)
+        assert portfolio.max_drawdown == pytest.approx(0.25)
+
+    def test_books_engine_fills(self):
+        engine = MatchingEngine(taker_fee=0.001)
+        portfolio = Portfolio(3, cash=1000.0)
+        engine.on_fill.append(portfolio.fill_callback(2))
+        engine.submit(Order(side=Side.SIDE_BUY, type=OrderType.ORDER_TYPE_MARKET, quantity=1.0))
+        engine.on_trade(Trade(id=1, exchange=Exchange.EXCHANGE_BINANCE,
+                              instrument=Instrument.INSTRUMENT_SPOT,
+                              symbol=Symbol(base="BTC", quote="USDT"), side=Side.SIDE_BUY,
+                              price=100.0, quantity=1.0, timestamp=1))
+        assert portfolio.positions.tolist() == [0.0, 0.0, 1.0]
+        assert portfolio.cash == pytest.approx(1000.0 - 100.0 - 0.1)
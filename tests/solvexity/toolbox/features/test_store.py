@@ -0,0 +1,142 @@
+import os
+import numpy as np
+import pytest
+
+from solvexity.toolbox.features import FeatureStore, feature_version, definition_of
+from solvexity.toolbox.aggregator import (
+    BarSpec, BarType, BaseVolumeBarAggregator, TimeBarAggregator
+)
+from solvexity.toolbox.analytics import DrawdownMomentum
+from solvexity.strategy.engine import OsirisEngine
+from solvexity.model.shared import Symbol, Exchange, Instrument
+
+MARKET = (Exchange.EXCHANGE_BINANCE, Instrument.INSTRUMENT_SPOT, Symbol(base="BTC", quote="USDT"))
+SPEC = BarSpec(type=BarType.QUOTE_VOLUME, reference_cutoff=100_000.0, buf_size=100)
+FEATURES = ["a", "b"]
+DEFINITION = {"a": {"window": 10}, "b": {"window": 20}}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return FeatureStore(str(tmp_path))
+
+
+class TestFeatureStore:
+    """Test suite for the persistent feature store"""
+
+    def test_append_and_read_range(self, store):
+        with store.writer(MARKET, SPEC, FEATURES, DEFINITION) as writer:
+            for i in range(100):
+                assert writer.append((1000 + 10 * i, 0), {"a": float(i), "b": -float(i)})
+
+        reader = store.reader(MARKET, SPEC, FEATURES, DEFINITION)
+        assert len(reader) == 100
+        ids, seqs, columns = reader.read(start_id=1100, end_id=1200)
+        np.testing.assert_array_equal(ids, np.arange(1100, 1200, 10))
+        np.testing.assert_array_equal(seqs, np.zeros(10))
+        np.testing.assert_array_equal(columns["a"], np.arange(10, 20, dtype=float))
+        np.testing.assert_array_equal(columns["b"], -np.arange(10, 20, dtype=float))
+        assert isinstance(reader.columns["a"], np.memmap)
+        assert "binance.spot.btcusdt" in reader.path
+
+    def test_appends_are_idempotent_across_restarts(self, store):
+        with store.writer(MARKET, SPEC, FEATURES, DEFINITION) as writer:
+            writer.extend(np.arange(1, 51), {"a": np.arange(50.0), "b": np.zeros(50)})
+        with store.writer(MARKET, SPEC, FEATURES, DEFINITION) as writer:
+            assert writer.last_key == (50, 0)
+            assert not writer.append((50, 0), {"a": 0.0, "b": 0.0})
+            features = {"a": np.arange(40.0, 61.0), "b": np.zeros(21)}
+            assert writer.extend(np.arange(40, 61), features) == 10
+        ids, _, columns = store.reader(MARKET, SPEC, FEATURES, DEFINITION).read()
+        np.testing.assert_array_equal(ids, np.arange(1, 61))
+        np.testing.assert_array_equal(columns["a"],
+                                      np.concatenate([np.arange(50.0), np.arange(51.0, 61.0)]))
+
+    def test_reader_refresh_sees_new_rows(self, store):
+        writer = store.writer(MARKET, SPEC, FEATURES, DEFINITION)
+        writer.append((1, 0), {"a": 1.0, "b": 1.0})
+        writer.flush()
+        reader = store.reader(MARKET, SPEC, FEATURES, DEFINITION)
+        assert len(reader) == 1
+        writer.append((2, 0), {"a": 2.0, "b": 2.0})
+        writer.close()
+        reader.refresh()
+        assert len(reader) == 2
+
+    def test_torn_rows_are_truncated(self, store):
+        with store.writer(MARKET, SPEC, FEATURES, DEFINITION) as writer:
+            writer.extend(np.arange(1, 11), {"a": np.ones(10), "b": np.ones(10)})
+            path = writer.path
+        # A crash after writing one feature of the next row
+        with open(os.path.join(path, "a.f8"), "ab") as f:
+            f.write(np.float64(2.0).tobytes())
+        assert len(store.reader(MARKET, SPEC, FEATURES, DEFINITION)) == 10
+        with store.writer(MARKET, SPEC, FEATURES, DEFINITION) as writer:
+            writer.append((11, 0), {"a": 3.0, "b": 3.0})
+        _, _, columns = store.reader(MARKET, SPEC, FEATURES, DEFINITION).read(start_id=11)
+        assert columns["a"].tolist() == [3.0]
+
+    def test_bars_sharing_a_next_id(self, store):
+        # A trade split across three bars closes them all with next_id 7
+        next_ids = np.array([5, 7, 7, 7, 9])
+        with store.writer(MARKET, SPEC, FEATURES, DEFINITION) as writer:
+            assert writer.extend(next_ids[:3], {"a": np.arange(3.0), "b": np.zeros(3)}) == 3
+            assert not writer.append((7, 1), {"a": 0.0, "b": 0.0})
+            assert writer.append((7, 2), {"a": 3.0, "b": 0.0})
+            assert writer.append((9, 0), {"a": 4.0, "b": 0.0})
+            with pytest.raises(ValueError):
+                writer.extend(np.array([11, 11]), {"a": np.zeros(2), "b": np.zeros(2)},
+                              seqs=np.array([0, 0]))
+        ids, seqs, columns = store.reader(MARKET, SPEC, FEATURES, DEFINITION).read()
+        np.testing.assert_array_equal(ids, next_ids)
+        np.testing.assert_array_equal(seqs, [0, 0, 1, 2, 0])
+        np.testing.assert_array_equal(columns["a"], np.arange(5.0))
+
+    def test_engine_keys_every_bar_of_a_split_trade(self, store, make_trade):
+        aggregator = BaseVolumeBarAggregator(buf_size=10, reference_cutoff=1.0)
+        engine = OsirisEngine(aggregator, DrawdownMomentum("close", window=10))
+        with store.writer(MARKET, SPEC, ["close.drawdown"], DEFINITION) as writer:
+            engine.on_closed.append(lambda bar,
+                                    values: writer.append(engine.bar_key,
+                                                          {"close.drawdown": bar.close}))
+            for i, quantity in enumerate([0.5, 0.6, 3.2, 0.5]):
+                engine.ingest(make_trade(i + 1, (i + 1) * 1000, price=float(i + 1),
+                                         quantity=quantity))
+        ids, seqs, columns = store.reader(MARKET, SPEC, ["close.drawdown"], DEFINITION).read()
+        # Trade 2 is split across two bars, trade 3 closes the bar trade 2 left open and two
+        # of its own
+        np.testing.assert_array_equal(ids, [2, 3, 3, 3])
+        np.testing.assert_array_equal(seqs, [0, 0, 1, 2])
+        np.testing.assert_array_equal(columns["close.drawdown"], [2.0, 3.0, 3.0, 3.0])
+
+    def test_engine_keys_empty_bars_closed_on_the_clock(self, store, make_trade):
+        engine = OsirisEngine(TimeBarAggregator(buf_size=10, reference_cutoff=1000),
+                              DrawdownMomentum("close", window=10))
+        with store.writer(MARKET, SPEC, ["close.drawdown"], DEFINITION) as writer:
+            engine.on_closed.append(lambda bar,
+                                    values: writer.append(engine.bar_key,
+                                                          {"close.drawdown": bar.close}))
+            engine.ingest(make_trade(1, 1_000, price=1.0, quantity=1.0))
+            engine.close_until(4_000, emit_empty=True)
+            engine.ingest(make_trade(2, 4_100, price=2.0, quantity=1.0))
+            engine.ingest(make_trade(3, 5_100, price=3.0, quantity=1.0))
+        ids, seqs, columns = store.reader(MARKET, SPEC, ["close.drawdown"], DEFINITION).read()
+        # The traded bar and the two empty ones after it all wait for trade 2
+        np.testing.assert_array_equal(ids, [2, 2, 2, 3])
+        np.testing.assert_array_equal(seqs, [0, 1, 2, 0])
+        np.testing.assert_array_equal(columns["close.drawdown"], [1.0, 1.0, 1.0, 2.0])
+
+    def test_definition_changes_the_version(self, store):
+        changed = {"a": {"window": 11}, "b": {"window": 20}}
+        assert feature_version(FEATURES, DEFINITION) != feature_version(FEATURES, changed)
+        store.writer(MARKET, SPEC, FEATURES, DEFINITION).close()
+        with pytest.raises(FileNotFoundError):
+            store.reader(MARKET, SPEC, FEATURES, {"a": {"window": 11}})
+        versions = store.versions(MARKET, SPEC)
+        assert list(versions) == [feature_version(FEATURES, DEFINITION)]
+        assert versions[feature_version(FEATURES, DEFINITION)]["definition"] == DEFINITION
+
+    def test_definition_of_analytics(self):
+        assert definition_of(DrawdownMomentum("close", window=20)) == {
+            "DrawdownMomentum": {"src_col": "close", "window": 20}
+        }